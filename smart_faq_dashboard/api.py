@@ -0,0 +1,268 @@
+"""
+Headless HTTP API for search, suggestions and AI summaries.
+
+The dataset and its indexes are loaded once per worker process and shared by every
+request, unlike the Streamlit app, which reruns its script on each interaction.
+Run with e.g.
+    uvicorn api:app --workers 4 --port 8000
+Endpoints:
+    GET  /search?q=...&mode=syllable|jamo&threshold=55&limit=50
+    GET  /type?session=...&q=...&mode=syllable|jamo&limit=20   (search-as-you-type, one call per keystroke)
+    GET  /suggest?q=...&k=5
+    POST /summarize  {"query": "...", "row": {"Product": ..., "Question": ...}}
+                     (Authorization: Bearer $API_TOKEN; a search result row can be posted as is,
+                     only Product + Question are read and the rest comes from the catalog)
+    GET  /health
+    GET  /metrics   (Prometheus text: per-stage latency, errors, cache hits, rows and tokens)
+"""
+import asyncio
+import contextlib
+import hmac
+import math
+import os
+import threading
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+from src.data_loader import load_data, live_index
+from src.incremental_search import SearchSession
+from src.llm_engine import build_context, generate_ai_summary
+from src.search_engine import get_suggestions, query_cache, smart_search
+from src.search_index import FaqIndex, JAMO, SYLLABLE
+from src.tracing import tracer
+
+load_dotenv()
+
+GOOGLE_SHEET_URL = os.environ.get("GOOGLE_SHEET_URL", "dummy_url")
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+MAX_SUGGESTIONS = 50
+MAX_QUERY_CHARS = 500  # longer /summarize questions are rejected (they are sent to the LLM)
+MAX_TYPING_SESSIONS = 1000  # least recently used search-as-you-type sessions are dropped
+# Bearer token required by /summarize, which spends the server's OpenAI key; unset disables it
+API_TOKEN = os.environ.get("API_TOKEN")
+
+
+class Catalog:
+    """The process's FAQ data: loaded on first use, then reused by every request."""
+
+    def __init__(self, sheet_url):
+        self.sheet_url = sheet_url
+        self.df = None
+        self._index = None
+
+    def load(self):
+        if self.df is None:
+            self.df = load_data(self.sheet_url)
+            if live_index(self.df) is None:
+                self._index = FaqIndex(self.df)  # mock data has no snapshot or sync
+        return self
+
+    @property
+    def index(self):
+        # A Google Sheet sync swaps in a new index in the background; always use the current one
+        self.load()
+        index = live_index(self.df)
+        if index is None:
+            if self._index is None:
+                self._index = FaqIndex(self.df)  # snapshot dropped from the process and pruned from disk
+            index = self._index
+        return index
+
+
+catalog = Catalog(GOOGLE_SHEET_URL)
+
+
+def _records(df):
+    """DataFrame rows as JSON-safe dicts (NaN -> None, NumPy scalars -> Python)."""
+    records = df.to_dict(orient='records')
+    for record in records:
+        for key, value in record.items():
+            if hasattr(value, 'item'):
+                value = value.item()
+            if isinstance(value, float) and math.isnan(value):
+                value = None
+            record[key] = value
+    return records
+
+
+def _error(message, status=400):
+    return JSONResponse({"error": message}, status_code=status)
+
+
+def _int_param(params, name, default, low, high):
+    """An integer query parameter in [low, high]; raises ValueError with a message for the client."""
+    try:
+        value = int(params[name]) if name in params else default
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer.") from None
+    if value is not None and not low <= value <= high:
+        raise ValueError(f"'{name}' must be between {low} and {high}.")
+    return value
+
+
+def _authorized(request):
+    if not API_TOKEN:
+        return False
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(token.encode(), API_TOKEN.encode())
+
+
+def _catalog_row(product, question):
+    """The catalog row with this Product and Question, or None."""
+    df = catalog.index.df
+    matches = df[(df['Product'].astype(str) == product) & (df['Question'].astype(str) == question)]
+    return matches.iloc[0] if len(matches) else None
+
+
+def _search(query, mode, threshold, limit):
+    index = catalog.index
+    results = smart_search(index.df, query, threshold=threshold, index=index, mode=mode)
+    return len(results), _records(results.head(limit))
+
+
+async def search(request):
+    params = request.query_params
+    query = params.get("q", "").strip()
+    mode = params.get("mode", SYLLABLE)
+    if not query:
+        return _error("Missing query parameter 'q'.")
+    if mode not in (SYLLABLE, JAMO):
+        return _error(f"Unknown mode '{mode}' (use '{SYLLABLE}' or '{JAMO}').")
+    try:
+        threshold = _int_param(params, "threshold", None, 0, 100)
+        limit = _int_param(params, "limit", DEFAULT_LIMIT, 1, MAX_LIMIT)
+    except ValueError as e:
+        return _error(str(e))
+
+    # Scoring is CPU work; keep it off the event loop
+    count, results = await run_in_threadpool(_search, query, mode, threshold, limit)
+    return JSONResponse({"query": query, "mode": mode, "count": count, "results": results})
+
+
+_sessions = OrderedDict()  # (client session id, mode) -> SearchSession
+_sessions_lock = threading.Lock()
+
+
+def _typing_session(session_id, mode):
+    index = catalog.index
+    with _sessions_lock:
+        session = _sessions.pop((session_id, mode), None)
+        if session is None:
+            session = SearchSession(index, mode=mode)
+        elif session.index is not index:
+            session.reset(index)  # the data changed since the last keystroke
+        _sessions[(session_id, mode)] = session
+        while len(_sessions) > MAX_TYPING_SESSIONS:
+            _sessions.popitem(last=False)[1].close()
+    return session
+
+
+async def type_ahead(request):
+    params = request.query_params
+    session_id = params.get("session", "")
+    query = params.get("q", "")
+    mode = params.get("mode", SYLLABLE)
+    if not session_id:
+        return _error("Missing query parameter 'session' (any id the client keeps per search box).")
+    if mode not in (SYLLABLE, JAMO):
+        return _error(f"Unknown mode '{mode}' (use '{SYLLABLE}' or '{JAMO}').")
+    try:
+        limit = _int_param(params, "limit", 20, 1, MAX_LIMIT)
+    except ValueError as e:
+        return _error(str(e))
+
+    session = _typing_session(session_id, mode)
+    matched = await asyncio.wrap_future(session.submit(query))
+    if matched is None:
+        # A later keystroke of the same session arrived while this one was running
+        return JSONResponse({"query": query, "superseded": True, "count": 0, "results": []})
+    positions, scores = matched
+    results = session.index.build_results(positions[:limit], scores[:limit])
+    return JSONResponse({"query": query, "superseded": False, "count": len(positions), "results": _records(results)})
+
+
+async def suggest(request):
+    query = request.query_params.get("q", "").strip()
+    if not query:
+        return _error("Missing query parameter 'q'.")
+    try:
+        k = _int_param(request.query_params, "k", 5, 1, MAX_SUGGESTIONS)
+    except ValueError as e:
+        return _error(str(e))
+
+    index = catalog.index
+    suggestions = await run_in_threadpool(get_suggestions, index.df, query, k, index)
+    return JSONResponse({
+        "query": query,
+        "suggestion": suggestions[0][0] if suggestions else None,
+        "suggestions": [{"keyword": keyword, "score": score} for keyword, score in suggestions],
+    })
+
+
+async def summarize(request):
+    # Every call can spend the server's OpenAI key, so only token holders may use it
+    if not API_TOKEN:
+        return _error("/summarize is disabled (set API_TOKEN to enable it).", status=403)
+    if not _authorized(request):
+        return _error("Missing or invalid bearer token.", status=401)
+    try:
+        body = await request.json()
+    except ValueError:
+        return _error("Body must be JSON.")
+    if not isinstance(body, dict):
+        return _error("Body must be a JSON object.")
+    query = str(body.get("query", "")).strip()
+    if not query:
+        return _error("Missing 'query'.")
+    if len(query) > MAX_QUERY_CHARS:
+        return _error(f"'query' is longer than {MAX_QUERY_CHARS} characters.")
+    ref = body.get("row")
+    if not isinstance(ref, dict) or "Product" not in ref or "Question" not in ref:
+        return _error("Send 'row' with the 'Product' and 'Question' of a search result.")
+
+    # The context always comes from the catalog row and is packed into the token budget
+    row = await run_in_threadpool(_catalog_row, str(ref["Product"]), str(ref["Question"]))
+    if row is None:
+        return _error("No catalog row with this Product and Question.", status=404)
+    context, packing = build_context(row, query)
+    row_key = packing.pop('row_key')
+
+    # The OpenAI call blocks; the worker thread keeps the event loop serving other requests
+    answer = await run_in_threadpool(generate_ai_summary, context, query, row_key=row_key)
+    return JSONResponse({"query": query, "answer": answer, "context_tokens": packing})
+
+
+async def health(request):
+    index = catalog.index
+    return JSONResponse({"status": "ok", "rows": len(index), "query_cache": query_cache.metrics()})
+
+
+async def metrics(request):
+    # Per worker process: scrape each worker, or run a single worker behind the scraper
+    return PlainTextResponse(tracer.prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Load at boot so the first request doesn't pay for it
+    await run_in_threadpool(catalog.load)
+    yield
+
+
+app = Starlette(
+    routes=[
+        Route("/search", search),
+        Route("/type", type_ahead),
+        Route("/suggest", suggest),
+        Route("/summarize", summarize, methods=["POST"]),
+        Route("/health", health),
+        Route("/metrics", metrics),
+    ],
+    lifespan=lifespan,
+)
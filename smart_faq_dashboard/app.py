@@ -3,12 +3,17 @@ import pandas as pd
 import time
 from dotenv import load_dotenv
 import os
+import hashlib
+import requests
 
 # Load modules
-from src.data_loader import load_data
-from src.search_engine import smart_search, get_suggestion
-from src.llm_engine import generate_ai_summary
-from src.sms_sender import send_sms
+from src.data_loader import load_data, live_index
+from src.search_engine import smart_search, get_suggestions
+from src.search_index import FaqIndex, JAMO, SYLLABLE
+from src.search_client import remote_search, remote_suggestions
+from src.llm_engine import build_context, run_ai_summaries_batch, stream_ai_summary, ttft_summary
+from src.sms_queue import QUEUED, SENDING, SENT, FAILED, UNKNOWN, get_sms_dispatcher
+from src.tracing import tracer
 
 # Load environment variables
 load_dotenv()
@@ -72,6 +77,9 @@ with st.sidebar:
         st.info("✅ CSV 파일 사용 중")
     else:
         st.info("ℹ️ 기본/구글 시트 사용 중")
+
+    jamo_mode = st.checkbox("자모 단위 오타 검색 (초성 검색 지원)", help="예: '단백지쉐이크', 'ㄷㅂㅈ'")
+    search_mode = JAMO if jamo_mode else SYLLABLE
         
     st.divider()
     
@@ -88,7 +96,111 @@ with st.sidebar:
 
 # Placeholder URL - Replace with actual Google Sheet URL from env or input
 GOOGLE_SHEET_URL = os.environ.get("GOOGLE_SHEET_URL", "dummy_url")
-df = load_data(GOOGLE_SHEET_URL, uploaded_file)
+
+# With SEARCH_API_URL set, search and suggestions come from the headless API (api.py)
+# and this script stays a thin client; an uploaded CSV is still searched locally
+SEARCH_API_URL = None if uploaded_file else os.environ.get("SEARCH_API_URL")
+
+@st.cache_resource
+def get_search_index(df):
+    # Built once per loaded dataset and shared across reruns/sessions
+    return FaqIndex(df)
+
+if not SEARCH_API_URL:
+    df = load_data(GOOGLE_SHEET_URL, uploaded_file)
+    # CSV snapshots and Google Sheet syncs keep their own (prebuilt, live) index
+    search_index = live_index(df)
+    if search_index is None:
+        search_index = get_search_index(df)
+
+def run_search(query):
+    if SEARCH_API_URL:
+        try:
+            return remote_search(SEARCH_API_URL, query, search_mode)
+        except requests.RequestException as e:
+            # API down or erroring: say so instead of a traceback (and not "no results")
+            st.error(f"❌ 검색 서버 오류: 잠시 후 다시 시도해주세요. ({e})")
+            st.stop()
+    return smart_search(df, query, index=search_index, mode=search_mode)
+
+def run_suggestions(query, k):
+    if SEARCH_API_URL:
+        try:
+            return remote_suggestions(SEARCH_API_URL, query, k)
+        except requests.RequestException as e:
+            st.error(f"❌ 검색 서버 오류: 추천 키워드를 가져오지 못했습니다. ({e})")
+            return []
+    return get_suggestions(df, query, k=k, index=search_index)
+
+# SMS go through a persistent queue drained by background workers, so sending never blocks the UI
+sms_dispatcher = get_sms_dispatcher()
+
+def queue_sms(phone, message, state_key):
+    # The same text to the same number within a minute counts as a double click, not a new message
+    digest = hashlib.sha1(f"{phone}\x1f{message}".encode('utf-8')).hexdigest()
+    try:
+        st.session_state[state_key] = sms_dispatcher.enqueue(phone, message, f"{digest}:{int(time.time() // 60)}")
+        st.toast("📨 문자 발송 대기열에 추가되었습니다.")
+    except ValueError as e:
+        st.error(f"❌ 발송 실패: {e}")
+
+def show_sms_status(state_key):
+    # Only a job still in flight is polled; rows without a job or with a final status draw nothing live
+    job_id = st.session_state.get(state_key)
+    job = sms_dispatcher.status(job_id) if job_id is not None else None
+    if job is None:
+        return
+    if job['status'] in (QUEUED, SENDING):
+        poll_sms_status(state_key)
+    else:
+        render_sms_status(job)
+
+@st.fragment(run_every=2)
+def poll_sms_status(state_key):
+    job = sms_dispatcher.status(st.session_state.get(state_key))
+    if job is None or job['status'] not in (QUEUED, SENDING):
+        # Final: one full rerun redraws it as a static element and stops this timer
+        st.rerun(scope="app")
+    render_sms_status(job)
+
+def render_sms_status(job):
+    if job['status'] == SENT:
+        st.success(f"✅ 발송 성공: {job['detail']}")
+    elif job['status'] == FAILED:
+        st.error(f"❌ 발송 실패: {job['detail']}")
+    elif job['status'] == UNKNOWN:
+        # Resending could deliver the message twice, so the agent checks the provider first
+        st.warning(f"⚠️ 발송 결과 확인 필요 (문자 서비스 발송 내역을 확인한 뒤 다시 보내세요): {job['detail']}")
+    else:
+        retry = f" (재시도 {job['attempts']}회)" if job['attempts'] > 1 else ""
+        st.caption(f"⏳ 발송 중...{retry}")
+
+# Hidden admin panel: open the dashboard with ?admin=<ADMIN_TOKEN> (disabled when ADMIN_TOKEN is unset)
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+ADMIN_COLUMNS = ['count', 'errors', 'p50_ms', 'p95_ms', 'cache_hit_rate', 'rows', 'prompt_tokens', 'completion_tokens']
+
+@st.fragment(run_every=5)
+def show_admin_metrics():
+    # Live per-stage latency of this server process (all sessions)
+    stages = tracer.summary()
+    if not stages:
+        st.caption("아직 기록된 요청이 없습니다.")
+        return
+    table = pd.DataFrame.from_dict(stages, orient='index').reindex(columns=ADMIN_COLUMNS)
+    st.dataframe(table.dropna(axis=1, how='all').round(2), use_container_width=True)
+    ttft = ttft_summary()
+    if ttft['count']:
+        st.caption(f"AI 스트리밍 첫 토큰: p50 {ttft['p50'] * 1000:.0f} ms / p95 {ttft['p95'] * 1000:.0f} ms ({ttft['count']}건)")
+    st.download_button("Prometheus 메트릭 내려받기", tracer.prometheus(), file_name="metrics.txt")
+
+if ADMIN_TOKEN and st.query_params.get("admin") == ADMIN_TOKEN:
+    with st.sidebar:
+        with st.expander("📈 성능 모니터링 (관리자)", expanded=True):
+            show_admin_metrics()
+
+def batch_key(query, row):
+    # Identifies a FAQ row across reruns and result orderings
+    return (query, str(row['Product']), str(row['Question']))
 
 # 2. Search Bar
 col1, col2, col3 = st.columns([1, 2, 1])
@@ -97,10 +209,25 @@ with col2:
 
 # 3. Search Logic & Display
 if query:
-    results_df = smart_search(df, query)
+    results_df = run_search(query)
     
     if not results_df.empty:
         st.write(f"🔍 '**{query}**'에 대한 검색 결과 {len(results_df)}건")
+
+        # Summarize the top results concurrently instead of one click (and one API round-trip) at a time
+        batch_n = min(5, len(results_df))
+        if st.button(f"상위 {batch_n}건 AI 답변 한번에 생성", key="btn_ai_batch"):
+            current_api_key = api_key_input if api_key_input else os.environ.get("OPENAI_API_KEY")
+            items = []
+            for _, top_row in results_df.head(batch_n).iterrows():
+                top_context, top_packing = build_context(top_row, query)
+                items.append((top_context, query, top_packing['row_key']))
+            with st.spinner("AI가 상위 답변들을 동시에 요약 중입니다..."):
+                answers = run_ai_summaries_batch(items, api_key=current_api_key)
+            # Keyed by row identity, not result position: toggling jamo mode or a sheet sync can reorder results
+            st.session_state["batch_answers"] = {
+                batch_key(query, top_row): a for (_, top_row), a in zip(results_df.head(batch_n).iterrows(), answers)}
+        batch_answers = st.session_state.get("batch_answers", {})
         
         # Group by Product to show product-level cards initially? 
         # Or just show specific FAQ matches. Request asks for "Search Result Click -> Modal".
@@ -119,17 +246,22 @@ if query:
                     # Call LLM on demand to save tokens, or have a button? 
                     # Request says "AI Summary Section... real-time summary".
                     # Let's create a placeholder for the summary to load it async-ish or just run it.
-                    context = f"Product: {row['Product']}\nFAQ Answer: {row['Answer']}"
-                    if row['Manual']:
-                         context += f"\nManual: {row['Manual']}"
+                    if batch_key(query, row) in batch_answers:
+                        st.info(batch_answers[batch_key(query, row)])
                     
                     if st.button("AI 답변 생성", key=f"btn_ai_{index}"):
-                        with st.spinner("AI가 답변을 요약 중입니다..."):
-                            # Use input key or env key
-                            current_api_key = api_key_input if api_key_input else os.environ.get("OPENAI_API_KEY")
-                            ai_answer = generate_ai_summary(context, query, current_api_key)
-                            st.info(ai_answer)
-                            st.code(ai_answer, language="text") # Easy copy
+                        # Use input key or env key
+                        current_api_key = api_key_input if api_key_input else os.environ.get("OPENAI_API_KEY")
+                        # Long manuals are trimmed to the chunks most relevant to the query (only when asked:
+                        # packing every result on every rerun costs more than the search)
+                        context, packing = build_context(row, query)
+                        # Render tokens as they arrive instead of waiting behind a spinner
+                        ai_answer = st.write_stream(stream_ai_summary(context, query, current_api_key,
+                                                                     row_key=packing['row_key']))
+                        st.code(ai_answer, language="text") # Easy copy
+                        if packing['trimmed']:
+                            st.caption(f"프롬프트 토큰 {packing['prompt_tokens_before']:,} → {packing['prompt_tokens_after']:,} "
+                                       f"(본문 {packing['chunks_kept']}/{packing['chunks_total']} 조각 사용)")
                     
                     st.divider()
                     
@@ -147,35 +279,32 @@ if query:
                         # We need to decide WHAT to send. Let's send the FAQ answer by default.
                         msg_to_send = row['Answer'] 
                         if st.button("전송", key=f"btn_sms_{index}"):
-                            success, resp = send_sms(phone, msg_to_send)
-                            if success:
-                                st.toast(f"✅ 발송 성공: {resp}")
-                            else:
-                                st.error(f"❌ 발송 실패: {resp}")
+                            queue_sms(phone, msg_to_send, f"sms_job_{index}")
+                    show_sms_status(f"sms_job_{index}")
 
     else:
         # No results, try suggestion
-        suggestion = get_suggestion(df, query)
+        suggestions = run_suggestions(query, 3)
+        suggestion = suggestions[0][0] if suggestions else None
         if suggestion:
             st.warning(f"검색 결과가 없습니다. 혹시 '**{suggestion}**'을(를) 찾으시나요?")
+            if len(suggestions) > 1:
+                st.caption("다른 추천 키워드: " + ", ".join(s for s, _ in suggestions[1:]))
             if st.button(f"'{suggestion}'(으)로 검색하기"):
                 # Rerun search with suggestion
-                results_df = smart_search(df, suggestion)
+                results_df = run_search(suggestion)
                 st.write(f"🔍 '**{suggestion}**'에 대한 검색 결과 {len(results_df)}건")
                 for index, row in results_df.iterrows():
                      with st.container():
                         label = f"**[{row['Product']}]** {row['Question']} ({row['score']}%)"
                         with st.expander(label):
                             st.markdown("### 🤖 AI 요약 답변")
-                            context = f"Product: {row['Product']}\nFAQ Answer: {row['Answer']}"
-                            if 'Manual' in row and row['Manual']:
-                                 context += f"\nManual: {row['Manual']}"
                             
                             if st.button("AI 답변 생성", key=f"btn_ai_s_{index}"):
-                                with st.spinner("AI가 답변을 요약 중입니다..."):
-                                    current_api_key = api_key_input if api_key_input else os.environ.get("OPENAI_API_KEY")
-                                    ai_answer = generate_ai_summary(context, suggestion, current_api_key)
-                                    st.info(ai_answer)
+                                current_api_key = api_key_input if api_key_input else os.environ.get("OPENAI_API_KEY")
+                                context, packing = build_context(row, suggestion)
+                                ai_answer = st.write_stream(stream_ai_summary(context, suggestion, current_api_key,
+                                                                             row_key=packing['row_key']))
                             
                             st.divider()
                             st.markdown("### 📄 기존 매뉴얼/FAQ 답변")
@@ -188,9 +317,8 @@ if query:
                             with c_sms2:
                                 msg_to_send = row['Answer'] 
                                 if st.button("전송", key=f"btn_sms_s_{index}"):
-                                    success, resp = send_sms(phone, msg_to_send)
-                                    if success:
-                                        st.toast(f"✅ 발송 성공: {resp}")
+                                    queue_sms(phone, msg_to_send, f"sms_job_s_{index}")
+                            show_sms_status(f"sms_job_s_{index}")
         else:
             st.warning("검색 결과가 없습니다. 다른 키워드로 검색해보세요.")
 else:
@@ -0,0 +1,45 @@
+"""
+Prompt size before/after context packing over the rows of faq.csv.
+faq.csv has no Manual text, so each row gets a stand-in manual: every FAQ answer
+of the same product, which is the kind of long, mostly off-topic text packing is for.
+The query is the row's own Question.
+"""
+import numpy as np
+
+import common
+
+from src.context_packing import _estimate_tokens, token_counter
+from src.llm_engine import MODEL, build_context
+
+
+def percentiles(values):
+    values = np.asarray(values)
+    return f"mean {values.mean():>6.0f}  p50 {np.percentile(values, 50):>6.0f}  " \
+           f"p95 {np.percentile(values, 95):>6.0f}  max {values.max():>6.0f}"
+
+
+def main():
+    df = common.load_faq()
+    manuals = df.groupby('Product')['Answer'].apply(lambda answers: "\n\n".join(answers.dropna()))
+    rows = [dict(row, Manual=manuals[row['Product']]) for _, row in df.iterrows()]
+    counter = token_counter(MODEL)
+    print(f"{len(rows)} rows, token counter: {'estimate' if counter is _estimate_tokens else 'tiktoken'}")
+
+    for budget in (400, 800, 1600):
+        before, after, answer_kept, trimmed = [], [], 0, 0
+        _, seconds = common.timed(lambda: [build_context(r, r['Question'], budget=budget) for r in rows])
+        for row in rows:
+            context, report = build_context(row, row['Question'], budget=budget)
+            before.append(report['prompt_tokens_before'])
+            after.append(report['prompt_tokens_after'])
+            trimmed += report['trimmed']
+            answer_kept += " ".join(str(row['Answer']).split()) in " ".join(context.split())
+        print(f"\nbudget {budget} context tokens ({seconds / len(rows) * 1000:.2f} ms per row, "
+              f"{trimmed} rows trimmed, own FAQ answer kept in {answer_kept}/{len(rows)})")
+        print(f"  prompt tokens before  {percentiles(before)}  total {sum(before):,}")
+        print(f"  prompt tokens after   {percentiles(after)}  total {sum(after):,}"
+              f"  ({1 - sum(after) / sum(before):.0%} fewer)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Hybrid lexical + semantic search: recall of paraphrased questions, query latency and
+incremental re-embedding.
+
+LABELED maps questions worded differently from the FAQ (as customers actually ask them)
+to the faq.csv rows that answer them. recall@k is the share of these queries with an
+acceptable row among the first k results, for fuzzy-only and for hybrid ranking
+(smart_search defaults, semantic='hashing'). Keyword queries check that the hybrid top
+result still has the best fuzzy score where the wording already matches, and off-topic
+queries that semantic matching doesn't flood the results.
+"""
+import numpy as np
+
+from common import load_faq, scale_catalog, timed
+
+from src.embeddings import HASHING
+from src.search_engine import smart_search
+from src.search_index import FaqIndex
+from src.synonym_automaton import synonym_store
+from src.vector_index import VectorIndex, row_texts
+
+LABELED = {
+    "언제 먹어야 해요?": {0, 51, 95, 215, 10},
+    "BCAA 언제 먹어야 해요?": {0},
+    "활력샷 빈속에 먹어도 돼요?": {52},
+    "아이가 먹어도 되나요": {37, 39, 94, 216, 5, 24},
+    "머리카락 빠지는 부작용": {12, 28, 80, 151},
+    "잠이 안 와요": {70},
+    "비린 냄새": {32, 207},
+    "카페인 얼마나 들어있나요": {165, 169, 164},
+    "유통기한 지난 제품 먹어도 되나요": {34},
+    "약이랑 같이 먹어도 되나요": {33, 154},
+    "하루에 얼마나 먹어야 하나요": {54, 4, 71, 29, 36},
+    "물에 잘 안 녹아요": {96, 76},
+    "밥 대신 먹어도 되나요": {97},
+    "마카 효과 언제부터": {103},
+    "담배 피우는 사람": {107, 184},
+    "나이 드신 분 먹어도 되나요": {72, 206, 218},
+    "캡슐이 서로 붙었어요": {147, 191},
+    "원산지가 어디예요": {30, 64, 190, 42},
+    "운동 안 하는 날도 먹나요": {38, 79},
+}
+KEYWORD_QUERIES = ["환불", "bcaa 복용 방법", "단백질 쉐이크", "아르기닌 부작용", "블랙마카 성분", "프로틴 먹는법"]
+OFF_TOPIC_QUERIES = ["asdfgh", "ㅋㅋㅋ 뭐지", "날씨 어때요", "주식 추천"]
+SIZES = [10_000, 100_000]
+CHANGED_ROWS = 20
+
+
+def positions(index, query, semantic):
+    return index.match(query, semantic=semantic)[0]
+
+
+def recall(index, semantic, k):
+    # smart_search rewrites synonyms first; match() takes the rewritten query
+    hits = [bool(set(positions(index, synonym_store.rewrite(q), semantic)[:k].tolist()) & rows)
+            for q, rows in LABELED.items()]
+    return np.mean(hits)
+
+
+def main():
+    base = load_faq()
+    index = FaqIndex(base)
+    _, seconds = timed(index.vectors, HASHING)
+    print(f"embedded {len(base)} rows in {seconds * 1000:.0f} ms")
+
+    print(f"\n{len(LABELED)} paraphrased queries")
+    print(f"{'ranking':>10} {'recall@5':>9} {'recall@10':>10}")
+    for name, semantic in (("fuzzy", None), ("hybrid", HASHING)):
+        print(f"{name:>10} {recall(index, semantic, 5):>9.2f} {recall(index, semantic, 10):>10.2f}")
+
+    kept = 0
+    for q in KEYWORD_QUERIES:
+        fuzzy = index.score(synonym_store.rewrite(q))
+        kept += fuzzy[positions(index, synonym_store.rewrite(q), HASHING)[0]] == fuzzy.max()
+    print(f"keyword queries whose hybrid top result has the best fuzzy score: {kept}/{len(KEYWORD_QUERIES)}")
+    counts = [(len(positions(index, q, None)), len(positions(index, q, HASHING))) for q in OFF_TOPIC_QUERIES]
+    print(f"off-topic queries, results fuzzy -> hybrid: {counts}")
+
+    queries = list(LABELED) + KEYWORD_QUERIES
+    print(f"\n{'rows':>8} {'embed (s)':>10} {'fuzzy (ms)':>11} {'hybrid (ms)':>12}")
+    for size in SIZES:
+        df = scale_catalog(base, size)
+        index = FaqIndex(df)
+        index.ngrams
+        _, embed_seconds = timed(index.vectors, HASHING)
+        fuzzy_ms = np.mean([timed(smart_search, df, q, index=index, cache=None, semantic=None)[1] for q in queries])
+        hybrid_ms = np.mean([timed(smart_search, df, q, index=index, cache=None, semantic=HASHING)[1]
+                             for q in queries])
+        print(f"{size:>8} {embed_seconds:>10.2f} {fuzzy_ms * 1000:>11.1f} {hybrid_ms * 1000:>12.1f}")
+
+    # Sheet sync: a few edited rows are re-embedded, the rest of the matrix is reused
+    changed = np.random.default_rng(0).choice(len(df), CHANGED_ROWS, replace=False)
+    edited = df.copy()
+    edited.loc[changed, 'Answer'] = edited.loc[changed, 'Answer'].astype(str) + " (수정됨)"
+    updated, seconds = timed(index.updated, edited, changed)
+    _, vector_seconds = timed(index.vectors(HASHING).updated, len(edited), changed, row_texts(edited.iloc[changed]))
+    rebuilt, rebuild_seconds = timed(VectorIndex, row_texts(edited), HASHING)
+    exact = np.allclose(updated.vectors(HASHING).matrix, rebuilt.matrix)
+    print(f"\n{CHANGED_ROWS} of {len(df)} rows edited: index updated in {seconds:.2f} s "
+          f"(embeddings {vector_seconds:.2f} s vs {rebuild_seconds:.2f} s to re-embed everything), "
+          f"identical to a full rebuild: {exact}")
+
+
+if __name__ == "__main__":
+    main()
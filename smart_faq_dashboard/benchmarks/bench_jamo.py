@@ -0,0 +1,33 @@
+"""
+Per-query latency of jamo matching vs. the syllable matcher, plus what each finds
+for typo and choseong (initial consonant) queries.
+Both use smart_search's default n-gram pruning (CANDIDATE_LIMIT).
+"""
+from common import load_faq, scale_catalog, timed
+
+from src.search_engine import CANDIDATE_LIMIT
+from src.search_index import FaqIndex, JAMO, SYLLABLE
+
+QUERIES = ["단백지쉐이크", "단백질 쉐이그", "아르기넌", "블랙마가", "오메거3", "bcaa 복용 방법", "ㄷㅂㅈ", "ㅂㄹㅁㅋ"]
+SIZES = [258, 10_000]
+
+
+def main():
+    base = load_faq()
+    for size in SIZES:
+        df = base if size == len(base) else scale_catalog(base, size)
+        index = FaqIndex(df)
+        index.ngrams  # build the pruning index up front so it is not timed as a query
+        _, jamo_build_s = timed(lambda: index.jamo)
+        print(f"\n{len(df)} rows (jamo precompute {jamo_build_s * 1000:.1f} ms)")
+        print(f"{'query':<14} {'syllable(ms)':>12} {'jamo(ms)':>9} {'hits':>11}  top jamo hit")
+        for query in QUERIES:
+            syllable, syllable_s = timed(index.search, query, mode=SYLLABLE, max_candidates=CANDIDATE_LIMIT, repeat=5)
+            jamo, jamo_s = timed(index.search, query, mode=JAMO, max_candidates=CANDIDATE_LIMIT, repeat=5)
+            top = f"{jamo.iloc[0]['Product']} / {jamo.iloc[0]['Question'][:24]}" if len(jamo) else "-"
+            print(f"{query:<14} {syllable_s * 1000:>12.2f} {jamo_s * 1000:>9.2f} "
+                  f"{len(syllable):>5}/{len(jamo):<5}  {top}")
+
+
+if __name__ == "__main__":
+    main()
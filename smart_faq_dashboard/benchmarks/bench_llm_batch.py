@@ -0,0 +1,92 @@
+"""
+Client reuse and concurrent batch summaries against a local HTTP stand-in for
+the OpenAI API (fixed latency, occasional 429 with Retry-After).
+Counts the TCP connections the server saw, to show the pooled client reusing them.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from openai import OpenAI
+
+import common  # noqa: F401  (puts src on the path)
+
+from src.llm_clients import get_client
+from src.llm_engine import generate_ai_summary, run_ai_summaries_batch
+
+LATENCY = 0.15
+RATE_LIMIT_EVERY = 4  # every 4th request gets a 429
+N_RESULTS = 5
+
+
+class FakeOpenAI(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    lock = threading.Lock()
+    requests = 0
+    connections = set()
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with FakeOpenAI.lock:
+            FakeOpenAI.requests += 1
+            n = FakeOpenAI.requests
+            FakeOpenAI.connections.add(self.client_address)
+        time.sleep(LATENCY)
+
+        if n % RATE_LIMIT_EVERY == 0:
+            payload = json.dumps({"error": {"message": "Rate limit reached", "type": "requests"}}).encode()
+            self.send_response(429)
+            self.send_header("Retry-After", "0.2")
+        else:
+            question = body["messages"][-1]["content"].strip()[:30]
+            payload = json.dumps({
+                "id": f"chatcmpl-{n}", "object": "chat.completion", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": f"요약: {question}"}}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+            }).encode()
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def reset():
+    FakeOpenAI.requests = 0
+    FakeOpenAI.connections = set()
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpenAI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/v1"
+    items = [(f"Product: 상품{i}\nFAQ Answer: 답변 {i}", "복용 방법") for i in range(N_RESULTS)]
+
+    def run(label, fn):
+        reset()
+        start = time.perf_counter()
+        answers = fn()
+        seconds = time.perf_counter() - start
+        errors = sum(1 for a in answers if a.startswith("⚠️"))
+        print(f"{label:<34} {seconds * 1000:>7.0f} ms  requests={FakeOpenAI.requests:<3} "
+              f"connections={len(FakeOpenAI.connections):<3} errors={errors}")
+
+    # Old behaviour: new client (and connection pool) per summary, one at a time
+    run("new client per call, sequential",
+        lambda: [generate_ai_summary(c, q, client=OpenAI(api_key="sk-test", base_url=base_url),
+                                     cache=None, semantic=False) for c, q in items])
+    pooled = get_client("sk-test", base_url)
+    run("pooled client, sequential",
+        lambda: [generate_ai_summary(c, q, client=pooled, cache=None, semantic=False) for c, q in items])
+    run("pooled client, async batch (4)",
+        lambda: run_ai_summaries_batch(items, client=pooled, cache=None, semantic=False))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
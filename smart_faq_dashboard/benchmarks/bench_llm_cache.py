@@ -0,0 +1,65 @@
+"""
+Replays repeated AI-summary requests through generate_ai_summary with a stubbed
+OpenAI client (fixed simulated latency) and reports API calls, hit rate and time
+with and without the on-disk answer cache.
+"""
+import os
+import random
+import tempfile
+import time
+from types import SimpleNamespace
+
+from common import load_faq
+
+from src.llm_cache import AnswerCache
+from src.llm_engine import generate_ai_summary
+
+API_LATENCY = 0.05  # seconds per simulated completion
+REQUESTS = 200
+QUERY_VARIANTS = ["복용 방법 알려주세요", "복용 방법  알려주세요 ", "부작용 있나요?", "환불 가능한가요"]
+
+
+class StubCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, model, messages, temperature, **kwargs):
+        self.calls += 1
+        time.sleep(API_LATENCY)
+        answer = f"[{model}] {messages[-1]['content'].strip()[:40]}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=answer))])
+
+
+class StubClient:
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=StubCompletions())
+
+
+def replay(df, cache):
+    client = StubClient()
+    rng = random.Random(7)
+    # Traffic concentrated on a few popular FAQ rows, as in production
+    popular = df.head(20)
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        row = popular.iloc[min(int(rng.expovariate(0.3)), len(popular) - 1)]
+        context = f"Product: {row['Product']}\nFAQ Answer: {row['Answer']}"
+        generate_ai_summary(context, rng.choice(QUERY_VARIANTS), client=client, cache=cache)
+    return client.chat.completions.calls, time.perf_counter() - start
+
+
+def main():
+    df = load_faq()
+    calls, seconds = replay(df, cache=None)
+    print(f"no cache : {calls:>4} API calls, {seconds:.2f}s for {REQUESTS} requests")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = AnswerCache(path=os.path.join(tmp, 'answers.sqlite'))
+        calls, seconds = replay(df, cache)
+        hit_rate = cache.stats['hits'] / (cache.stats['hits'] + cache.stats['misses'])
+        print(f"cached   : {calls:>4} API calls, {seconds:.2f}s for {REQUESTS} requests, hit rate {hit_rate:.0%}")
+        print(f"totals   : {cache.totals()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Recall vs. latency of n-gram candidate pruning against the exhaustive scan.
+recall@10 = share of the exhaustive top-10 rows that the pruned search also ranks in its top-10.
+"""
+import numpy as np
+
+from common import load_faq, scale_catalog, timed
+
+from src.search_index import FaqIndex
+
+QUERIES = ["단백지쉐이크", "bcaa 복용 방법", "아르기닌 부작용", "블랙마카 성분", "프로틴 먹는법", "환불"]
+SIZES = [10_000, 100_000]
+CANDIDATE_LIMITS = [200, 1_000, 5_000]
+TOP_K = 10
+
+
+def top_positions(index, query, max_candidates):
+    scores = index.score(query, index.candidates(query, max_candidates))
+    return index.rank(scores, 55)[:TOP_K]
+
+
+def main():
+    base = load_faq()
+    for size in SIZES:
+        df = scale_catalog(base, size)
+        index = FaqIndex(df)
+        _, ngram_build_s = timed(lambda: index.ngrams)
+        print(f"\n{size} rows (n-gram index build {ngram_build_s * 1000:.0f} ms, "
+              f"{len(index.ngrams.postings)} grams)")
+        print(f"{'limit':>8} {'latency(ms)':>12} {'recall@10':>10}  단백지쉐이크 found")
+
+        exhaustive = {}
+        full_total = 0.0
+        for query in QUERIES:
+            exhaustive[query], seconds = timed(top_positions, index, query, None, repeat=3)
+            full_total += seconds
+        print(f"{'full':>8} {full_total / len(QUERIES) * 1000:>12.2f} {1.0:>10.2f}")
+
+        for limit in CANDIDATE_LIMITS:
+            total = 0.0
+            recalls = []
+            for query in QUERIES:
+                pruned, seconds = timed(top_positions, index, query, limit, repeat=3)
+                total += seconds
+                expected = exhaustive[query]
+                if len(expected):
+                    # Compare scores, not ids: duplicated rows in the scaled catalog tie with each other
+                    expected_scores = index.score(query)[expected]
+                    pruned_scores = np.sort(index.score(query)[pruned])[::-1]
+                    hits = sum(1 for a, b in zip(expected_scores, pruned_scores) if b >= a)
+                    recalls.append(hits / len(expected))
+            typo_found = len(top_positions(index, "단백지쉐이크", limit)) > 0
+            print(f"{limit:>8} {total / len(QUERIES) * 1000:>12.2f} {np.mean(recalls):>10.2f}  {typo_found}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Query result cache on a skewed query log: a handful of queries repeated all day,
+typed with varying spaces. Compares smart_search with and without the cache,
+checks both return the same results, and shows that new data (a new index
+version) is never answered from old entries.
+"""
+import random
+
+import numpy as np
+
+from common import load_faq, scale_catalog, timed
+
+from src.query_cache import QueryCache
+from src.search_engine import smart_search
+from src.search_index import FaqIndex
+
+HOT_QUERIES = ["복용 방법", "환불", "bcaa 복용 방법", "단백질 쉐이크", "아르기닌", "배송", "유통기한", "교환"]
+N_QUERIES = 3000
+SIZES = [258, 10_000]
+
+
+def query_log(df, n, seed=0):
+    rng = random.Random(seed)
+    products = list(df['Product'].dropna().astype(str).unique())
+    pool = HOT_QUERIES + products
+    weights = 1 / np.arange(1, len(pool) + 1)  # Zipf-like: a few queries dominate
+    log = []
+    for query in rng.choices(pool, weights=weights, k=n):
+        if rng.random() < 0.2:
+            query = f" {query.replace(' ', '  ')} "  # same query, sloppier spacing
+        log.append(query)
+    return log
+
+
+def same_results(a, b):
+    if a.empty or b.empty:
+        return a.empty and b.empty
+    return a['score'].tolist() == b['score'].tolist() and a['Question'].tolist() == b['Question'].tolist()
+
+
+def main():
+    base = load_faq()
+    log = query_log(base, N_QUERIES)
+    print(f"{len(log)} queries, {len(set(log))} distinct strings")
+    for size in SIZES:
+        df = scale_catalog(base, size)
+        index = FaqIndex(df)
+        cache = QueryCache()
+
+        uncached, uncached_s = timed(lambda: [smart_search(df, q, index=index, cache=None) for q in log])
+        cached, cached_s = timed(lambda: [smart_search(df, q, index=index, cache=cache) for q in log])
+        match = all(same_results(a, b) for a, b in zip(uncached, cached))
+        m = cache.metrics()
+        print(f"{size:>6} rows: no cache {uncached_s / len(log) * 1000:.2f} ms/query, "
+              f"cache {cached_s / len(log) * 1000:.2f} ms/query ({uncached_s / cached_s:.1f}x), "
+              f"hit rate {m['hit_rate']:.1%}, {m['entries']} entries, {m['bytes'] / 1024:.1f} KiB, match={match}")
+
+    # New data: one row changes, so the index gets a new version and the cache misses
+    df = base.copy()
+    index = FaqIndex(df)
+    cache = QueryCache()
+    smart_search(df, "환불", index=index, cache=cache)
+    changed = df.copy()
+    changed.loc[0, 'Question'] = "환불 규정 안내"
+    new_index = index.updated(changed, [0])
+    before = cache.metrics()['misses']
+    fresh = smart_search(changed, "환불", index=new_index, cache=cache)
+    print(f"after a data change: miss={cache.metrics()['misses'] - before == 1}, "
+          f"new row found={'환불 규정 안내' in fresh['Question'].tolist()}, "
+          f"versions cached={cache.metrics()['versions']}")
+
+
+if __name__ == "__main__":
+    main()
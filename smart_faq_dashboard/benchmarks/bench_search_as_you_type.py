@@ -0,0 +1,81 @@
+"""
+Search-as-you-type: replays the keystrokes of real queries, including the Hangul IME's
+intermediate states ("ㅎ" -> "화" -> "환" -> "환ㅂ" -> "환부" -> "환불"), and compares the
+per-keystroke latency of a full smart_search against an incremental SearchSession.
+recall@10 compares the session's final top-10 scores with the exhaustive search.
+"""
+import numpy as np
+
+from common import load_faq, scale_catalog, timed
+
+from src.incremental_search import SearchSession
+from src.search_engine import smart_search
+from src.search_index import FaqIndex
+from src.synonym_automaton import synonym_store
+
+QUERIES = ["환불", "bcaa 복용 방법", "단백질 쉐이크", "아르기닌 부작용", "블랙마카 성분", "프로틴 먹는법"]
+SIZES = [10_000, 100_000, 300_000]
+TOP_K = 10
+
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+
+
+def keystrokes(query):
+    """The text in the search box after each key press, as a Korean IME composes it."""
+    states = []
+    typed = ""
+    for ch in query:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            states.append(typed + _CHOSEONG[code // 588])      # initial consonant
+            if code % 28:
+                states.append(typed + chr(ord(ch) - code % 28))  # syllable without its final
+        typed += ch
+        states.append(typed)
+    return states
+
+
+def recall_at_k(index, query, positions):
+    query = synonym_store.rewrite(query)  # what the session actually searched for
+    exhaustive = index.rank(index.score(query), 55)[:TOP_K]
+    if not len(exhaustive):
+        return 1.0
+    expected = index.score(query)[exhaustive]
+    found = np.sort(index.score(query)[positions[:TOP_K]])[::-1]
+    return sum(1 for a, b in zip(expected, found) if b >= a) / len(expected)
+
+
+def main():
+    base = load_faq()
+    replay = [states for q in QUERIES for states in [keystrokes(q)]]
+    n_keys = sum(len(states) for states in replay)
+    print(f"{len(QUERIES)} queries, {n_keys} keystrokes")
+    print(f"{'rows':>8} {'full mean/p95 (ms)':>20} {'session mean/p95 (ms)':>22} {'recall@10':>10}")
+    for size in SIZES:
+        df = scale_catalog(base, size)
+        index = FaqIndex(df)
+        index.ngrams  # built at load time in practice (snapshot)
+
+        full_ms, session_ms, recalls = [], [], []
+        for states in replay:
+            session = SearchSession(index)
+            for text in states:
+                _, seconds = timed(smart_search, df, text, index=index, cache=None)
+                full_ms.append(seconds * 1000)
+                (positions, _), seconds = timed(session.type, text)
+                session_ms.append(seconds * 1000)
+            recalls.append(recall_at_k(index, states[-1], positions))
+        print(f"{size:>8} {np.mean(full_ms):>11.1f} / {np.percentile(full_ms, 95):>6.1f} "
+              f"{np.mean(session_ms):>13.1f} / {np.percentile(session_ms, 95):>6.1f} {np.mean(recalls):>10.2f}")
+
+    # Fast typing: every keystroke is submitted at once; only the last one must finish
+    session = SearchSession(index)
+    futures = [session.submit(text) for text in keystrokes("bcaa 복용 방법")]
+    final = futures[-1].result()
+    print(f"\nsubmitted {len(futures)} keystrokes at once: {session.stats['cancelled']} superseded searches "
+          f"cancelled, final result has {len(final[0])} rows")
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
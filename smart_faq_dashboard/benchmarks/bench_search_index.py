@@ -0,0 +1,45 @@
+"""
+Legacy iterrows scan vs. prebuilt FaqIndex at 1k / 10k / 100k rows.
+Also checks that both return the same ranking and scores.
+"""
+from common import legacy_smart_search, load_faq, scale_catalog, timed
+
+from src.search_index import FaqIndex
+
+QUERIES = ["bcaa 복용 방법", "단백질 쉐이크", "단백지쉐이크", "아르기닌", "환불"]
+SIZES = [1_000, 10_000, 100_000]
+
+
+def same_results(a, b):
+    if a.empty or b.empty:
+        return a.empty and b.empty
+    return (a['score'].tolist() == b['score'].tolist()
+            and a['Question'].tolist() == b['Question'].tolist()
+            and a['Model'].tolist() == b['Model'].tolist())
+
+
+def main():
+    base = load_faq()
+    print(f"{'rows':>8} {'build(ms)':>10} {'legacy(ms)':>11} {'index(ms)':>10} {'speedup':>8}  match")
+    for size in SIZES:
+        df = scale_catalog(base, size)
+        index, build_s = timed(FaqIndex, df)
+
+        # The legacy scan is slow at 100k rows, so time it once per query
+        legacy_total = index_total = 0.0
+        match = True
+        for query in QUERIES:
+            expected, legacy_s = timed(legacy_smart_search, df, query)
+            actual, index_s = timed(index.search, query, repeat=3)
+            legacy_total += legacy_s
+            index_total += index_s
+            match = match and same_results(expected, actual)
+
+        legacy_ms = legacy_total / len(QUERIES) * 1000
+        index_ms = index_total / len(QUERIES) * 1000
+        print(f"{size:>8} {build_s * 1000:>10.1f} {legacy_ms:>11.1f} {index_ms:>10.2f} "
+              f"{legacy_ms / index_ms:>7.1f}x  {match}")
+
+
+if __name__ == "__main__":
+    main()
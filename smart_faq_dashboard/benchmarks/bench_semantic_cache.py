@@ -0,0 +1,81 @@
+"""
+Reworded questions against the same FAQ rows: exact answer cache alone vs.
+exact + semantic cache, using the stub client from bench_llm_cache.
+Also reports semantic lookup latency as the cache fills up, and the similarity of
+question / negated question pairs, which must stay below the threshold.
+Uses the model named by SEMANTIC_CACHE when set, else the hashing embedder (surface
+form only, so its reuse numbers are not representative of a real model).
+"""
+import os
+import random
+import tempfile
+
+from bench_llm_cache import StubClient
+from common import load_faq, timed
+
+from src.embeddings import HASHING, get_embedder
+from src.llm_cache import AnswerCache
+from src.llm_engine import SEMANTIC_CACHE_MODEL, generate_ai_summary
+from src.semantic_cache import SIMILARITY_THRESHOLD, SemanticCache
+
+REQUESTS = 200
+# Groups of rewordings agents actually type for the same intent
+INTENTS = [
+    ["bcaa 복용 방법", "BCAA 복용방법은?", "bcaa 복용 방법 알려주세요", "BCAA 복용 방법이 궁금해요"],
+    ["부작용 있나요", "부작용 있나요?", "부작용이 있나요", "혹시 부작용 있나요"],
+    ["환불 가능한가요", "환불 가능한가요?", "환불 가능 한가요", "환불이 가능한가요"],
+]
+# Questions whose answers are opposite; reusing one for the other is wrong
+NEGATION_PAIRS = [
+    ("환불 가능한가요", "환불 불가능한가요"),
+    ("배송 되나요", "배송 안 되나요"),
+    ("임산부 먹어도 되나요", "임산부 먹으면 안 되나요"),
+]
+
+
+def replay(df, cache, semantic):
+    client = StubClient()
+    rng = random.Random(11)
+    rows = df.head(10)
+    for _ in range(REQUESTS):
+        row = rows.iloc[rng.randrange(len(rows))]
+        context = f"Product: {row['Product']}\nFAQ Answer: {row['Answer']}"
+        query = rng.choice(rng.choice(INTENTS))
+        generate_ai_summary(context, query, client=client, cache=cache, semantic=semantic)
+    return client.chat.completions.calls
+
+
+def main():
+    df = load_faq()
+    model = SEMANTIC_CACHE_MODEL if SEMANTIC_CACHE_MODEL not in (None, "1") else HASHING
+    embed = get_embedder(model)
+    print(f"embedder: {model}, threshold {SIMILARITY_THRESHOLD}")
+    with tempfile.TemporaryDirectory() as tmp:
+        exact_only = replay(df, AnswerCache(path=os.path.join(tmp, 'a.sqlite')), semantic=False)
+        semantic = SemanticCache(embed)
+        with_semantic = replay(df, AnswerCache(path=os.path.join(tmp, 'b.sqlite')), semantic=semantic)
+
+    print(f"exact cache only    : {exact_only} API calls for {REQUESTS} requests")
+    print(f"exact + semantic    : {with_semantic} API calls for {REQUESTS} requests")
+    metrics = semantic.metrics()
+    print(f"semantic hit rate {metrics['hit_rate']:.0%}, near-duplicate reuse {metrics['near_duplicate_rate']:.0%}, "
+          f"mean hit similarity {metrics['mean_hit_similarity']:.2f}")
+
+    print("\nnegation pairs:")
+    for a, b in NEGATION_PAIRS:
+        vectors = embed([a, b])
+        similarity = float(vectors[0] @ vectors[1])
+        verdict = "REUSED (wrong answer)" if similarity >= SIMILARITY_THRESHOLD else "kept apart"
+        print(f"  {a} / {b}: {similarity:.3f} {verdict}")
+
+    print(f"\n{'entries/row':>11} {'lookup(us)':>11}")
+    for n in (8, 32, 256):
+        cache = SemanticCache(embed, max_entries_per_row=n)
+        for i in range(n):
+            cache.add("row", f"질문 {i} 복용 방법", "answer")
+        _, seconds = timed(cache.lookup, "row", "bcaa 복용 방법", repeat=200)
+        print(f"{n:>11} {seconds * 1e6:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Sharded multi-process search: throughput vs. worker count on synthetic catalogs.
+
+For each catalog size, replays the queries through FaqIndex.match (one process,
+exhaustive) and through ShardedSearch with 1, 2, 4 ... workers, top-50 per query.
+Throughput is measured with as many concurrent callers as workers (each query still
+fans out to every shard). Results are checked against FaqIndex.match.
+Scaling needs that many free cores: on a machine with fewer cores than workers the
+shards just take turns.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from common import load_faq, scale_catalog, timed
+
+from src.search_index import FaqIndex
+from src.sharded_search import ShardedSearch
+from src.synonym_automaton import synonym_store
+
+QUERIES = ["환불", "bcaa 복용 방법", "단백질 쉐이크", "아르기닌 부작용", "블랙마카 성분", "프로틴 먹는법",
+           "오메가3 냄새", "유통기한", "크레아틴 탈모", "마그네슘 킬레이트"]
+SIZES = [100_000, 300_000]
+WORKERS = [1, 2, 4]
+TOP_K = 50
+ROUNDS = 2  # replays of the query set per measurement
+
+
+def throughput(match, queries, callers):
+    """Queries per second with `callers` threads issuing queries concurrently."""
+    work = queries * ROUNDS
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        _, seconds = timed(lambda: list(pool.map(match, work)))
+    return len(work) / seconds
+
+
+def main():
+    base = load_faq()
+    queries = [synonym_store.rewrite(q) for q in QUERIES]
+    print(f"{os.cpu_count()} CPU(s), {len(queries)} queries x {ROUNDS}, top-{TOP_K}")
+    print(f"{'rows':>8} {'engine':>14} {'start (s)':>10} {'q/s':>8} {'same':>5}")
+    for size in SIZES:
+        index = FaqIndex(scale_catalog(base, size))
+        expected = {q: index.match(q, max_candidates=None) for q in queries}
+        qps = throughput(lambda q: index.match(q, max_candidates=None), queries, 1)
+        print(f"{size:>8} {'FaqIndex':>14} {'-':>10} {qps:>8.1f} {'-':>5}")
+
+        for workers in WORKERS:
+            sharded, start_seconds = timed(ShardedSearch, index, workers=workers)
+            with sharded:
+                same = all(np.array_equal(sharded.match(q, k=TOP_K)[0], expected[q][0][:TOP_K]) and
+                           np.array_equal(sharded.match(q, k=TOP_K)[1], expected[q][1][:TOP_K]) for q in queries)
+                qps = throughput(lambda q: sharded.match(q, k=TOP_K), queries, workers)
+            print(f"{size:>8} {f'{workers} worker(s)':>14} {start_seconds:>10.1f} {qps:>8.1f} "
+                  f"{str(same):>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Incremental Google Sheets sync against a local fake worksheet.
+Compares a full reload (get_all_records + FaqIndex rebuild, the old TTL path)
+with SheetSync refreshes after a few edits, in hash mode and revision-column mode,
+and checks the synced index matches a fresh build.
+"""
+import copy
+
+import pandas as pd
+
+from common import load_faq, scale_catalog, timed
+
+from src.data_loader import clean_dataframe
+from src.search_index import FaqIndex
+from src.sheet_sync import SheetSync
+
+SIZES = [258, 10_000]
+
+
+class FakeWorksheet:
+    """In-memory stand-in for gspread.Worksheet (values, including the header row)."""
+
+    def __init__(self, values):
+        self.values = values
+        self.calls = {'get_all_values': 0, 'get_all_records': 0, 'col_values': 0, 'batch_get': 0}
+        self.cells_sent = 0
+
+    def get_all_values(self):
+        self.calls['get_all_values'] += 1
+        self.cells_sent += sum(len(r) for r in self.values)
+        return copy.deepcopy(self.values)
+
+    def get_all_records(self):
+        self.calls['get_all_records'] += 1
+        self.cells_sent += sum(len(r) for r in self.values)
+        header = self.values[0]
+        return [dict(zip(header, row)) for row in self.values[1:]]
+
+    def col_values(self, col):
+        self.calls['col_values'] += 1
+        column = [row[col - 1] if col - 1 < len(row) else '' for row in self.values]
+        while column and column[-1] == '':
+            column.pop()
+        self.cells_sent += len(column)
+        return column
+
+    def batch_get(self, ranges):
+        self.calls['batch_get'] += 1
+        results = []
+        for a1 in ranges:
+            start, end = a1.split(':')
+            first = int(''.join(ch for ch in start if ch.isdigit()))
+            last = int(''.join(ch for ch in end if ch.isdigit()))
+            block = [list(row) for row in self.values[first - 1:last]]
+            self.cells_sent += sum(len(r) for r in block)
+            results.append(block)
+        return results
+
+
+def sheet_values(df, with_revision):
+    header = list(df.columns) + (['Updated'] if with_revision else [])
+    rows = [[str(v) for v in row] + ([f'{i}-r0'] if with_revision else [])
+            for i, row in enumerate(df.itertuples(index=False))]
+    return [header] + rows
+
+
+def edit(sheet, with_revision):
+    """A handful of agent edits: two updates, one append, one delete from the end."""
+    width = len(sheet.values[0])
+    sheet.values[5][3] = "수정된 질문입니다"
+    sheet.values[-10][0] = "신상품"
+    sheet.values.pop()
+    sheet.values.append(list(sheet.values[1]))
+    if with_revision:
+        for n, row in enumerate((sheet.values[5], sheet.values[-10], sheet.values[-1])):
+            row[width - 1] = f"edit{n}-r1"
+
+
+def full_reload(sheet):
+    df = clean_dataframe(pd.DataFrame(sheet.get_all_records()))
+    return FaqIndex(df)
+
+
+def main():
+    base = load_faq()
+    print(f"{'rows':>7} {'mode':>9} {'full reload(ms)':>16} {'sync(ms)':>9} {'cells fetched':>14} {'changed':>8}  matches")
+    for size in SIZES:
+        df = base if size == len(base) else scale_catalog(base, size)
+        for with_revision in (False, True):
+            sheet = FakeWorksheet(sheet_values(df, with_revision))
+            sync = SheetSync(sheet, name="bench", revision_column='Updated' if with_revision else None,
+                             prepare=clean_dataframe)
+            sync.refresh()
+            sync.index.jamo  # warm structures a running app would already have
+
+            edit(sheet, with_revision)
+            _, full_s = timed(full_reload, FakeWorksheet(copy.deepcopy(sheet.values)))
+
+            sheet.cells_sent = 0
+            changed, sync_s = timed(sync.refresh)
+            reference = FaqIndex(clean_dataframe(pd.DataFrame(sheet.values[1:], columns=sheet.values[0])))
+            matches = (sync.index.targets == reference.targets and sync.index.jamo == reference.jamo)
+
+            mode = 'revision' if with_revision else 'hash'
+            print(f"{size:>7} {mode:>9} {full_s * 1000:>16.1f} {sync_s * 1000:>9.1f} "
+                  f"{sheet.cells_sent:>14} {changed:>8}  {matches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+SMS sending against a local mock of the Solapi send-many endpoint: the old way
+(one blocking requests.post per message, on the UI thread) versus the queue
+(enqueue returns at once; workers send batches over pooled sessions).
+The mock adds latency, answers some requests with 429 (nothing accepted, safe to
+resend), and "loses" the response of others after accepting them (503). Like the real
+provider it does not deduplicate, so resending a 503 batch would deliver it twice:
+those jobs must end up 'unknown' instead, and no number may receive a message twice.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+import common  # noqa: F401  (puts src on the path)
+
+from src import sms_queue
+from src.sms_queue import SmsDispatcher, SmsQueue
+from src.sms_sender import SolapiProvider, generate_auth_headers
+
+LATENCY = 0.08           # seconds per request
+RATE_LIMIT_EVERY = 7     # every 7th request: 429, nothing accepted
+LOST_RESPONSE_EVERY = 5  # every 5th request: messages accepted, then 503
+N_MESSAGES = 300
+
+
+class FakeSolapi(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    requests = 0
+    delivered = {}  # idempotency key -> times delivered to a phone
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        messages = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["messages"]
+        time.sleep(LATENCY)
+        with FakeSolapi.lock:
+            FakeSolapi.requests += 1
+            n = FakeSolapi.requests
+        if n % RATE_LIMIT_EVERY == 0:
+            return self._reply(429, {"errorCode": "TooManyRequests"})
+
+        failed = []
+        with FakeSolapi.lock:
+            for m in messages:
+                key = m["customFields"]["idempotencyKey"]
+                if not m["to"].startswith("010"):
+                    failed.append({"to": m["to"], "customFields": m["customFields"],
+                                   "statusCode": "1062", "statusMessage": "Invalid recipient"})
+                else:
+                    FakeSolapi.delivered[key] = FakeSolapi.delivered.get(key, 0) + 1
+        if n % LOST_RESPONSE_EVERY == 0:
+            return self._reply(503, {"errorCode": "ServiceUnavailable"})
+        self._reply(200, {"groupInfo": {"groupId": f"G{n}"}, "failedMessageList": failed})
+
+
+def reset():
+    FakeSolapi.requests = 0
+    FakeSolapi.delivered = {}
+
+
+def duplicates():
+    return sum(n - 1 for n in FakeSolapi.delivered.values())
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeSolapi)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    provider = SolapiProvider("key", "secret", "01000000000", base_url=base_url)
+    phones = [f"010{i:08d}" if i % 50 else "0001234" for i in range(N_MESSAGES)]  # every 50th is invalid
+    messages = [f"주문하신 상품 안내 #{i}" for i in range(N_MESSAGES)]
+
+    # Old way: the button handler blocks on one request per message
+    reset()
+    blocked = []
+    start = time.perf_counter()
+    for i, (phone, text) in enumerate(zip(phones, messages)):
+        t = time.perf_counter()
+        data = {"messages": [{"to": phone, "from": provider.sender, "text": text,
+                              "customFields": {"idempotencyKey": f"sync-{i}"}}]}
+        requests.post(f"{base_url}/messages/v4/send-many/detail",
+                      headers=generate_auth_headers("key", "secret"), json=data, timeout=10)
+        blocked.append(time.perf_counter() - t)
+    total = time.perf_counter() - start
+    print(f"blocking send    : {total:6.2f} s for {N_MESSAGES} messages, UI blocked "
+          f"{sum(blocked) / len(blocked) * 1000:.0f} ms per click, requests={FakeSolapi.requests}, "
+          f"delivered={len(FakeSolapi.delivered)} (no retries: rate-limited messages are lost)")
+
+    # Queue: enqueue returns immediately, workers batch and retry
+    reset()
+    sms_queue.BACKOFF_BASE = 0.05  # keep the benchmark short
+    with tempfile.TemporaryDirectory() as tmp:
+        dispatcher = SmsDispatcher(SmsQueue(os.path.join(tmp, "sms.sqlite")), provider, workers=2)
+        provider.batch_size = 25
+        dispatcher.start()
+        start = time.perf_counter()
+        ids = []
+        enqueue_times = []
+        for phone, text in zip(phones, messages):
+            t = time.perf_counter()
+            ids.append(dispatcher.enqueue(phone, text))
+            enqueue_times.append(time.perf_counter() - t)
+        # A double click re-enqueues with the same key: no new job
+        assert dispatcher.enqueue(phones[1], messages[1], dispatcher.status(ids[1])['idempotency_key']) == ids[1]
+
+        while dispatcher.queue.counts().get(sms_queue.QUEUED, 0) + dispatcher.queue.counts().get(sms_queue.SENDING, 0):
+            time.sleep(0.02)
+        total = time.perf_counter() - start
+        dispatcher.stop()
+        counts = dispatcher.queue.counts()
+
+    print(f"queued dispatch  : {total:6.2f} s for {N_MESSAGES} messages, UI blocked "
+          f"{sum(enqueue_times) / len(enqueue_times) * 1000:.2f} ms per click, requests={FakeSolapi.requests}, "
+          f"retries={dispatcher.stats['retries']}")
+    unknown_delivered = sum(dispatcher.queue.status(i)['idempotency_key'] in FakeSolapi.delivered
+                            for i in ids if dispatcher.queue.status(i)['status'] == sms_queue.UNKNOWN)
+    print(f"                   jobs {counts}, delivered={len(FakeSolapi.delivered)}, "
+          f"delivered twice={duplicates()}, 'unknown' jobs actually delivered={unknown_delivered}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Cold start: CSV parse + clean + index build vs. loading the binary snapshot.
+Scaled catalogs are written as cp949 CSVs (the encoding fallback path agents hit
+with Excel exports) into a temp folder, next to their snapshots.
+"""
+import os
+import tempfile
+
+from common import load_faq, scale_catalog, timed
+
+from src import snapshot
+from src.data_loader import clean_dataframe, read_csv_robust
+
+SIZES = [258, 10_000, 100_000]
+
+
+def csv_path_load(path):
+    df = clean_dataframe(read_csv_robust(path))
+    return snapshot.prebuild(snapshot.FaqIndex(df))
+
+
+def main():
+    base = load_faq()
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot.SNAPSHOT_DIR = tmp
+        print(f"{'rows':>8} {'encoding':>9} {'csv(ms)':>9} {'snapshot(ms)':>13} {'speedup':>8} {'size(MB)':>9}")
+        for size in SIZES:
+            df = base if size == len(base) else scale_catalog(base, size)
+            for encoding in ['utf-8-sig', 'cp949']:
+                path = os.path.join(tmp, f"faq_{size}_{encoding}.csv")
+                df.to_csv(path, index=False, encoding=encoding, errors='replace')
+                digest = snapshot.content_digest(path)
+
+                _, csv_s = timed(csv_path_load, path)
+                snapshot.save_index(digest, clean_dataframe(read_csv_robust(path)))
+                snapshot_file = snapshot.snapshot_path(digest)
+                # Time the hash + disk read a fresh process would do (skip the in-process memo)
+                _, snap_s = timed(lambda: (snapshot.content_digest(path), snapshot.read_snapshot(snapshot_file)))
+
+                size_mb = os.path.getsize(snapshot_file) / 1e6
+                print(f"{size:>8} {encoding:>9} {csv_s * 1000:>9.1f} {snap_s * 1000:>13.1f} "
+                      f"{csv_s / snap_s:>7.1f}x {size_mb:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Perceived latency of streamed vs. blocking AI summaries against a local fake
+client that emits chunks like the OpenAI streaming API (first token after a
+fixed delay, then one chunk every few ms).
+"""
+import time
+from types import SimpleNamespace
+
+import common  # noqa: F401  (puts src on the path)
+
+from src.llm_engine import generate_ai_summary, stream_ai_summary, ttft_summary
+
+FIRST_TOKEN_DELAY = 0.4
+CHUNK_DELAY = 0.02
+ANSWER = "익스트림 BCAA 제품은 운동 중 혹은 운동 후 1스쿱(10g)을 300~400ml의 물에 희석해 섭취하시면 됩니다. 고강도 운동 시 컨디션 향상에 도움을 줄 수 있습니다."
+
+
+def _chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class FakeCompletions:
+    def create(self, model, messages, temperature, stream=False, **kwargs):
+        pieces = [ANSWER[i:i + 4] for i in range(0, len(ANSWER), 4)]
+        if not stream:
+            time.sleep(FIRST_TOKEN_DELAY + CHUNK_DELAY * len(pieces))
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=ANSWER))])
+        return self._stream(pieces)
+
+    def _stream(self, pieces):
+        time.sleep(FIRST_TOKEN_DELAY)
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=None))])  # role chunk
+        for i, piece in enumerate(pieces):
+            if i:
+                time.sleep(CHUNK_DELAY)
+            yield _chunk(piece)
+        yield SimpleNamespace(choices=[])  # usage-only chunk
+
+
+class FakeClient:
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=FakeCompletions())
+
+
+def main():
+    context, query = "Product: BCAA\nFAQ Answer: ...", "bcaa 복용 방법"
+
+    start = time.perf_counter()
+    blocking = generate_ai_summary(context, query, client=FakeClient(), cache=None, semantic=False)
+    blocking_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    first = None
+    parts = []
+    for chunk in stream_ai_summary(context, query, client=FakeClient(), cache=None, semantic=False):
+        if first is None:
+            first = time.perf_counter() - start
+        parts.append(chunk)
+    stream_s = time.perf_counter() - start
+
+    print(f"blocking : answer visible after {blocking_s * 1000:.0f} ms")
+    print(f"streaming: first text after {first * 1000:.0f} ms, complete after {stream_s * 1000:.0f} ms")
+    print(f"same answer: {''.join(parts) == blocking}, recorded TTFT: {ttft_summary()}")
+
+
+if __name__ == "__main__":
+    main()
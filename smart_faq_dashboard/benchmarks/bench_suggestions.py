@@ -0,0 +1,53 @@
+"""
+"Did you mean" latency: the original per-call keyword scan vs. the prebuilt BK-tree.
+'same' checks that both find a keyword with the same best score.
+Scaled catalogs add numbered Model keywords, so the vocabulary grows with the rows.
+"""
+from thefuzz import fuzz, process
+
+from common import load_faq, scale_catalog, timed
+
+from src.search_index import FaqIndex
+
+QUERIES = ["블랙마가", "아르기넌", "밀크씨쓸", "퍼스트팽귄", "BCAA타우린", "xyz"]
+SIZES = [258, 10_000, 100_000]
+
+
+def legacy_get_suggestion(df, query):
+    keywords = set()
+    keywords.update(df['Product'].dropna().unique())
+    keywords.update(df['Model'].dropna().unique())
+    for tags in df['Tags'].dropna():
+        if isinstance(tags, str):
+            keywords.update([t.strip() for t in tags.split(',')])
+    best_match = process.extractOne(query, keywords, scorer=fuzz.ratio)
+    if best_match and best_match[1] > 50:
+        return best_match  # (keyword, score)
+    return None
+
+
+def main():
+    base = load_faq()
+    print(f"{'rows':>8} {'keywords':>9} {'build(ms)':>10} {'legacy(ms)':>11} {'bktree(ms)':>11}  same")
+    for size in SIZES:
+        df = base if size == len(base) else scale_catalog(base, size)
+        index = FaqIndex(df)
+        suggestions, build_s = timed(lambda: index.suggestions)
+
+        legacy_total = tree_total = 0.0
+        same = True
+        for query in QUERIES:
+            expected, legacy_s = timed(legacy_get_suggestion, df, query)
+            actual, tree_s = timed(suggestions.suggest, query, 1, repeat=5)
+            legacy_total += legacy_s
+            tree_total += tree_s
+            expected_score = expected[1] if expected else None
+            actual_score = actual[0][1] if actual else None
+            same = same and expected_score == actual_score
+
+        print(f"{len(df):>8} {len(suggestions):>9} {build_s * 1000:>10.1f} "
+              f"{legacy_total / len(QUERIES) * 1000:>11.2f} {tree_total / len(QUERIES) * 1000:>11.2f}  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Search benchmark and relevance regression suite.
+
+Replays the labeled queries in relevance_queries.json (exact, typo, synonym, paraphrase and
+zero-result cases) against faq.csv and synthetic 10x / 100x catalogs, and reports:
+  - per-stage latency: load (CSV parse + clean), index build, normalize (synonyms),
+    candidates (n-gram pruning), score, sort, DataFrame build, plus end-to-end smart_search and get_suggestion
+  - peak Python memory (tracemalloc) for loading + indexing and for the query replay
+  - relevance: MRR and recall@5 per query kind, plus how many zero-result queries stay empty
+Scaled catalogs repeat faq.csv, so a result row counts as its original row (position modulo
+the base size) and repeated copies of a row are only counted once.
+
+Results are written as JSON so runs can be compared between commits:
+    python benchmarks/bench_suite.py --output before.json
+    (change something)
+    python benchmarks/bench_suite.py --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from common import ROOT, load_faq, scale_catalog
+
+from src.data_loader import clean_dataframe, read_csv_robust
+from src.query_cache import normalize_query
+from src.search_engine import CANDIDATE_LIMIT, SEMANTIC_MODEL, get_suggestion, smart_search
+from src.search_index import DEFAULT_THRESHOLDS, FaqIndex, SYLLABLE, resolve_mode
+from src.snapshot import prebuild
+from src.synonym_automaton import synonym_store
+
+QUERIES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'relevance_queries.json')
+SCALES = [1, 10, 100]
+REPEAT = 3  # replays of the query set per catalog (latency samples = queries x REPEAT)
+TOP_K = 5
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_queries(path=QUERIES_PATH):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['queries']
+
+
+def summarize(samples):
+    """Latency samples (seconds) as mean / p50 / p95 in milliseconds."""
+    ms = np.asarray(samples) * 1000
+    return {'mean_ms': round(float(ms.mean()), 3), 'p50_ms': round(float(np.percentile(ms, 50)), 3),
+            'p95_ms': round(float(np.percentile(ms, 95)), 3)}
+
+
+def timer(stages, name, fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    stages.setdefault(name, []).append(time.perf_counter() - start)
+    return result
+
+
+def run_stages(index, query, mode, stages):
+    """smart_search's fuzzy path split into timed stages."""
+    query = timer(stages, 'normalize', lambda q: normalize_query(synonym_store.rewrite(q)), query)
+    threshold = DEFAULT_THRESHOLDS[resolve_mode(query, mode)]
+    positions = timer(stages, 'candidates', index.candidates, query, CANDIDATE_LIMIT, mode)
+    scores = timer(stages, 'score', index.score, query, positions, mode)
+    ranked = timer(stages, 'sort', index.rank, scores, threshold)
+    timer(stages, 'dataframe', index.build_results, ranked, scores[ranked])
+
+
+def base_rows(positions, base_size):
+    """Result positions mapped to faq.csv rows, first occurrence of each row only."""
+    seen = []
+    for pos in positions:
+        row = int(pos) % base_size
+        if row not in seen:
+            seen.append(row)
+    return seen
+
+
+def relevance(ranked_rows, queries):
+    """MRR and recall@TOP_K per query kind and overall; zero-result queries report the share left empty."""
+    by_kind = {}
+    for q, rows in zip(queries, ranked_rows):
+        relevant = set(q['relevant'])
+        if not relevant:
+            by_kind.setdefault(q['kind'], {'empty': []})['empty'].append(not rows)
+            continue
+        rank = next((i for i, row in enumerate(rows) if row in relevant), None)
+        metrics = by_kind.setdefault(q['kind'], {'mrr': [], f'recall@{TOP_K}': []})
+        metrics['mrr'].append(0.0 if rank is None else 1.0 / (rank + 1))
+        metrics[f'recall@{TOP_K}'].append(len(relevant & set(rows[:TOP_K])) / len(relevant))
+
+    overall = {'mrr': [], f'recall@{TOP_K}': []}
+    for metrics in by_kind.values():
+        for name in overall:
+            overall[name].extend(metrics.get(name, []))
+    by_kind['all'] = overall
+
+    report = {}
+    for kind, metrics in by_kind.items():
+        values = next(iter(metrics.values()))
+        report[kind] = {'queries': len(values), **{name: round(float(np.mean(v)), 4) for name, v in metrics.items()}}
+    return report
+
+
+def bench_catalog(base, scale, queries, mode, repeat):
+    df = scale_catalog(base, len(base) * scale)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'catalog.csv')
+        df.to_csv(path, index=False, encoding='utf-8-sig')
+
+        # Load and index once for timings, once under tracemalloc for the memory peak
+        start = time.perf_counter()
+        df = clean_dataframe(read_csv_robust(path))
+        load_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        index = prebuild(FaqIndex(df))
+        index_seconds = time.perf_counter() - start
+
+        tracemalloc.start()
+        prebuild(FaqIndex(clean_dataframe(read_csv_robust(path))))
+        load_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    stages = {}
+    ranked_rows = []
+    for i in range(repeat):
+        for q in queries:
+            run_stages(index, q['query'], mode, stages)
+            results = timer(stages, 'search', smart_search, df, q['query'], index=index, mode=mode, cache=None)
+            if not len(results):
+                timer(stages, 'suggestion', get_suggestion, df, q['query'], index=index)
+            if i == 0:
+                positions = index.match(normalize_query(synonym_store.rewrite(q['query'])),
+                                        mode=mode, max_candidates=CANDIDATE_LIMIT, semantic=SEMANTIC_MODEL)[0]
+                ranked_rows.append(base_rows(positions, len(base)))
+
+    tracemalloc.start()
+    for q in queries:
+        smart_search(df, q['query'], index=index, mode=mode, cache=None)
+    query_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'rows': len(df),
+        'latency': {
+            'load': summarize([load_seconds]),
+            'index': summarize([index_seconds]),
+            **{name: summarize(samples) for name, samples in stages.items()},
+        },
+        'memory_peak_mb': {'load_and_index': round(load_peak / 2**20, 2), 'queries': round(query_peak / 2**20, 2)},
+        'relevance': relevance(ranked_rows, queries),
+    }
+
+
+def compare(current, baseline):
+    """Prints end-to-end latency and relevance changes against an earlier run."""
+    print(f"\nvs {baseline.get('commit')}:")
+    for key, catalog in current['catalogs'].items():
+        old = baseline.get('catalogs', {}).get(key)
+        if old is None:
+            continue
+        for stage, stats in catalog['latency'].items():
+            before = old['latency'].get(stage, {}).get('p50_ms')
+            if before:
+                print(f"  {key:>6} {stage:>10} p50 {before:>9.2f} -> {stats['p50_ms']:>9.2f} ms "
+                      f"({(stats['p50_ms'] - before) / before:+.0%})")
+        for metric in ('mrr', f'recall@{TOP_K}'):
+            before, after = old['relevance']['all'][metric], catalog['relevance']['all'][metric]
+            flag = "  REGRESSION" if after < before else ""
+            print(f"  {key:>6} {metric:>10} {before:.4f} -> {after:.4f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', help="JSON file to write (default: benchmarks/results/suite-<commit>.json)")
+    parser.add_argument('--compare', help="earlier JSON result to diff against")
+    parser.add_argument('--scales', type=int, nargs='+', default=SCALES, help="catalog sizes as multiples of faq.csv")
+    parser.add_argument('--mode', default=SYLLABLE, choices=['syllable', 'jamo'])
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    args = parser.parse_args()
+
+    base = load_faq()
+    queries = load_queries()
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'mode': args.mode,
+        'semantic': SEMANTIC_MODEL,
+        'queries': len(queries),
+        'catalogs': {},
+    }
+
+    print(f"{len(queries)} queries x {args.repeat}, mode={args.mode}, semantic={SEMANTIC_MODEL}")
+    print(f"{'rows':>8} {'load':>8} {'index':>8} {'score':>8} {'sort':>7} {'frame':>7} {'search':>8} "
+          f"{'p95':>8} {'peak MB':>8} {'MRR':>6} {'R@5':>6}")
+    for scale in args.scales:
+        result = bench_catalog(base, scale, queries, args.mode, args.repeat)
+        report['catalogs'][f"{scale}x"] = result
+        lat, rel = result['latency'], result['relevance']['all']
+        print(f"{result['rows']:>8} {lat['load']['mean_ms']:>8.1f} {lat['index']['mean_ms']:>8.1f} "
+              f"{lat['score']['p50_ms']:>8.2f} {lat['sort']['p50_ms']:>7.3f} {lat['dataframe']['p50_ms']:>7.2f} "
+              f"{lat['search']['p50_ms']:>8.2f} {lat['search']['p95_ms']:>8.2f} "
+              f"{result['memory_peak_mb']['load_and_index']:>8.1f} {rel['mrr']:>6.3f} {rel['recall@5']:>6.3f}")
+
+    print("\nrelevance by query kind (1x):")
+    first = report['catalogs'][f"{args.scales[0]}x"]['relevance']
+    for kind, metrics in first.items():
+        print(f"  {kind:>10} {metrics}")
+
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results', f"suite-{commit or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nwrote {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
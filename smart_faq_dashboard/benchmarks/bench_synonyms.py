@@ -0,0 +1,35 @@
+"""
+Query rewrite cost of the compiled synonym automaton as the synonym table grows.
+The per-query time should stay flat from 10 to 100k entries.
+"""
+from common import timed
+
+from src.synonym_automaton import SynonymAutomaton, synonym_store
+
+QUERIES = ["프로틴 복용법", "액티브 에너지젤 유통기한", "단백지쉐이크 환불 문의", "bcaa 복용 방법"]
+SIZES = [10, 1_000, 10_000, 100_000]
+
+
+def synthetic_synonyms(n):
+    synonyms = dict(synonym_store.get().synonyms)
+    for i in range(n - len(synonyms)):
+        synonyms[f"오타{i}상품"] = f"상품{i}"
+    return synonyms
+
+
+def main():
+    print(f"{'entries':>8} {'compile(ms)':>12} {'rewrite(us)':>12}")
+    for size in SIZES:
+        automaton, compile_s = timed(SynonymAutomaton, synthetic_synonyms(size))
+        total = 0.0
+        for query in QUERIES:
+            _, seconds = timed(automaton.rewrite, query, repeat=1000)
+            total += seconds
+        print(f"{size:>8} {compile_s * 1000:>12.1f} {total / len(QUERIES) * 1e6:>12.2f}")
+
+    for query in QUERIES:
+        print(f"{query} -> {synonym_store.rewrite(query)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Overhead of the tracing layer on the search hot path, and what it exports.
+
+Compares the cost of one span with a cached smart_search call (the cheapest traced
+request, so the relative overhead is the largest), then prints the per-stage summary,
+the Prometheus lines of one stage and a JSON line for a short load + search +
+suggestion + LLM (stub client with token usage) session.
+"""
+import json
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+from common import ROOT, load_faq, timed
+
+from src.data_loader import read_csv_snapshot
+from src.llm_engine import generate_ai_summary
+from src.search_engine import get_suggestion, smart_search
+from src.search_index import FaqIndex
+from src.tracing import COUNTED_ATTRS, tracer
+
+QUERIES = ["bcaa 복용 방법", "환불", "단백질 쉐이크", "아르기닌 부작용", "블랙마카 성분", "프로틴 먹는법"]
+ROUNDS = 2000
+
+
+class StubCompletions:
+    def create(self, **kwargs):
+        time.sleep(0.05)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="요약 답변"))],
+                               usage=SimpleNamespace(prompt_tokens=412, completion_tokens=57))
+
+
+def replay(df, index):
+    for i in range(ROUNDS):
+        smart_search(df, QUERIES[i % len(QUERIES)], index=index)
+
+
+def main():
+    df = load_faq()
+    index = FaqIndex(df)
+    replay(df, index)  # warm the query cache
+
+    def empty_spans():
+        for _ in range(ROUNDS):
+            with tracer.span("overhead", rows=1) as span:
+                span.set(results=0)
+
+    _, search_seconds = timed(replay, df, index)
+    _, span_seconds = timed(empty_spans)
+    print(f"one span: {span_seconds / ROUNDS * 1e6:.1f} us; cached smart_search (traced): "
+          f"{search_seconds / ROUNDS * 1e6:.0f} us -> {span_seconds / search_seconds:.1%} of the cheapest request")
+
+    # A small session, also written as JSON lines
+    tracer.reset()
+    with tempfile.TemporaryDirectory() as tmp:
+        tracer.jsonl_path = os.path.join(tmp, "trace.jsonl")
+        try:
+            read_csv_snapshot(os.path.join(ROOT, "faq.csv"))
+            for q in QUERIES * 3:
+                smart_search(df, q, index=index)
+            get_suggestion(df, "블랙마까", index=index)
+            client = SimpleNamespace(chat=SimpleNamespace(completions=StubCompletions()))
+            for _ in range(2):
+                generate_ai_summary("Product: BCAA\nFAQ Answer: ...", "복용 방법", client=client, cache=None,
+                                    semantic=False)
+        finally:
+            tracer.jsonl_path = None
+
+        print(f"\n{'stage':>10} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'cache hit':>10}  counters")
+        for name, stats in tracer.summary().items():
+            hit = f"{stats['cache_hit_rate']:.0%}" if stats['cache_hit_rate'] is not None else "-"
+            counters = {k: v for k, v in stats.items() if k in COUNTED_ATTRS}
+            print(f"{name:>10} {stats['count']:>6} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {hit:>10}  {counters}")
+
+        print("\nPrometheus:")
+        print("\n".join(line for line in tracer.prometheus().splitlines() if 'stage="llm"' in line))
+        with open(os.path.join(tmp, "trace.jsonl"), encoding="utf-8") as f:
+            print("\nJSON line:", json.dumps(json.loads(f.readlines()[-1]), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
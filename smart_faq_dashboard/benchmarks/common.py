@@ -0,0 +1,61 @@
+"""
+Shared helpers for the benchmark scripts.
+Run the scripts from the smart_faq_dashboard folder, e.g.
+    python benchmarks/bench_search_index.py
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+from thefuzz import fuzz
+
+# Make `src` importable the same way app.py sees it
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.data_loader import load_data  # noqa: E402
+
+
+def load_faq():
+    """Loads faq.csv through the app's own loader (same cleaning as the dashboard)."""
+    return load_data("dummy_url")
+
+
+def scale_catalog(df, n_rows):
+    """
+    Synthesizes a catalog of n_rows by repeating df.
+    Each copy gets a numbered Model so target strings are not byte-identical.
+    """
+    copies = []
+    for k in range(-(-n_rows // len(df))):
+        copy = df.copy()
+        if k:
+            copy['Model'] = copy['Model'].astype(str) + f"-{k}"
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True).iloc[:n_rows].reset_index(drop=True)
+
+
+def legacy_smart_search(df, query, threshold=55):
+    """The original per-row iterrows scan, kept as the reference implementation."""
+    results = []
+    for index, row in df.iterrows():
+        target_text = f"{row['Product']} {row['Model']} {row['Tags']} {row['Question']}"
+        score_token = fuzz.token_set_ratio(query, target_text)
+        score_spaceless = fuzz.partial_ratio(query.replace(" ", ""), target_text.replace(" ", ""))
+        score = max(score_token, score_spaceless)
+        if score >= threshold:
+            row_data = row.to_dict()
+            row_data['score'] = score
+            results.append(row_data)
+    results.sort(key=lambda x: x['score'], reverse=True)
+    return pd.DataFrame(results)
+
+
+def timed(fn, *args, repeat=1, **kwargs):
+    """Runs fn `repeat` times and returns (last result, mean seconds per call)."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) / repeat
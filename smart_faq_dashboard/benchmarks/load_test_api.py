@@ -0,0 +1,115 @@
+"""
+Load test for the headless API (api.py): p50/p99 latency and requests per second
+at a given concurrency.
+
+    python benchmarks/load_test_api.py --workers 4 --concurrency 16 --requests 2000
+    python benchmarks/load_test_api.py --url http://localhost:8000 --endpoint suggest
+
+Without --url it starts `uvicorn api:app` with --workers processes on a free port.
+Queries are FAQ questions, product names and typo'd product names from faq.csv.
+"""
+import argparse
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+import common
+
+
+def build_queries(n, seed=0):
+    df = common.load_faq()
+    pool = list(df['Question'].dropna().astype(str)) + list(df['Product'].dropna().astype(str).unique())
+    typos = [p[:-1] if len(p) > 2 else p for p in df['Product'].dropna().astype(str).unique()]
+    pool += typos
+    rng = random.Random(seed)
+    return [rng.choice(pool) for _ in range(n)]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers):
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning"],
+        cwd=common.ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{url}/health", timeout=1).ok:
+                return proc, url
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("API server did not start")
+
+
+def run_load(url, endpoint, queries, concurrency):
+    local = threading.local()
+
+    def one(query):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()  # keep-alive per client thread
+        start = time.perf_counter()
+        res = session.get(f"{url}/{endpoint}", params={"q": query, "limit": 20}, timeout=30)
+        return time.perf_counter() - start, res.status_code == 200
+
+    # Warm up every connection and worker process
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(one, queries[:concurrency * 2]))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(one, queries))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([r[0] for r in results]) * 1000
+    errors = sum(1 for r in results if not r[1])
+    return {
+        'requests': len(results), 'errors': errors, 'rps': len(results) / elapsed,
+        'p50_ms': np.percentile(latencies, 50), 'p99_ms': np.percentile(latencies, 99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="existing server (default: start one)")
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn worker processes when starting a server")
+    parser.add_argument("--endpoint", choices=["search", "suggest"], default="search")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    queries = build_queries(args.requests)
+    proc = None
+    url = args.url
+    if url is None:
+        proc, url = start_server(args.workers)
+    try:
+        stats = run_load(url.rstrip("/"), args.endpoint, queries, args.concurrency)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    print(f"/{args.endpoint}  concurrency {args.concurrency}"
+          + (f", {args.workers} workers" if proc is not None else "")
+          + f": {stats['rps']:.0f} req/s  p50 {stats['p50_ms']:.1f} ms  p99 {stats['p99_ms']:.1f} ms"
+          f"  ({stats['requests']} requests, {stats['errors']} errors)")
+
+
+if __name__ == "__main__":
+    main()
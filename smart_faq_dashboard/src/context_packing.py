@@ -0,0 +1,135 @@
+import functools
+import math
+import re
+
+from src.search_index import score_texts
+
+CONTEXT_TOKEN_BUDGET = 800  # tokens of [Context] sent with each question
+CHUNK_TOKENS = 120          # target size of one manual chunk
+
+# Fallback token estimate: words, numbers and single characters
+_PIECES = re.compile(r"[A-Za-z]+|\d+|\S")
+_SENTENCE_END = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+
+def _estimate_tokens(text):
+    """
+    Rough BPE token count without a tokenizer: ~4 letters or ~3 digits per token,
+    one token per Hangul syllable or symbol. Errs on the high side for Korean, which is
+    the safe side for a budget.
+    """
+    total = 0
+    for piece in _PIECES.findall(text):
+        if piece[0].isascii() and piece[0].isalpha():
+            total += math.ceil(len(piece) / 4)
+        elif piece[0].isdigit():
+            total += math.ceil(len(piece) / 3)
+        else:
+            total += 1
+    return total
+
+
+@functools.lru_cache(maxsize=None)
+def token_counter(model):
+    """
+    Returns a function text -> token count for the model: tiktoken's encoding when
+    tiktoken is installed (and its BPE file is available), else _estimate_tokens.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return _estimate_tokens
+    try:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # e.g. offline and the BPE file is not cached yet
+        print(f"tiktoken unavailable ({e}), estimating token counts")
+        return _estimate_tokens
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def split_chunks(text, max_tokens=CHUNK_TOKENS, count=_estimate_tokens):
+    """
+    Splits text into chunks of about max_tokens, on sentence and line boundaries.
+    A single sentence longer than that is split between words.
+    """
+    pieces = []
+    for sentence in _SENTENCE_END.split(str(text)):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if count(sentence) <= max_tokens:
+            pieces.append(sentence)
+            continue
+        words = []
+        for word in sentence.split():
+            if words and count(" ".join(words + [word])) > max_tokens:
+                pieces.append(" ".join(words))
+                words = []
+            words.append(word)
+        if words:
+            pieces.append(" ".join(words))
+
+    chunks = []
+    current = []
+    for piece in pieces:
+        if current and count("\n".join(current + [piece])) > max_tokens:
+            chunks.append("\n".join(current))
+            current = []
+        current.append(piece)
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def pack_context(query, header, sections, budget=CONTEXT_TOKEN_BUDGET, chunk_tokens=CHUNK_TOKENS,
+                 count=_estimate_tokens):
+    """
+    Builds the "Label: text" context from `header` (always kept) and `sections`,
+    a list of (label, text) in priority order, within `budget` tokens.
+
+    When everything fits the context is returned unchanged. Otherwise each section is
+    split into chunks, chunks are ranked by the search scorers against the query
+    (earlier sections first, then score), and packed greedily; kept chunks stay in
+    their original order.
+    Returns (context_text, report) where report has the token counts before and after.
+    """
+    sections = [(label, str(text)) for label, text in sections if str(text).strip()]
+    full = "\n".join([header] + [f"{label}: {text}" for label, text in sections])
+    tokens_before = count(full)
+    report = {'tokens_before': tokens_before, 'tokens_after': tokens_before,
+              'chunks_total': 0, 'chunks_kept': 0, 'trimmed': False}
+    if tokens_before <= budget:
+        return full, report
+
+    chunks = []  # (section position, chunk position, text)
+    for s, (label, text) in enumerate(sections):
+        chunks.extend((s, c, chunk) for c, chunk in enumerate(split_chunks(text, chunk_tokens, count)))
+    scores = score_texts(query, [text for _, _, text in chunks])
+    order = sorted(range(len(chunks)), key=lambda i: (chunks[i][0], -scores[i], chunks[i][1]))
+
+    # Labels and line breaks cost a few tokens too, so count them with the first chunk of a section
+    used = count(header)
+    kept = set()
+    opened = set()
+    for i in order:
+        s, _, text = chunks[i]
+        cost = count(text) + (count(f"{sections[s][0]}: ") if s not in opened else 0) + 1
+        if used + cost > budget:
+            continue  # a smaller, lower ranked chunk may still fit
+        used += cost
+        kept.add(i)
+        opened.add(s)
+
+    lines = [header]
+    for s, (label, _) in enumerate(sections):
+        texts = [chunks[i][2] for i in sorted(kept) if chunks[i][0] == s]
+        if texts:
+            lines.append(f"{label}: " + "\n".join(texts))
+    packed = "\n".join(lines)
+
+    report.update(tokens_after=count(packed), chunks_total=len(chunks), chunks_kept=len(kept), trimmed=True)
+    return packed, report
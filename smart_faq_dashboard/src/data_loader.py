@@ -5,6 +5,10 @@ import streamlit as st
 import os
 import json
 
+from src import snapshot
+from src.sheet_sync import REFRESH_INTERVAL, SYNC_ATTR, find_sheet_sync, get_sheet_sync
+from src.tracing import tracer
+
 # Define the scope
 SCOPE = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
 
@@ -13,31 +17,74 @@ def read_csv_robust(file_path_or_buffer):
     Reads CSV with robust encoding handling (utf-8-sig > cp949).
     """
     encodings = ['utf-8-sig', 'cp949', 'euc-kr']
-    for enc in encodings:
-        try:
-            if hasattr(file_path_or_buffer, 'seek'):
-                file_path_or_buffer.seek(0)
-            df = pd.read_csv(file_path_or_buffer, encoding=enc)
-            return df
-        except UnicodeDecodeError:
-            continue
-        except Exception:
-            continue
-    raise ValueError("Failed to read CSV with supported encodings.")
+    with tracer.span("read_csv") as span:
+        for attempt, enc in enumerate(encodings, 1):
+            span.set(attempts=attempt)
+            try:
+                if hasattr(file_path_or_buffer, 'seek'):
+                    file_path_or_buffer.seek(0)
+                df = pd.read_csv(file_path_or_buffer, encoding=enc)
+                span.set(encoding=enc, rows=len(df))
+                return df
+            except UnicodeDecodeError:
+                continue
+            except Exception:
+                continue
+        raise ValueError("Failed to read CSV with supported encodings.")
+
+def clean_dataframe(df):
+    """
+    Common processing for CSV data: strips column names, drops hidden columns
+    and adds the optional columns the dashboard expects.
+    """
+    # Clean column names (strip whitespace)
+    df.columns = df.columns.str.strip()
+    
+    # Handle hidden/empty columns (Unnamed: X)
+    df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
+    
+    # Ensure compatibility: Add missing columns if they don't exist
+    expected_cols = ['Tags', 'Manual'] 
+    for col in expected_cols:
+        if col not in df.columns:
+            df[col] = "" 
+    
+    return df
+
+def read_csv_snapshot(file_path_or_buffer):
+    """
+    Returns the cleaned DataFrame for a CSV file.
+    Served from the binary snapshot when the file's content hash matches one,
+    otherwise parsed, cleaned and saved as a new snapshot (with its search index).
+    """
+    with tracer.span("load_csv") as span:
+        digest = snapshot.content_digest(file_path_or_buffer)
+        index = snapshot.load_index(digest)
+        span.set(cache_hit=index is not None)
+        if index is None:
+            df = clean_dataframe(read_csv_robust(file_path_or_buffer))
+            index = snapshot.save_index(digest, df)
+        span.set(rows=len(index))
+        return index.df
 
 @st.cache_data(ttl=600)  # Cache for 10 minutes to avoid hitting API limits
 def load_data(sheet_url, csv_file=None):
     """
     Loads data from CSV if provided, else Google Sheets, else Mock data.
     """
+    # Only runs on a cache miss, so the trace shows real loads, not cached reruns
+    with tracer.span("load_data") as span:
+        df = _load_data(sheet_url, csv_file)
+        span.set(rows=len(df))
+        return df
+
+def _load_data(sheet_url, csv_file):
     df = None
-    source_name = ""
 
     # Priority 1: Uploaded CSV via Streamlit Uploader
     if csv_file is not None:
         try:
-            df = read_csv_robust(csv_file)
-            source_name = "Uploaded CSV"
+            df = read_csv_snapshot(csv_file)
         except Exception as e:
             st.error(f"업로드된 CSV 파일 로드 오류: {e}")
 
@@ -48,29 +95,13 @@ def load_data(sheet_url, csv_file=None):
         
         if os.path.exists(default_csv_path):
             try:
-                df = read_csv_robust(default_csv_path)
-                source_name = "faq.csv (Local)"
+                df = read_csv_snapshot(default_csv_path)
             except Exception as e:
                 print(f"Default CSV load error: {e}")
     
-    # Common Processing for CSVs
+    # CSVs are already cleaned (see read_csv_snapshot)
     if df is not None:
-        try:
-            # Clean column names (strip whitespace)
-            df.columns = df.columns.str.strip()
-            
-            # Handle hidden/empty columns (Unnamed: X)
-            df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
-            
-            # Ensure compatibility: Add missing columns if they don't exist
-            expected_cols = ['Tags', 'Manual'] 
-            for col in expected_cols:
-                if col not in df.columns:
-                    df[col] = "" 
-            
-            return df
-        except Exception as e:
-             st.error(f"데이터 처리 중 오류 ({source_name}): {e}")
+        return df
 
     # Priority 3: Google Sheets
     if "GOOGLE_KEY_FILE" in os.environ:
@@ -88,15 +119,33 @@ def load_data(sheet_url, csv_file=None):
         return _get_mock_data()
 
     try:
-        client = gspread.authorize(creds)
-        sheet = client.open_by_url(sheet_url).sheet1
-        data = sheet.get_all_records()
-        df = pd.DataFrame(data)
-        return df
+        # Loaded once per process, then kept current by a background incremental sync
+        # (so a TTL expiry here no longer costs a full get_all_records + re-index)
+        sync = get_sheet_sync(
+            sheet_url,
+            lambda: gspread.authorize(creds).open_by_url(sheet_url).sheet1,
+            revision_column=os.environ.get("SHEET_REVISION_COLUMN"),
+            prepare=clean_dataframe,
+            interval=int(os.environ.get("SHEET_SYNC_INTERVAL", REFRESH_INTERVAL)),
+        )
+        return sync.index.df
     except Exception as e:
         st.error(f"Error loading Google Sheet: {e}")
         return _get_mock_data()
 
+def live_index(df):
+    """
+    Returns the FaqIndex kept for df's source: the CSV snapshot it was loaded from,
+    or the current index of its Google Sheet sync (which may be newer than df).
+    Returns None for other sources (mock data), which need their own index.
+    """
+    sync = find_sheet_sync(df.attrs.get(SYNC_ATTR))
+    if sync is not None:
+        return sync.index
+    if df.attrs.get(snapshot.DIGEST_ATTR):
+        return snapshot.load_index(df.attrs[snapshot.DIGEST_ATTR])
+    return None
+
 def _get_mock_data():
     """Returns mock data for testing/demo purposes."""
     data = {
@@ -0,0 +1,65 @@
+import functools
+import zlib
+
+import numpy as np
+
+from src.llm_cache import normalize_text
+
+EMBEDDING_DIM = 1024
+HASHING = 'hashing'  # model id of HashingEmbedder in get_embedder()
+
+
+class HashingEmbedder:
+    """
+    Dependency-free local embedding: character bigrams/trigrams and whole words hashed
+    into a fixed-size float32 vector (L2-normalized, so a dot product is the cosine).
+    Catches rewordings that share surface form ("bcaa 복용 방법" / "BCAA 복용방법은?").
+    For true paraphrases plug in a real model, e.g. sentence_transformer_embedder().
+    """
+
+    def __init__(self, dim=EMBEDDING_DIM):
+        self.dim = dim
+
+    def _features(self, text):
+        text = normalize_text(text)
+        compact = text.replace(" ", "")
+        features = [f"w:{w}" for w in text.split()]
+        for n in (2, 3):
+            features.extend(compact[i:i + n] for i in range(len(compact) - n + 1))
+        return features or [compact]
+
+    def __call__(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode('utf-8'))  # stable across processes, unlike hash()
+                vectors[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+def sentence_transformer_embedder(model_name="paraphrase-multilingual-MiniLM-L12-v2"):
+    """
+    Returns an embed function backed by a local sentence-transformers model (CPU).
+    sentence-transformers is optional and only imported when this is called.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name, device='cpu')
+
+    def embed(texts):
+        return model.encode(list(texts), normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+    return embed
+
+
+@functools.lru_cache(maxsize=None)
+def get_embedder(model_id=HASHING):
+    """
+    Embed function for a model id, loaded once per process: 'hashing' for HashingEmbedder,
+    anything else is a sentence-transformers model name.
+    """
+    if model_id == HASHING:
+        return HashingEmbedder()
+    return sentence_transformer_embedder(model_id)
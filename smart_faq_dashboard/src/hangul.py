@@ -0,0 +1,38 @@
+# Hangul syllable decomposition (jamo) helpers for typo-tolerant matching.
+# Syllables U+AC00..U+D7A3 are composed as 0xAC00 + (initial * 21 + medial) * 28 + final.
+
+HANGUL_BASE = 0xAC00
+HANGUL_COUNT = 11172
+
+# Compatibility jamo, so decomposed text compares equal to what agents type ("ㄷㅂㅈ")
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSEONG = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ",
+             "ㄿ", "ㅀ", "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+
+# str.translate tables built once, so decomposing a whole catalog runs at C speed
+_JAMO_TABLE = {}
+_CHOSEONG_TABLE = {}
+for _code in range(HANGUL_COUNT):
+    _initial, _rest = divmod(_code, 21 * 28)
+    _medial, _final = divmod(_rest, 28)
+    _JAMO_TABLE[HANGUL_BASE + _code] = CHOSEONG[_initial] + JUNGSEONG[_medial] + JONGSEONG[_final]
+    _CHOSEONG_TABLE[HANGUL_BASE + _code] = CHOSEONG[_initial]
+
+_CONSONANTS = set(CHOSEONG) | {c for c in JONGSEONG if c}
+
+
+def decompose(text):
+    """Splits every Hangul syllable into its jamo: "단백질" -> "ㄷㅏㄴㅂㅐㄱㅈㅣㄹ". Other characters are kept."""
+    return str(text).translate(_JAMO_TABLE)
+
+
+def to_choseong(text):
+    """Keeps only the initial consonant of each syllable: "단백질 쉐이크" -> "ㄷㅂㅈ ㅅㅇㅋ"."""
+    return str(text).translate(_CHOSEONG_TABLE)
+
+
+def is_choseong_query(query):
+    """True when the query is typed as initial consonants only, e.g. "ㄷㅂㅈ"."""
+    compact = str(query).replace(" ", "")
+    return bool(compact) and all(ch in _CONSONANTS for ch in compact)
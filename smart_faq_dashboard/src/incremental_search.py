@@ -0,0 +1,196 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.query_cache import normalize_query
+from src.search_index import CHOSEONG, DEFAULT_THRESHOLDS, SYLLABLE, resolve_mode
+from src.synonym_automaton import synonym_store
+
+KEEP_LIMIT = 1000  # best rows of one keystroke carried over to the next
+NEW_LIMIT = 1000   # rows sharing the newly typed n-grams, added per keystroke
+FIRST_LIMIT = 2000  # n-gram candidates for a query that doesn't extend the previous one
+CHUNK = 1000       # candidates scored between cancellation checks
+SEARCH_WORKERS = 4  # threads shared by every session's submit(); idle sessions hold no thread
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _shared_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="search-as-you-type")
+    return _executor
+
+
+class SearchCancelled(Exception):
+    """A newer keystroke superseded this search."""
+
+
+class _Step:
+    """Scored candidates for one typed query (row positions sorted, scores aligned)."""
+
+    def __init__(self, query, candidates, scores):
+        self.query = query
+        self.candidates = candidates
+        self.scores = scores
+
+
+class SearchSession:
+    """
+    Search-as-you-type for one search box.
+
+    When the query extends the previous one ("환" -> "환불"), only the previous step's
+    best KEEP_LIMIT rows plus up to NEW_LIMIT rows containing the newly typed n-grams are
+    scored, so a keystroke costs about the same at 10k or 1M rows. Backspace returns the
+    stored earlier step. Any other edit starts over from the n-gram index.
+    Catalogs no larger than KEEP_LIMIT + NEW_LIMIT are simply scored in full.
+
+    Carried-over rows are a heuristic: a row that scored badly for the prefix but well
+    for the full query is only found if it contains one of the new n-grams.
+
+    type() searches synchronously; submit() runs the search on a thread of a pool shared
+    by all sessions and cancels any search still running for an earlier keystroke (a
+    newer generation makes it stop at its next chunk). A session's searches run one at
+    a time, since each builds on the previous step.
+    """
+
+    def __init__(self, index, mode=SYLLABLE, threshold=None, keep_limit=KEEP_LIMIT, new_limit=NEW_LIMIT):
+        self.index = index
+        self.mode = mode
+        self.threshold = threshold
+        self.keep_limit = keep_limit
+        self.new_limit = new_limit
+        self.stats = {'keystrokes': 0, 'incremental': 0, 'full': 0, 'reused': 0, 'cancelled': 0}
+
+        self._steps = []  # steps of the current prefix chain, shortest first
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._search_lock = threading.Lock()  # serializes _search (it updates _steps)
+        self._pending = None
+
+    def reset(self, index=None):
+        """Forgets the typed history (e.g. when the data, and so the index, changed)."""
+        with self._lock:
+            self._generation += 1
+            if index is not None:
+                self.index = index
+            self._steps = []
+
+    # --- Public API ----------------------------------------------------------
+
+    def type(self, query):
+        """Returns (positions, scores) of the matches for the query as typed so far, best first."""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        with self._search_lock:
+            return self._search(query, generation)
+
+    def submit(self, query):
+        """
+        Searches on the shared worker pool. Returns a Future whose result is
+        (positions, scores), or None if a later keystroke superseded it.
+        """
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            if self._pending is not None and self._pending.cancel():
+                self.stats['cancelled'] += 1  # queued but not started yet
+            self._pending = _shared_executor().submit(self._run, query, generation)
+            return self._pending
+
+    def results(self, query):
+        """type() as a result DataFrame (same columns as smart_search)."""
+        return self.index.build_results(*self.type(query))
+
+    def close(self):
+        """Cancels the session's queued or running search (the shared pool keeps running)."""
+        with self._lock:
+            self._generation += 1
+            if self._pending is not None:
+                self._pending.cancel()
+
+    # --- Searching -----------------------------------------------------------
+
+    def _run(self, query, generation):
+        try:
+            with self._search_lock:
+                self._check(generation)  # superseded while waiting for the previous keystroke
+                return self._search(query, generation)
+        except SearchCancelled:
+            with self._lock:
+                self.stats['cancelled'] += 1
+            return None
+
+    def _check(self, generation):
+        if generation != self._generation:
+            raise SearchCancelled()
+
+    def _search(self, query, generation):
+        self.stats['keystrokes'] += 1
+        query = normalize_query(synonym_store.rewrite(query))
+        if not query:
+            self._steps = []
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int16)
+
+        # Backspace or edit: drop steps that are no longer a prefix of the query
+        while self._steps and not query.startswith(self._steps[-1].query):
+            self._steps.pop()
+
+        if self._steps and self._steps[-1].query == query:
+            step = self._steps[-1]
+            self.stats['reused'] += 1
+        else:
+            candidates = self._candidates(query)
+            step = _Step(query, candidates, self._score(query, candidates, generation))
+            self._check(generation)
+            self._steps.append(step)
+        return self._rank(step)
+
+    def _candidates(self, query):
+        index = self.index
+        if len(index) <= self.keep_limit + self.new_limit or resolve_mode(query, self.mode) == CHOSEONG:
+            self.stats['full'] += 1
+            return np.arange(len(index), dtype=np.int32)
+        if not self._steps:
+            self.stats['full'] += 1
+            candidates = index.candidates(query, FIRST_LIMIT, self.mode)
+            return np.arange(len(index), dtype=np.int32) if candidates is None else candidates.astype(np.int32)
+
+        # The query extends the previous step: carry its best rows, add rows with the new n-grams
+        self.stats['incremental'] += 1
+        prev = self._steps[-1]
+        carried = prev.candidates
+        if len(carried) > self.keep_limit:
+            carried = carried[np.argpartition(-prev.scores, self.keep_limit - 1)[:self.keep_limit]]
+
+        ngrams = index.ngrams
+        new_grams = ngrams.query_ngrams(query) - ngrams.query_ngrams(prev.query)
+        postings = [ngrams.postings[g] for g in new_grams if g in ngrams.postings]
+        added = np.zeros(0, dtype=np.int32)
+        if postings:
+            ids, counts = np.unique(np.concatenate(postings), return_counts=True)
+            if len(ids) > self.new_limit:
+                ids = ids[np.argpartition(-counts, self.new_limit - 1)[:self.new_limit]]
+            added = ids.astype(np.int32)
+        return np.union1d(carried, added).astype(np.int32)
+
+    def _score(self, query, candidates, generation):
+        scores = np.zeros(len(candidates), dtype=np.int16)
+        for start in range(0, len(candidates), CHUNK):
+            self._check(generation)
+            chunk = candidates[start:start + CHUNK]
+            scores[start:start + CHUNK] = self.index.score(query, chunk, self.mode)[chunk]
+        return scores
+
+    def _rank(self, step):
+        threshold = self.threshold
+        if threshold is None:
+            threshold = DEFAULT_THRESHOLDS[resolve_mode(step.query, self.mode)]
+        matched = np.flatnonzero(step.scores >= threshold)
+        # Candidates are in row order, so a stable sort keeps ties in row order like FaqIndex.rank
+        order = matched[np.argsort(-step.scores[matched], kind='stable')]
+        return step.candidates[order], step.scores[order]
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.cache', 'llm_answers.sqlite')
+CACHE_TTL = 7 * 24 * 3600  # seconds an answer stays valid
+CACHE_MAX_ENTRIES = 5000   # least recently used answers are evicted above this
+
+
+def normalize_text(text):
+    """NFC, collapsed whitespace, case-folded: "BCAA  복용법 " and "bcaa 복용법" share a key."""
+    text = unicodedata.normalize('NFC', str(text))
+    return re.sub(r'\s+', ' ', text).strip().casefold()
+
+
+def cache_key(context_text, query, model, system_prompt, temperature):
+    payload = json.dumps([
+        normalize_text(context_text), normalize_text(query), model,
+        normalize_text(system_prompt), round(float(temperature), 3),
+    ], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class AnswerCache:
+    """
+    On-disk (SQLite) cache of AI answers, shared by every process on the machine.
+    Entries expire after `ttl` seconds; above `max_entries` the least recently used go first.
+    Hit/miss counters are kept per process (stats) and in the database (totals).
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")  # readers don't block the writer across processes
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS answers (
+                    key TEXT PRIMARY KEY,
+                    answer TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS answers_accessed ON answers (accessed_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            self._conn = conn
+        return self._conn
+
+    def _count(self, conn, name):
+        self.stats[name] += 1
+        conn.execute("INSERT INTO counters (name, value) VALUES (?, 1) "
+                     "ON CONFLICT(name) DO UPDATE SET value = value + 1", (name,))
+
+    def get(self, key):
+        """Returns the cached answer or None (also None if the cache file can't be used)."""
+        try:
+            return self._get(key)
+        except sqlite3.Error as e:
+            print(f"Answer cache read error: {e}")
+            return None
+
+    def put(self, key, answer):
+        try:
+            self._put(key, answer)
+        except sqlite3.Error as e:
+            # A locked or read-only cache must never break answering
+            print(f"Answer cache write error: {e}")
+
+    def _get(self, key):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT answer, created_at FROM answers WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                self._count(conn, 'misses')
+                return None
+            conn.execute("UPDATE answers SET accessed_at = ? WHERE key = ?", (now, key))
+            self._count(conn, 'hits')
+            return row[0]
+
+    def _put(self, key, answer):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO answers (key, answer, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                         (key, answer, now, now))
+            self._count(conn, 'writes')
+            self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        expired = conn.execute("DELETE FROM answers WHERE created_at < ?", (now - self.ttl,)).rowcount
+        (count,) = conn.execute("SELECT COUNT(*) FROM answers").fetchone()
+        overflow = 0
+        if count > self.max_entries:
+            overflow = conn.execute(
+                "DELETE FROM answers WHERE key IN (SELECT key FROM answers ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,)).rowcount
+        self.stats['evictions'] += expired + overflow
+
+    def totals(self):
+        """Counters summed over every process using this cache file."""
+        with self._lock:
+            conn = self._connect()
+            totals = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            (totals['entries'],) = conn.execute("SELECT COUNT(*) FROM answers").fetchone()
+        return totals
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM answers")
+            conn.execute("DELETE FROM counters")
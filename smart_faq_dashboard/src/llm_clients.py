@@ -0,0 +1,74 @@
+import random
+import threading
+import time
+
+from openai import APIConnectionError, OpenAI, RateLimitError
+
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5  # seconds; doubled on every retry
+BACKOFF_MAX = 20.0
+
+# One client (and so one HTTP connection pool) per API key / base URL for the whole process
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key, base_url=None):
+    """
+    Returns the shared OpenAI client for this API key, creating it on first use.
+    Reusing it keeps the connection pool warm, so later calls skip TCP/TLS setup.
+    The SDK's own retries are off: create_with_backoff retries the same transient
+    errors (rate limits, connection errors, timeouts, 408/409/5xx) with jittered backoff.
+    """
+    key = (api_key, base_url)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = OpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+                _clients[key] = client
+    return client
+
+
+# Status codes the OpenAI SDK itself would retry: timeout, lock conflict, rate limit, server errors
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+def is_retryable(error):
+    """Rate limits, connection errors and timeouts (APITimeoutError is an APIConnectionError), 408/409/5xx."""
+    if isinstance(error, (RateLimitError, APIConnectionError)):
+        return True
+    status = getattr(error, 'status_code', None)
+    return isinstance(status, int) and (status in RETRYABLE_STATUS or status >= 500)
+
+
+def retry_after(error):
+    """Seconds the server asked us to wait (Retry-After header), if any."""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, error=None):
+    delay = retry_after(error) if error is not None else None
+    if delay is not None:
+        delay = min(max(delay, 0.0), BACKOFF_MAX)  # don't let a huge Retry-After stall the request
+    else:
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt))
+        delay *= random.uniform(0.5, 1.0)  # jitter so concurrent callers don't retry in lockstep
+    return delay
+
+
+def create_with_backoff(client, max_retries=MAX_RETRIES, **kwargs):
+    """chat.completions.create, retried with exponential backoff on rate limits and transient errors."""
+    for attempt in range(max_retries + 1):
+        try:
+            return client.chat.completions.create(**kwargs)
+        except Exception as e:
+            if not is_retryable(e) or attempt == max_retries:
+                raise
+            time.sleep(backoff_delay(attempt, e))
@@ -1,23 +1,20 @@
-from openai import OpenAI
 import streamlit as st
 import os
+import time
+import asyncio
+from collections import deque
 
-def generate_ai_summary(context_text, query, api_key=None):
-    """
-    Generates an AI summary based on the provided context (Manual + FAQ) and the user query.
-    """
-    if not api_key:
-        # Fallback to env or secrets if not provided explicitly
-        api_key = os.environ.get("OPENAI_API_KEY")
-        if not api_key:
-            api_key = st.secrets.get("OPENAI_API_KEY")
+from src.context_packing import CONTEXT_TOKEN_BUDGET, pack_context, token_counter
+from src.embeddings import HASHING, get_embedder
+from src.llm_cache import AnswerCache, cache_key
+from src.llm_clients import create_with_backoff, get_client
+from src.semantic_cache import SIMILARITY_THRESHOLD, SemanticCache
+from src.tracing import tracer
 
-    if not api_key:
-        return "⚠️ OpenAI API Key가 없습니다. 설정 메뉴에서 키를 입력해주세요."
-
-    client = OpenAI(api_key=api_key)
+MODEL = "gpt-4o"  # Or gpt-3.5-turbo if cost is a concern
+TEMPERATURE = 0.3 # Low temperature for factual consistency
 
-    system_prompt = """
+SYSTEM_PROMPT = """
     당신은 친절하고 전문적인 제품 상담 도우미입니다.
     제공된 [Context]를 바탕으로 사용자의 [Query]에 답변하세요.
     - 답변이 문맥(Context)에 있다면, 명확하고 정중하게 요약하여 답변하세요(최대 3문장).
@@ -25,7 +22,43 @@ def generate_ai_summary(context_text, query, api_key=None):
     - 없는 사실을 지어내지 마세요(Hallucination 방지).
     - 어조: 전문적임, 친절함, 간결함.
     """
-    
+
+# Shared on-disk answer cache (same FAQ row + same question -> no new API call)
+answer_cache = AnswerCache()
+
+# Optional near-duplicate reuse ("bcaa 복용 방법" ~ "BCAA 복용방법은?"), enabled with
+# SEMANTIC_CACHE=<sentence-transformers model name>. The built-in hashing embedder is refused:
+# it matches surface n-grams, so a question and its negation would share an answer.
+semantic_cache = None
+SEMANTIC_CACHE_MODEL = os.environ.get("SEMANTIC_CACHE") or None
+if SEMANTIC_CACHE_MODEL in ("1", HASHING):
+    print("SEMANTIC_CACHE needs a sentence-transformers model name (e.g. paraphrase-multilingual-MiniLM-L12-v2); "
+          "semantic cache disabled.")
+elif SEMANTIC_CACHE_MODEL:
+    semantic_cache = SemanticCache(get_embedder(SEMANTIC_CACHE_MODEL),
+                                   threshold=float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", SIMILARITY_THRESHOLD)))
+
+# Concurrent API calls per batch (generate_ai_summaries_batch)
+BATCH_CONCURRENCY = 4
+
+# Time to first token (seconds) of recent streamed answers
+ttft_samples = deque(maxlen=1000)
+
+# Token budget for the [Context] of one question (Product + FAQ answer + most relevant manual chunks)
+context_token_budget = int(os.environ.get("CONTEXT_TOKEN_BUDGET", CONTEXT_TOKEN_BUDGET))
+
+def _resolve_api_key(api_key):
+    if not api_key:
+        # Fallback to env or secrets if not provided explicitly
+        api_key = os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            try:
+                api_key = st.secrets.get("OPENAI_API_KEY")
+            except Exception:
+                api_key = None  # no secrets.toml (e.g. running under api.py instead of Streamlit)
+    return api_key
+
+def _build_messages(context_text, query):
     user_message = f"""
     [Context]:
     {context_text}
@@ -33,16 +66,207 @@ def generate_ai_summary(context_text, query, api_key=None):
     [Query]:
     {query}
     """
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_message}
+    ]
+
+def prompt_tokens(context_text, query):
+    """Tokens of the full prompt (system + user message) sent for this context and query."""
+    count = token_counter(MODEL)
+    return sum(count(m["content"]) for m in _build_messages(context_text, query))
+
+def build_context(row, query, budget=None):
+    """
+    Builds the [Context] for one FAQ row: Product, FAQ Answer and Manual, packed into
+    `budget` tokens (default context_token_budget). Long manuals are cut into chunks and
+    only the chunks most relevant to the query are kept.
+    Returns (context_text, report); report has the context and prompt token counts before and after,
+    and 'row_key', which identifies the row for the semantic cache whatever the packing kept.
+    """
+    header = f"Product: {row['Product']}"
+    sections = [("FAQ Answer", row['Answer'])]
+    if isinstance(row.get('Manual'), str) and row['Manual']:
+        sections.append(("Manual", row['Manual']))
+    context_text, report = pack_context(query, header, sections,
+                                        budget=budget or context_token_budget, count=token_counter(MODEL))
+    overhead = prompt_tokens("", query)
+    report['prompt_tokens_before'] = overhead + report['tokens_before']
+    report['prompt_tokens_after'] = overhead + report['tokens_after']
+    # From the unpacked row: a trimmed context depends on the query, so paraphrases would get different keys
+    report['row_key'] = _row_key("\n".join([header] + [f"{label}: {text}" for label, text in sections]))
+    return context_text, report
+
+def _row_key(context_text):
+    # The answer cache key without the query: groups every question asked about this FAQ row
+    return cache_key(context_text, "", MODEL, SYSTEM_PROMPT, TEMPERATURE)
 
+def _cache_keys(context_text, query, row_key=None):
+    key = cache_key(context_text, query, MODEL, SYSTEM_PROMPT, TEMPERATURE)
+    return key, row_key or _row_key(context_text)
+
+def _lookup_caches(key, row_key, query, cache, semantic):
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    if semantic is not None:
+        similar = semantic.lookup(row_key, query)
+        if similar is not None:
+            return similar[0]
+    return None
+
+def _store_caches(key, row_key, query, answer, cache, semantic):
+    if answer:
+        if cache is not None:
+            cache.put(key, answer)
+        if semantic is not None:
+            try:
+                semantic.add(row_key, query, answer)
+            except Exception as e:
+                # The answer was already generated (and possibly streamed); caching it is best effort
+                print(f"Semantic cache write error: {e}")
+
+def _usage(usage):
+    """Token counts from an API response's usage block (missing on stubs and some streams)."""
+    if usage is None:
+        return {}
+    return {'prompt_tokens': getattr(usage, 'prompt_tokens', None) or 0,
+            'completion_tokens': getattr(usage, 'completion_tokens', None) or 0}
+
+def _semantic_or_default(semantic):
+    if semantic is None:
+        return semantic_cache
+    if semantic is False:
+        return None  # explicitly disabled
+    return semantic
+
+def generate_ai_summary(context_text, query, api_key=None, client=None, cache=answer_cache, semantic=None,
+                        row_key=None):
+    """
+    Generates an AI summary based on the provided context (Manual + FAQ) and the user query.
+    Answers are served from `cache` when the same context/query/model/prompt was answered before
+    (pass cache=None to always call the API), then from the semantic cache (`semantic`, defaults
+    to the module's semantic_cache, False disables it) when a near-identical question about the same row was answered.
+    `row_key` (build_context's report['row_key']) names the row for the semantic cache; default: the context.
+    `client` replaces the OpenAI client (e.g. a stub in tests).
+    """
+    with tracer.span("llm", model=MODEL) as span:
+        semantic = _semantic_or_default(semantic)
+        key, row_key = _cache_keys(context_text, query, row_key)
+        cached = _lookup_caches(key, row_key, query, cache, semantic)
+        span.set(cache_hit=cached is not None)
+        if cached is not None:
+            return cached
+
+        api_key = _resolve_api_key(api_key) if client is None else api_key
+        if not api_key and client is None:
+            span.set(error="no_api_key")
+            return "⚠️ OpenAI API Key가 없습니다. 설정 메뉴에서 키를 입력해주세요."
+
+        if client is None:
+            client = get_client(api_key)  # pooled per API key, reuses connections
+
+        try:
+            response = create_with_backoff(
+                client,
+                model=MODEL,
+                messages=_build_messages(context_text, query),
+                temperature=TEMPERATURE,
+            )
+            span.set(**_usage(getattr(response, 'usage', None)))
+            answer = response.choices[0].message.content
+            _store_caches(key, row_key, query, answer, cache, semantic)
+            return answer
+        except Exception as e:
+            span.set(error=type(e).__name__)
+            return f"⚠️ Error generating AI summary: {str(e)}"
+
+def stream_ai_summary(context_text, query, api_key=None, client=None, cache=answer_cache, semantic=None,
+                      row_key=None):
+    """
+    Streaming variant of generate_ai_summary: yields the answer as text chunks
+    (stream=True) so the UI can render it while it is generated, e.g. st.write_stream.
+    Cached answers are yielded in one chunk. Time to first token is recorded in ttft_samples.
+    """
+    semantic = _semantic_or_default(semantic)
+    key, row_key = _cache_keys(context_text, query, row_key)
+    cached = _lookup_caches(key, row_key, query, cache, semantic)
+    if cached is not None:
+        tracer.record("llm_stream", 0.0, model=MODEL, cache_hit=True)
+        yield cached
+        return
+
+    api_key = _resolve_api_key(api_key) if client is None else api_key
+    if not api_key and client is None:
+        yield "⚠️ OpenAI API Key가 없습니다. 설정 메뉴에서 키를 입력해주세요."
+        return
+
+    if client is None:
+        client = get_client(api_key)  # pooled per API key, reuses connections
+
+    parts = []
+    usage = {}
+    started = time.perf_counter()
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",  # Or gpt-3.5-turbo if cost is a concern
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ],
-            temperature=0.3, # Low temperature for factual consistency
+        stream = create_with_backoff(
+            client,
+            model=MODEL,
+            messages=_build_messages(context_text, query),
+            temperature=TEMPERATURE,
+            stream=True,
+            stream_options={"include_usage": True},
         )
-        return response.choices[0].message.content
+        for chunk in stream:
+            if getattr(chunk, 'usage', None) is not None:
+                usage = _usage(chunk.usage)
+            if not chunk.choices:
+                continue  # e.g. a trailing usage-only chunk
+            text = chunk.choices[0].delta.content
+            if not text:
+                continue
+            if not parts:
+                ttft_samples.append(time.perf_counter() - started)
+            parts.append(text)
+            yield text
     except Exception as e:
-        return f"⚠️ Error generating AI summary: {str(e)}"
+        # Spans can't stay open across yields (the UI renders in between), so streams are recorded once done
+        tracer.record("llm_stream", time.perf_counter() - started, model=MODEL, cache_hit=False,
+                      error=type(e).__name__)
+        yield f"⚠️ Error generating AI summary: {str(e)}"
+        return
+
+    tracer.record("llm_stream", time.perf_counter() - started, model=MODEL, cache_hit=False, **usage)
+    _store_caches(key, row_key, query, "".join(parts), cache, semantic)
+
+async def generate_ai_summaries_batch(items, api_key=None, client=None, cache=answer_cache, semantic=None,
+                                      concurrency=BATCH_CONCURRENCY):
+    """
+    Summarizes several (context_text, query) or (context_text, query, row_key) items concurrently,
+    e.g. the top-N search results. At most `concurrency` API calls run at once (they share the
+    pooled client); rate-limited calls back off and retry. Returns the answers in the same order as items.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def summarize(context_text, query, row_key=None):
+        async with semaphore:
+            # The blocking SDK call runs in a worker thread; the connection pool is thread-safe
+            return await asyncio.to_thread(
+                generate_ai_summary, context_text, query, api_key, client, cache, semantic, row_key)
+
+    return await asyncio.gather(*(summarize(*item) for item in items))
+
+def run_ai_summaries_batch(items, **kwargs):
+    """Blocking wrapper around generate_ai_summaries_batch for synchronous callers (Streamlit)."""
+    return asyncio.run(generate_ai_summaries_batch(items, **kwargs))
+
+def ttft_summary():
+    """Count and p50/p95 time to first token (seconds) over the recent streamed answers."""
+    samples = sorted(ttft_samples)
+    if not samples:
+        return {'count': 0, 'p50': None, 'p95': None}
+    return {
+        'count': len(samples),
+        'p50': samples[int(0.50 * (len(samples) - 1))],
+        'p95': samples[int(0.95 * (len(samples) - 1))],
+    }
@@ -0,0 +1,68 @@
+import numpy as np
+from thefuzz import utils
+
+NGRAM_SIZES = (2, 3)  # character bigrams + trigrams
+SHORT_QUERY_SIZES = (1, 2)  # queries of 1-2 characters ("환불") fall back to single characters
+SHORT_QUERY_LENGTH = 2
+
+
+def compact_text(text):
+    """Normalizes like thefuzz (lowercase, letters/digits only) and drops spaces."""
+    return utils.full_process(str(text)).replace(" ", "")
+
+
+def extract_ngrams(text, sizes=NGRAM_SIZES):
+    """
+    Returns the set of character n-grams of the text.
+    Spaces are dropped first, so "단백지쉐이크" still shares grams with "단백질 쉐이크".
+    """
+    compact = compact_text(text)
+    grams = set()
+    for n in sizes:
+        for i in range(len(compact) - n + 1):
+            grams.add(compact[i:i + n])
+    return grams
+
+
+class NgramIndex:
+    """
+    Inverted index: character n-gram -> row ids.
+    Used to pick a short list of candidate rows before running the fuzzy scorers.
+    """
+
+    def __init__(self, texts):
+        self.size = len(texts)
+        postings = {}
+        for row_id, text in enumerate(texts):
+            for gram in extract_ngrams(text, SHORT_QUERY_SIZES + NGRAM_SIZES):
+                postings.setdefault(gram, []).append(row_id)
+        self.postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def query_ngrams(self, query):
+        if len(compact_text(query)) <= SHORT_QUERY_LENGTH:
+            return extract_ngrams(query, SHORT_QUERY_SIZES)
+        return extract_ngrams(query)
+
+    def overlap(self, query):
+        """Returns how many of the query's n-grams each row contains (int array, one per row)."""
+        counts = np.zeros(self.size, dtype=np.int32)
+        for gram in self.query_ngrams(query):
+            ids = self.postings.get(gram)
+            if ids is not None:
+                counts[ids] += 1  # ids are unique per gram, so no np.add.at needed
+        return counts
+
+    def candidates(self, query, top_n):
+        """
+        Returns up to top_n row ids sharing the most n-grams with the query, in row order.
+        Returns None when the query has no letters/digits at all (caller should scan everything).
+        """
+        if not compact_text(query):
+            return None
+
+        counts = self.overlap(query)
+        hits = np.flatnonzero(counts)
+        if len(hits) > top_n:
+            best = np.argpartition(-counts[hits], top_n - 1)[:top_n]
+            hits = hits[best]
+        return np.sort(hits)
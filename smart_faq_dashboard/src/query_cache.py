@@ -0,0 +1,76 @@
+import re
+import sys
+import threading
+from collections import OrderedDict
+
+MAX_ENTRIES = 2048  # cached queries across all dataset versions
+
+_SPACES = re.compile(r' +')
+
+
+def normalize_query(query):
+    """
+    Collapses and trims spaces. Both scoring passes ignore spaces this way
+    (token_set_ratio re-tokenizes, partial_ratio drops them), so results are unchanged.
+    """
+    return _SPACES.sub(' ', query).strip(' ')
+
+
+class QueryCache:
+    """
+    LRU cache of search results, stored as compact (row positions, scores) arrays
+    instead of DataFrames. Keys include the FaqIndex version, so results from old
+    data are never served: new data means a new version, and stale entries age out.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (positions, scores)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _size(key, value):
+        return sys.getsizeof(key[1]) + sum(a.nbytes for a in value)
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= self._size(key, old)
+            self._entries[key] = value
+            self._bytes += self._size(key, value)
+            while len(self._entries) > self.max_entries:
+                old_key, old_value = self._entries.popitem(last=False)
+                self._bytes -= self._size(old_key, old_value)
+                self.stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def metrics(self):
+        """Stats plus hit rate, entry count and approximate memory used by keys and arrays."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+            stats['versions'] = len({key[0] for key in self._entries})
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
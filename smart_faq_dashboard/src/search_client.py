@@ -0,0 +1,22 @@
+import pandas as pd
+import requests
+
+REQUEST_TIMEOUT = 10  # seconds
+
+# Keep-alive connections to the API, shared by every Streamlit session in the process
+_session = requests.Session()
+
+
+def remote_search(base_url, query, mode, limit=200):
+    """smart_search through the headless API (api.py); returns the same result DataFrame."""
+    res = _session.get(f"{base_url.rstrip('/')}/search", params={"q": query, "mode": mode, "limit": limit},
+                       timeout=REQUEST_TIMEOUT)
+    res.raise_for_status()
+    return pd.DataFrame(res.json()["results"])
+
+
+def remote_suggestions(base_url, query, k=5):
+    """get_suggestions through the headless API: a list of (keyword, score)."""
+    res = _session.get(f"{base_url.rstrip('/')}/suggest", params={"q": query, "k": k}, timeout=REQUEST_TIMEOUT)
+    res.raise_for_status()
+    return [(s["keyword"], s["score"]) for s in res.json()["suggestions"]]
@@ -1,86 +1,104 @@
+import os
+
 import pandas as pd
-from thefuzz import fuzz, process
 
-import json
-import os
+from src.query_cache import QueryCache, normalize_query
+from src.search_index import FaqIndex, SYLLABLE, resolve_mode
+from src.sharded_search import sharded_search_for
+from src.synonym_automaton import synonym_store
+from src.tracing import tracer
+
+# Above this many rows, only the best n-gram candidates get fuzzy scored
+CANDIDATE_LIMIT = 2000
+
+# Results of repeated queries ("복용 방법", "환불", product names), per dataset version
+query_cache = QueryCache()
+
+# Hybrid lexical + semantic ranking: an embedding model id ('hashing' for the dependency-free
+# HashingEmbedder, or a sentence-transformers model name). Unset = fuzzy matching only.
+SEMANTIC_MODEL = os.environ.get("SEMANTIC_SEARCH") or None
 
 def load_synonyms():
-    try:
-        # Construct absolute path to synonyms.json
-        base_path = os.path.dirname(__file__) # src/
-        json_path = os.path.join(base_path, 'synonyms.json')
-        with open(json_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
+    # Served from the in-memory store; synonyms.json is only re-read when it changes
+    return synonym_store.get().synonyms
 
-def smart_search(df, query, threshold=55): # Lowered threshold slightly
+def smart_search(df, query, threshold=None, index=None, max_candidates=CANDIDATE_LIMIT, mode=SYLLABLE,
+                 cache=query_cache, semantic=SEMANTIC_MODEL):
     """
     Performs a smart search on the dataframe.
     1. Check Synonyms
     2. Fuzzy match on Product Name, Model, Tags, Question.
     3. Returns relevant rows.
+    Pass a prebuilt FaqIndex for df to skip rebuilding the search targets.
+    max_candidates caps how many rows are fuzzy scored (None = exhaustive scan).
+    mode='jamo' matches on decomposed jamo and accepts choseong queries like "ㄷㅂㅈ".
+    threshold defaults to the mode's DEFAULT_THRESHOLDS entry (55 for syllable matching).
+    With a prebuilt index, results are served from `cache` (pass None to always rescore).
+    Indexes of at least SHARDED_SEARCH_ROWS rows are scored exhaustively by a ShardedSearch
+    (syllable, fuzzy only queries) instead of the single-process candidate search.
+    semantic is an embedding model id that blends embedding similarity into the ranking
+    (defaults to the SEMANTIC_SEARCH environment variable; None = fuzzy only).
     """
     if not query:
         return pd.DataFrame() # Return empty if no query
 
+    with tracer.span("search", mode=mode, rows=len(df)) as span:
+        results = _search(df, query, threshold, index, max_candidates, mode, cache, semantic, span)
+        span.set(results=len(results))
+        return results
+
+def _search(df, query, threshold, index, max_candidates, mode, cache, semantic, span):
     # 0. Synonym Normalization
-    synonyms = load_synonyms()
-    # Normalize: Check exact match first
-    if query in synonyms:
-        query = synonyms[query]
-    
-    results = []
+    # Rewrites every synonym key inside the query (compiled once, reloaded when synonyms.json changes)
+    query = synonym_store.rewrite(query)
     
-    # Iterate through rows and score them
-    # This is simple; for 100 items it's fast enough.
-    for index, row in df.iterrows():
-        # Create a combined string for searching High Priority fields
-        target_text = f"{row['Product']} {row['Model']} {row['Tags']} {row['Question']}"
-        
-        # 1. Standard Token Set Ratio (Good for partial word matches)
-        score_token = fuzz.token_set_ratio(query, target_text)
-        
-        # 2. Spaceless Partial Ratio (Good for typos hidden in long text without spaces)
-        # We use partial_ratio to find if 'query' (with typo) exists as a substring in the long 'target'
-        query_spaceless = query.replace(" ", "")
-        target_spaceless = target_text.replace(" ", "")
-        score_spaceless = fuzz.partial_ratio(query_spaceless, target_spaceless)
-        
-        # Use the maximum score
-        score = max(score_token, score_spaceless)
-        
-        if score >= threshold:
-            row_data = row.to_dict() # Convert row to dict
-            row_data['score'] = score
-            results.append(row_data)
-            
-    # Sort by score
-    results.sort(key=lambda x: x['score'], reverse=True)
-    
-    return pd.DataFrame(results)
+    # 1. Fuzzy match against the prebuilt index (built here if the caller has none)
+    if index is None:
+        return FaqIndex(df).search(query, threshold, max_candidates=max_candidates, mode=mode, semantic=semantic)
+    sharded = None
+    if semantic is None and resolve_mode(query, mode) == SYLLABLE:
+        sharded = sharded_search_for(index)
+    span.set(sharded=sharded is not None)
+    if cache is None:
+        return index.build_results(*_match(index, sharded, query, threshold, max_candidates, mode, semantic))
+
+    # 2. Cached (row positions, scores) for this query on this version of the data
+    query = normalize_query(query)
+    key = (index.version, query, threshold, max_candidates, mode, semantic, sharded is not None)
+    matched = cache.get(key)
+    span.set(cache_hit=matched is not None)
+    if matched is None:
+        matched = _match(index, sharded, query, threshold, max_candidates, mode, semantic)
+        cache.put(key, matched)
+    return index.build_results(*matched)
 
-def get_suggestion(df, query):
+def _match(index, sharded, query, threshold, max_candidates, mode, semantic):
+    if sharded is not None:
+        try:
+            return sharded.match(query, threshold, mode)
+        except Exception as e:
+            # Its workers were just replaced for a newer index (or died): score in this process
+            print(f"Sharded search error: {e}")
+    return index.match(query, threshold, max_candidates=max_candidates, mode=mode, semantic=semantic)
+
+def get_suggestion(df, query, index=None):
     """
     Finds a suggested correction for the query from existing data keywords.
-    Returns the best match string and its score.
+    Returns the best matching keyword, or None if nothing is close enough.
     """
-    # Collect potential keywords
-    keywords = set()
-    if 'Product' in df.columns:
-        keywords.update(df['Product'].dropna().unique())
-    if 'Model' in df.columns:
-        keywords.update(df['Model'].dropna().unique())
-    if 'Tags' in df.columns:
-        # Split tags by comma
-        for tags in df['Tags'].dropna():
-            if isinstance(tags, str):
-                keywords.update([t.strip() for t in tags.split(',')])
-                
-    # Find best match
-    best_match = process.extractOne(query, keywords, scorer=fuzz.ratio)
-    
-    # best_match is (string, score)
-    if best_match and best_match[1] > 50: # Minimum confidence
-        return best_match[0]
+    suggestions = get_suggestions(df, query, k=1, index=index)
+    if suggestions:
+        return suggestions[0][0]
     return None
+
+def get_suggestions(df, query, k=5, index=None):
+    """
+    Returns up to k (keyword, score) "did you mean" candidates, best first.
+    Keywords come from Product, Model and Tags; the vocabulary is built once per FaqIndex.
+    """
+    with tracer.span("suggest") as span:
+        if index is None:
+            index = FaqIndex(df)
+        suggestions = index.suggestions.suggest(query, k)
+        span.set(results=len(suggestions))
+        return suggestions
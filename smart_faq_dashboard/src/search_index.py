@@ -0,0 +1,298 @@
+import uuid
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import fuzz, process
+from thefuzz import utils
+
+from src.hangul import decompose, is_choseong_query, to_choseong
+from src.ngram_index import NgramIndex
+from src.suggestion_index import SuggestionIndex
+from src.vector_index import VectorIndex, row_texts
+
+# High priority fields that make up the searchable text of a row
+SEARCH_FIELDS = ['Product', 'Model', 'Tags', 'Question']
+
+# Matching modes
+SYLLABLE = 'syllable'  # compare Hangul syllables as-is (default)
+JAMO = 'jamo'          # compare decomposed jamo, so one wrong final consonant is a small edit
+CHOSEONG = 'choseong'  # initial-consonant queries ("ㄷㅂㅈ"), picked automatically in jamo mode
+
+# Jamo strings share many common letters, so their scores run higher than syllable scores
+DEFAULT_THRESHOLDS = {SYLLABLE: 55, JAMO: 70, CHOSEONG: 80}
+
+# Hybrid ranking (match(..., semantic=model_id)): share of the semantic score in the fused score,
+# and how many nearest rows get a semantic score (the K-th nearest scores 0, the nearest 100)
+SEMANTIC_WEIGHT = 0.3
+SEMANTIC_TOP_K = 50
+# Fused scores run lower than fuzzy ones (the semantic part is 0 past the K nearest rows),
+# so a row matches on its fused score at this many points below the threshold
+SEMANTIC_THRESHOLD_DROP = 10
+
+
+def resolve_mode(query, mode=SYLLABLE):
+    """Returns the effective matching mode for the query."""
+    if mode == JAMO and is_choseong_query(query):
+        return CHOSEONG
+    return mode
+
+
+def query_passes(query, mode=SYLLABLE):
+    """
+    The scoring passes for a query: (scorer, prepared query, target list name) tuples, where
+    the name is one of FaqIndex.TARGET_LISTS. A row's score is the max over the passes.
+    In jamo mode both sides are decomposed first; choseong queries use partial_ratio
+    against the initial consonants of each row.
+    """
+    mode = resolve_mode(query, mode)
+    query_spaceless = query.replace(" ", "")
+    if mode == SYLLABLE:
+        return [
+            # 1. Standard Token Set Ratio (Good for partial word matches)
+            (fuzz.token_set_ratio, utils.full_process(query, force_ascii=True), 'processed'),
+            # 2. Spaceless Partial Ratio (Good for typos hidden in long text without spaces)
+            (fuzz.partial_ratio, query_spaceless, 'spaceless'),
+        ]
+    if mode == JAMO:
+        return [
+            (fuzz.token_set_ratio, decompose(utils.full_process(query, force_ascii=True)), 'jamo_processed'),
+            (fuzz.partial_ratio, decompose(query_spaceless), 'jamo_spaceless'),
+        ]
+    if mode == CHOSEONG:
+        return [(fuzz.partial_ratio, query_spaceless, 'choseong')]
+    raise ValueError(f"Unknown matching mode: {mode}")
+
+
+def score_texts(query, texts):
+    """
+    Scores arbitrary texts (e.g. manual chunks) against the query with the same two passes
+    as FaqIndex.score in syllable mode. Returns an int array, one score per text.
+    """
+    if not texts:
+        return np.zeros(0, dtype=np.int64)
+    processed = [utils.full_process(t, force_ascii=True) for t in texts]
+    spaceless = [t.replace(" ", "") for t in texts]
+    token_set = process.cdist([utils.full_process(query, force_ascii=True)], processed,
+                              scorer=fuzz.token_set_ratio, dtype=np.float64)[0]
+    partial = process.cdist([query.replace(" ", "")], spaceless, scorer=fuzz.partial_ratio, dtype=np.float64)[0]
+    return np.round(np.maximum(token_set, partial)).astype(np.int64)
+
+
+class FaqIndex:
+    """
+    Search structures prebuilt once per loaded FAQ DataFrame.
+    Target strings are normalized up front so a query only costs
+    one batched scoring call per scorer instead of a Python loop over rows.
+    """
+
+    # Normalized target lists a scoring pass can run against (see query_passes)
+    TARGET_LISTS = ('processed', 'spaceless', 'jamo_processed', 'jamo_spaceless', 'choseong')
+
+    def __init__(self, df):
+        self.df = df
+
+        self.targets = self._combine_targets(df)
+        # token_set_ratio input (thefuzz full_process) and partial_ratio input (no spaces)
+        self.targets_processed = [utils.full_process(t, force_ascii=True) for t in self.targets]
+        self.targets_spaceless = [t.replace(" ", "") for t in self.targets]
+        # Identifies this data for result caches: every new or updated index gets a new version
+        self.version = uuid.uuid4().hex
+
+        self._ngrams = None
+        self._jamo = None
+        self._suggestions = None
+        self._vectors = {}  # embedding model id -> VectorIndex
+
+    @staticmethod
+    def _combine_targets(df):
+        # Same combined string smart_search always used: "Product Model Tags Question"
+        columns = [df[col] if col in df.columns else [''] * len(df) for col in SEARCH_FIELDS]
+        return [f"{p} {m} {t} {q}" for p, m, t, q in zip(*columns)]
+
+    def __len__(self):
+        return len(self.targets)
+
+    def updated(self, df, changed):
+        """
+        Returns a new FaqIndex for df, a modified copy of self.df where only the rows at
+        the `changed` positions differ (rows past the old length count as inserted, and
+        df may be shorter than before). Unchanged rows reuse their normalized strings;
+        structures that were already built are rebuilt right away so searches never pay for them.
+        The current index is left untouched, so searches running on it stay consistent.
+        """
+        changed = sorted({int(i) for i in changed if i < len(df)} | set(range(len(self), len(df))))
+        fresh = FaqIndex.__new__(FaqIndex)
+        fresh.df = df
+        fresh.version = uuid.uuid4().hex
+
+        keep = min(len(self), len(df))
+        fresh.targets = self.targets[:keep] + [''] * (len(df) - keep)
+        for pos, target in zip(changed, self._combine_targets(df.iloc[changed])):
+            fresh.targets[pos] = target
+        fresh.targets_processed = self.targets_processed[:keep] + [''] * (len(df) - keep)
+        fresh.targets_spaceless = self.targets_spaceless[:keep] + [''] * (len(df) - keep)
+        for pos in changed:
+            fresh.targets_processed[pos] = utils.full_process(fresh.targets[pos], force_ascii=True)
+            fresh.targets_spaceless[pos] = fresh.targets[pos].replace(" ", "")
+
+        fresh._jamo = None
+        if self._jamo is not None:
+            processed, spaceless, choseong = (lst[:keep] + [''] * (len(df) - keep) for lst in self._jamo)
+            for pos in changed:
+                processed[pos] = decompose(fresh.targets_processed[pos])
+                spaceless[pos] = decompose(fresh.targets_spaceless[pos])
+                choseong[pos] = to_choseong(fresh.targets_spaceless[pos])
+            fresh._jamo = (processed, spaceless, choseong)
+
+        fresh._ngrams = None
+        fresh._suggestions = None
+        # Embeddings cover Answer too, which sheet sync counts as a change; only changed rows are re-embedded
+        changed_texts = row_texts(df.iloc[changed])
+        fresh._vectors = {model_id: vectors.updated(len(df), changed, changed_texts)
+                          for model_id, vectors in self._vectors.items()}
+        if self._ngrams is not None:
+            fresh.ngrams
+        if self._suggestions is not None:
+            fresh.suggestions
+        return fresh
+
+    @property
+    def ngrams(self):
+        """Character n-gram inverted index, built on first use (only needed for pruned searches)."""
+        if self._ngrams is None:
+            self._ngrams = NgramIndex(self.targets)
+        return self._ngrams
+
+    @property
+    def jamo(self):
+        """
+        Jamo-decomposed copies of the target strings, built on first jamo-mode search.
+        Returns (processed, spaceless, choseong spaceless) lists aligned with the rows.
+        """
+        if self._jamo is None:
+            processed = [decompose(t) for t in self.targets_processed]
+            spaceless = [decompose(t) for t in self.targets_spaceless]
+            choseong = [to_choseong(t) for t in self.targets_spaceless]
+            self._jamo = (processed, spaceless, choseong)
+        return self._jamo
+
+    @property
+    def suggestions(self):
+        """Keyword BK-tree for "did you mean", built on the first zero-result query."""
+        if self._suggestions is None:
+            self._suggestions = SuggestionIndex(self.df)
+        return self._suggestions
+
+    def vectors(self, model_id):
+        """Row embeddings (Question, Answer, Tags) for an embedding model, built on first semantic search."""
+        vectors = self._vectors.get(model_id)
+        if vectors is None:
+            vectors = self._vectors[model_id] = VectorIndex(row_texts(self.df), model_id)
+        return vectors
+
+    def target_list(self, name):
+        """One of TARGET_LISTS, aligned with the rows (jamo lists are built on first use)."""
+        if name == 'processed':
+            return self.targets_processed
+        if name == 'spaceless':
+            return self.targets_spaceless
+        return self.jamo[self.TARGET_LISTS.index(name) - 2]
+
+    def candidates(self, query, max_candidates=None, mode=SYLLABLE):
+        """
+        Returns the row positions worth scoring, or None for all rows.
+        Pruning only kicks in when the catalog is larger than max_candidates.
+        """
+        if max_candidates is None or len(self) <= max_candidates:
+            return None
+        if resolve_mode(query, mode) == CHOSEONG:
+            return None  # initial consonants share no n-grams with the syllable text
+        return self.ngrams.candidates(query, max_candidates)
+
+    def score(self, query, positions=None, mode=SYLLABLE):
+        """
+        Scores rows against the query (all rows, or only the given positions).
+        Returns an int array with max(token_set_ratio, spaceless partial_ratio) per row;
+        rows that were not scored get 0. See query_passes for the jamo and choseong modes.
+        """
+        passes = [(scorer, prepared, self.target_list(name)) for scorer, prepared, name in query_passes(query, mode)]
+        return self._score_passes(passes, positions)
+
+    def _score_passes(self, passes, positions):
+        """Runs each (scorer, query, targets) pass as one batched cdist call and keeps the max per row."""
+        scores = np.zeros(len(self), dtype=np.int64)
+        if positions is None:
+            positions = np.arange(len(self))
+        else:
+            passes = [(scorer, query, [targets[i] for i in positions]) for scorer, query, targets in passes]
+        if len(positions) == 0:
+            return scores
+
+        best = None
+        for scorer, query, targets in passes:
+            pass_scores = process.cdist([query], targets, scorer=scorer, dtype=np.float64)[0]
+            best = pass_scores if best is None else np.maximum(best, pass_scores)
+
+        # thefuzz rounds each score to an int; np.round matches round() (half to even)
+        scores[positions] = np.round(best)
+        return scores
+
+    def rank(self, scores, threshold):
+        """Returns row positions with score >= threshold, best first (ties keep row order)."""
+        matched = np.flatnonzero(scores >= threshold)
+        order = np.argsort(-scores[matched], kind='stable')
+        return matched[order]
+
+    def build_results(self, positions, scores):
+        """
+        Builds the result DataFrame (original columns + 'score') for the given row positions;
+        scores[i] is the score of positions[i].
+        """
+        if len(positions) == 0:
+            return pd.DataFrame()
+        results = self.df.iloc[positions].reset_index(drop=True)
+        results['score'] = np.asarray(scores, dtype=np.int64)
+        return results
+
+    def fuse(self, fuzzy, near, similarity, weight=SEMANTIC_WEIGHT):
+        """
+        Blends fuzzy scores with the similarities of the nearest rows (`near`, best first).
+        Raw cosine similarities depend on the model and the query, so they are rescaled per
+        query: the nearest row gets 100, the last of `near` 0, rows outside `near` 0.
+        """
+        semantic = np.zeros(len(fuzzy), dtype=np.float64)
+        if len(near) > 1 and similarity[0] > similarity[-1]:
+            semantic[near] = (similarity - similarity[-1]) / (similarity[0] - similarity[-1]) * 100
+        elif len(near):
+            semantic[near] = 100
+        return np.round((1 - weight) * fuzzy + weight * semantic).astype(np.int64)
+
+    def match(self, query, threshold=None, max_candidates=None, mode=SYLLABLE, semantic=None):
+        """
+        Returns (positions, scores) of the matching rows, best first, as compact arrays.
+        semantic=<embedding model id> ranks by the fuzzy score fused with embedding similarity
+        (see fuse); a row matches when its fuzzy score reaches the threshold or its fused score
+        comes within SEMANTIC_THRESHOLD_DROP of it, and the returned scores are the fused ones.
+        Choseong queries stay fuzzy only.
+        """
+        resolved = resolve_mode(query, mode)
+        if threshold is None:
+            threshold = DEFAULT_THRESHOLDS[resolved]
+        positions = self.candidates(query, max_candidates, mode)
+        if semantic is None or resolved == CHOSEONG:
+            scores = self.score(query, positions, mode)
+            positions = self.rank(scores, threshold)
+            return positions.astype(np.int32), scores[positions].astype(np.int16)
+
+        near, similarity = self.vectors(semantic).top_k(query, SEMANTIC_TOP_K)
+        if positions is not None:
+            # Paraphrases share few n-grams with their rows: score the nearest rows too
+            positions = np.union1d(positions, near)
+        fuzzy = self.score(query, positions, mode)
+        scores = self.fuse(fuzzy, near, similarity)
+        matched = np.flatnonzero((fuzzy >= threshold) | (scores >= threshold - SEMANTIC_THRESHOLD_DROP))
+        positions = matched[np.argsort(-scores[matched], kind='stable')]
+        return positions.astype(np.int32), scores[positions].astype(np.int16)
+
+    def search(self, query, threshold=None, max_candidates=None, mode=SYLLABLE, semantic=None):
+        return self.build_results(*self.match(query, threshold, max_candidates, mode, semantic))
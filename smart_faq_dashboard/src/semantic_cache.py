@@ -0,0 +1,142 @@
+import threading
+import time
+
+import numpy as np
+
+SIMILARITY_THRESHOLD = 0.9   # cosine similarity needed to reuse an answer
+MAX_ENTRIES = 2000           # total cached questions across all FAQ rows
+MAX_ENTRIES_PER_ROW = 32     # cached questions per FAQ row (context)
+ENTRY_TTL = 24 * 3600        # seconds
+
+
+class _RowEntries:
+    """Cached questions for one FAQ row: a float32 matrix of query vectors plus answers."""
+
+    def __init__(self, dim):
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.queries = []
+        self.answers = []
+        self.created = []
+        self.used = []
+
+    def __len__(self):
+        return len(self.answers)
+
+    def remove(self, i):
+        self.vectors = np.delete(self.vectors, i, axis=0)
+        for lst in (self.queries, self.answers, self.created, self.used):
+            del lst[i]
+
+
+class SemanticCache:
+    """
+    Reuses an AI answer when a new question about the same FAQ row is a near-duplicate
+    of one already answered ("bcaa 복용 방법" / "BCAA 복용방법은?").
+    Each row keeps its question vectors in a NumPy matrix, so a lookup is one
+    matrix-vector product. `embed` is any function list[str] -> (n, d) L2-normalized array;
+    it should be a real sentence embedding model (embeddings.sentence_transformer_embedder).
+    HashingEmbedder only compares surface n-grams, so "환불 가능한가요" and "환불 불가능한가요"
+    score 0.79 with it. Even real models can place a question and its negation close
+    together, so keep the threshold high.
+    Least recently used entries are evicted above the per-row and total limits.
+    """
+
+    def __init__(self, embed, threshold=SIMILARITY_THRESHOLD, max_entries=MAX_ENTRIES,
+                 max_entries_per_row=MAX_ENTRIES_PER_ROW, ttl=ENTRY_TTL):
+        self.embed = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_entries_per_row = max_entries_per_row
+        self.ttl = ttl
+        self.rows = {}  # row (context) key -> _RowEntries
+        self.size = 0
+        self.stats = {'lookups': 0, 'hits': 0, 'near_duplicate_hits': 0, 'misses': 0,
+                      'writes': 0, 'evictions': 0, 'hit_similarity_sum': 0.0}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.size
+
+    def _embed_one(self, text):
+        return np.asarray(self.embed([text]), dtype=np.float32)[0]
+
+    def lookup(self, row_key, query):
+        """Returns (answer, similarity) of the closest cached question for this row, or None."""
+        vector = self._embed_one(query)
+        now = time.time()
+        with self._lock:
+            self.stats['lookups'] += 1
+            entries = self.rows.get(row_key)
+            if entries is not None:
+                self._expire(row_key, entries, now)
+                entries = self.rows.get(row_key)
+            if not entries:
+                self.stats['misses'] += 1
+                return None
+
+            similarities = entries.vectors @ vector
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            if similarity < self.threshold:
+                self.stats['misses'] += 1
+                return None
+
+            entries.used[best] = now
+            self.stats['hits'] += 1
+            self.stats['hit_similarity_sum'] += similarity
+            if entries.queries[best] != query:
+                self.stats['near_duplicate_hits'] += 1
+            return entries.answers[best], similarity
+
+    def add(self, row_key, query, answer):
+        vector = self._embed_one(query)
+        now = time.time()
+        with self._lock:
+            entries = self.rows.get(row_key)
+            if entries is None:
+                entries = self.rows[row_key] = _RowEntries(len(vector))
+            entries.vectors = np.vstack([entries.vectors, vector[None, :]])
+            entries.queries.append(query)
+            entries.answers.append(answer)
+            entries.created.append(now)
+            entries.used.append(now)
+            self.size += 1
+            self.stats['writes'] += 1
+
+            if len(entries) > self.max_entries_per_row:
+                self._evict_from(row_key, entries)
+            while self.size > self.max_entries:
+                self._evict_global()
+
+    def _expire(self, row_key, entries, now):
+        for i in range(len(entries) - 1, -1, -1):
+            if now - entries.created[i] > self.ttl:
+                entries.remove(i)
+                self.size -= 1
+                self.stats['evictions'] += 1
+        if not entries:
+            del self.rows[row_key]
+
+    def _evict_from(self, row_key, entries):
+        entries.remove(int(np.argmin(entries.used)))
+        self.size -= 1
+        self.stats['evictions'] += 1
+        if not entries:
+            del self.rows[row_key]
+
+    def _evict_global(self):
+        # Least recently used entry over all (non-empty) rows
+        row_key = min((k for k in self.rows if self.rows[k]), key=lambda k: min(self.rows[k].used))
+        self._evict_from(row_key, self.rows[row_key])
+
+    def metrics(self):
+        """Stats plus derived rates: how often near-duplicates were reused."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = self.size
+            stats['rows'] = len(self.rows)
+        lookups = stats['lookups'] or 1
+        stats['hit_rate'] = stats['hits'] / lookups
+        stats['near_duplicate_rate'] = stats['near_duplicate_hits'] / lookups
+        stats['mean_hit_similarity'] = stats['hit_similarity_sum'] / stats['hits'] if stats['hits'] else 0.0
+        return stats
@@ -0,0 +1,231 @@
+import atexit
+import heapq
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+from rapidfuzz import process
+
+from src.search_index import DEFAULT_THRESHOLDS, JAMO, SYLLABLE, query_passes, resolve_mode
+
+SYLLABLE_LISTS = ('processed', 'spaceless')
+JAMO_LISTS = ('jamo_processed', 'jamo_spaceless', 'choseong')
+
+# smart_search scores catalogs of at least this many rows with a ShardedSearch (0 = off)
+SHARDED_SEARCH_ROWS = int(os.environ.get("SHARDED_SEARCH_ROWS", 0))
+SHARDED_SEARCH_WORKERS = int(os.environ.get("SHARDED_SEARCH_WORKERS", 0)) or None  # default: one per CPU
+
+# The shard a worker process owns: (row ids, {target list name: strings}), decoded once at start
+_shard = None
+
+
+def _pack(lists, ids):
+    """
+    Lays out row ids and UTF-8 target lists in one shared memory block.
+    Returns (SharedMemory, layout): layout['ids'] is the byte offset of the int64 ids and
+    layout['lists'] maps each list name to (offsets array byte offset, string bytes offset).
+    """
+    n = len(ids)
+    encoded = {}
+    size = n * 8
+    for name, strings in lists.items():
+        data = [s.encode('utf-8') for s in strings]
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum([len(d) for d in data], out=offsets[1:])
+        encoded[name] = (offsets, b"".join(data))
+        size += offsets.nbytes + int(offsets[-1])
+
+    shm = SharedMemory(create=True, size=max(size, 1))
+    layout = {'ids': 0, 'lists': {}}
+    np.ndarray(n, dtype=np.int64, buffer=shm.buf)[:] = ids
+    cursor = n * 8
+    for name, (offsets, blob) in encoded.items():
+        np.ndarray(n + 1, dtype=np.int64, buffer=shm.buf, offset=cursor)[:] = offsets
+        layout['lists'][name] = (cursor, cursor + offsets.nbytes)
+        shm.buf[cursor + offsets.nbytes:cursor + offsets.nbytes + len(blob)] = blob
+        cursor += offsets.nbytes + len(blob)
+    return shm, layout
+
+
+def _attach(shm_name, layout, n, start, stop):
+    """Worker initializer: decodes rows [start, stop) from the shared block into this process."""
+    global _shard
+    # Spawned workers share the parent's resource tracker, so attaching doesn't add an owner
+    shm = SharedMemory(name=shm_name)
+    try:
+        ids = np.ndarray(n, dtype=np.int64, buffer=shm.buf, offset=layout['ids'])[start:stop].copy()
+        lists = {}
+        for name, (offsets_at, blob_at) in layout['lists'].items():
+            offsets = np.ndarray(n + 1, dtype=np.int64, buffer=shm.buf, offset=offsets_at)[start:stop + 1].copy()
+            blob = bytes(shm.buf[blob_at + offsets[0]:blob_at + offsets[-1]])
+            offsets -= offsets[0]
+            lists[name] = [blob[a:b].decode('utf-8') for a, b in zip(offsets[:-1], offsets[1:])]
+        _shard = (ids, lists)
+    finally:
+        shm.close()
+
+
+def _shard_size():
+    return len(_shard[0])
+
+
+def _search_shard(passes, threshold, k):
+    """
+    Scores the worker's shard. passes are (scorer, prepared query, list name) as in query_passes.
+    Returns [(-score, row id)] for rows with score >= threshold, best first (ties by row id), at most k.
+    """
+    ids, lists = _shard
+    best = None
+    for scorer, query, name in passes:
+        scores = process.cdist([query], lists[name], scorer=scorer, dtype=np.float64, workers=1)[0]
+        best = scores if best is None else np.maximum(best, scores)
+    # thefuzz rounds each score to an int; np.round matches round() (half to even)
+    scores = np.round(best).astype(np.int64)
+    matched = np.flatnonzero(scores >= threshold)
+    if k is not None and len(matched) > k:
+        # Keep every row tied with the k-th best score, so ties still go to the lowest row ids
+        kth = -np.partition(-scores[matched], k - 1)[k - 1]
+        matched = matched[scores[matched] >= kth]
+    order = np.lexsort((ids[matched], -scores[matched]))
+    matched = matched[order][:k]
+    return list(zip((-scores[matched]).tolist(), ids[matched].tolist()))
+
+
+class ShardedSearch:
+    """
+    Exhaustive fuzzy search split across worker processes, for catalogs too large to
+    score on one core.
+
+    The normalized target strings and row ids are written once into a shared memory
+    block. Each shard has its own single-process executor that decodes only its slice
+    of that block at startup, so query requests carry just the query, and each process
+    keeps its rows between queries. Per-shard results come back sorted and are merged
+    with a heap, so a top-k query only moves k rows per shard. rapidfuzz releases the
+    GIL, but the processes also parallelize the Python work around each call.
+
+    Results match FaqIndex.match(max_candidates=None) (same scores and order). Pass
+    modes=(SYLLABLE, JAMO) to share the jamo lists too. Use as a context manager, or call
+    close() to stop the workers and free the shared memory.
+    """
+
+    def __init__(self, index, workers=None, modes=(SYLLABLE,)):
+        self.index = index
+        self.workers = max(1, min(workers or os.cpu_count() or 1, len(index) or 1))
+        self.modes = modes
+
+        names = SYLLABLE_LISTS + (JAMO_LISTS if JAMO in modes else ())
+        lists = {name: index.target_list(name) for name in names}
+        self._shm, layout = _pack(lists, np.arange(len(index), dtype=np.int64))
+        self._executors = []
+        try:
+            self._start(layout)
+        except BaseException:
+            self.close()
+            raise
+
+    def _start(self, layout):
+
+        # spawn: workers get their rows through the shared block, not a fork of this (threaded) process
+        context = multiprocessing.get_context('spawn')
+        n = len(self.index)
+        bounds = np.linspace(0, n, self.workers + 1).astype(int)
+        self._executors = [
+            ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=_attach,
+                                initargs=(self._shm.name, layout, n, int(a), int(b)))
+            for a, b in zip(bounds[:-1], bounds[1:])
+        ]
+        # Start the workers now, so the first query doesn't pay for process startup
+        self.shard_sizes = [f.result() for f in [executor.submit(_shard_size) for executor in self._executors]]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def match(self, query, threshold=None, mode=SYLLABLE, k=None):
+        """Returns (positions, scores) of the best k matching rows (all matches if k is None), best first."""
+        resolved = resolve_mode(query, mode)
+        if resolved != SYLLABLE and JAMO not in self.modes:
+            raise ValueError(f"{resolved} queries need ShardedSearch(..., modes=({SYLLABLE!r}, {JAMO!r}))")
+        if threshold is None:
+            threshold = DEFAULT_THRESHOLDS[resolved]
+
+        passes = query_passes(query, mode)
+        futures = [executor.submit(_search_shard, passes, threshold, k) for executor in self._executors]
+        merged = heapq.merge(*(future.result() for future in futures))
+        top = list(itertools.islice(merged, k))
+        positions = np.fromiter((pos for _, pos in top), dtype=np.int32, count=len(top))
+        scores = np.fromiter((-score for score, _ in top), dtype=np.int16, count=len(top))
+        return positions, scores
+
+    def search(self, query, threshold=None, mode=SYLLABLE, k=None):
+        return self.index.build_results(*self.match(query, threshold, mode, k))
+
+    def close(self):
+        for executor in self._executors:
+            executor.shutdown(wait=True, cancel_futures=True)
+        self._executors = []
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+# The ShardedSearch smart_search uses (one per process, for the latest large index)
+_active = None
+_starting = None  # (index, thread) of the last ShardedSearch started
+_active_lock = threading.Lock()
+
+
+def sharded_search_for(index, wait=False):
+    """
+    Returns the ShardedSearch for index if it has at least SHARDED_SEARCH_ROWS rows and its
+    workers are up, else None (search in this process). The first call for an index starts
+    the workers in a background thread; once they are up they replace, and close, the ones
+    for the previous index. wait=True blocks until they are up.
+    """
+    global _starting
+    if not SHARDED_SEARCH_ROWS or len(index) < SHARDED_SEARCH_ROWS:
+        return None
+    with _active_lock:
+        if _active is not None and _active.index is index:
+            return _active
+        if _starting is None or _starting[0] is not index:
+            thread = threading.Thread(target=_start_for, args=(index,), name="sharded-search-start", daemon=True)
+            _starting = (index, thread)
+            thread.start()
+        thread = _starting[1]
+    if not wait:
+        return None
+    thread.join()
+    with _active_lock:
+        return _active if _active is not None and _active.index is index else None
+
+
+def _start_for(index):
+    global _active
+    try:
+        sharded = ShardedSearch(index, workers=SHARDED_SEARCH_WORKERS)
+    except Exception as e:
+        # Not retried for this index (_starting still names it); searches stay in-process
+        print(f"Sharded search start error: {e}")
+        return
+    with _active_lock:
+        if _starting[0] is index:
+            sharded, _active = _active, sharded
+    if sharded is not None:
+        sharded.close()  # the previous index's, or this one if a newer index came in meanwhile
+
+
+@atexit.register
+def _close_active():
+    global _active
+    with _active_lock:
+        sharded, _active = _active, None
+    if sharded is not None:
+        sharded.close()
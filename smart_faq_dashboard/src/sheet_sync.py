@@ -0,0 +1,257 @@
+import hashlib
+import threading
+
+import pandas as pd
+from gspread.utils import rowcol_to_a1
+
+from src.search_index import FaqIndex
+from src.tracing import tracer
+
+REFRESH_INTERVAL = 60  # seconds between background syncs
+
+# df.attrs key naming the SheetSync a DataFrame came from
+SYNC_ATTR = 'sheet_sync'
+
+
+def _row_hash(row):
+    return hashlib.sha1("\x1f".join(row).encode('utf-8')).hexdigest()
+
+
+def _pad(row, width):
+    # The Sheets API trims trailing empty cells
+    row = [str(v) for v in row[:width]]
+    return row + [''] * (width - len(row))
+
+
+class SheetSync:
+    """
+    Keeps a Google Sheet mirrored in memory (rows + FaqIndex) and applies only
+    the rows that changed since the last sync, from a background thread.
+
+    Change detection:
+    - With a revision column, only that column is fetched, and then only the ranges
+      whose revision changed. Its values must be unique per row (e.g. a row id plus an
+      "Updated" timestamp kept by a sheet script), since rows are matched by position:
+      a deleted or inserted row is only seen through the revisions that shift under it.
+      When the column's length changes or it holds duplicate values, the sync falls back
+      to the hash comparison below for that cycle.
+    - Without one, all values are fetched (same API cost as get_all_records), but
+      rows are compared by hash so only changed rows are re-indexed.
+    Rows are identified by position; a row inserted mid-sheet shows up as updates
+    to the rows below it plus one appended row.
+
+    `worksheet` only needs the gspread Worksheet methods get_all_values(),
+    col_values() and batch_get(), so a local fake works for tests.
+    """
+
+    def __init__(self, worksheet, name="", revision_column=None, prepare=None, interval=REFRESH_INTERVAL):
+        self.worksheet = worksheet
+        self.name = name
+        self.revision_column = revision_column
+        self.prepare = prepare  # DataFrame cleanup applied after every sync (e.g. clean_dataframe)
+        self.interval = interval
+
+        self.header = []
+        self.rows = []
+        self.hashes = []
+        self.revisions = []
+        self.index = None
+        self.version = 0
+        self.stats = {'full_fetches': 0, 'range_fetches': 0, 'rows_fetched': 0,
+                      'rows_changed': 0, 'syncs': 0, 'errors': 0}
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- Loading -------------------------------------------------------------
+
+    def load(self):
+        """Full load (first sync, or when the header changed)."""
+        with tracer.span("sheet_fetch") as span:
+            values = self.worksheet.get_all_values()
+            span.set(rows=max(len(values) - 1, 0))
+        self.stats['full_fetches'] += 1
+        header = [str(h) for h in values[0]] if values else []
+        rows = [_pad(r, len(header)) for r in values[1:]]
+        self.stats['rows_fetched'] += len(rows)
+
+        self.header = header
+        self.rows = rows
+        self.hashes = [_row_hash(r) for r in rows]
+        self.revisions = self._revisions_from_rows(rows)
+        self._publish(FaqIndex(self._build_dataframe()))
+
+    def refresh(self):
+        """Fetches what changed and applies it. Returns the number of changed rows."""
+        with self._lock, tracer.span("sheet_sync") as span:
+            self.stats['syncs'] += 1
+            if self.index is None:
+                self.load()
+                changed = len(self.rows)
+            elif self._revision_col_index() is not None:
+                changed = self._refresh_by_revision()
+            else:
+                changed = self._refresh_by_hash()
+            span.set(rows=changed)
+            return changed
+
+    def _refresh_by_hash(self):
+        with tracer.span("sheet_fetch") as span:
+            values = self.worksheet.get_all_values()
+            span.set(rows=max(len(values) - 1, 0))
+        self.stats['full_fetches'] += 1
+        if not values or [str(h) for h in values[0]] != self.header:
+            self.load()
+            return len(self.rows)
+
+        fetched = {pos: _pad(r, len(self.header)) for pos, r in enumerate(values[1:])}
+        self.stats['rows_fetched'] += len(fetched)
+        return self._apply(fetched, len(values) - 1)
+
+    def _refresh_by_revision(self):
+        col = self._revision_col_index()
+        column = self.worksheet.col_values(col + 1)
+        if not column or str(column[0]) != self.revision_column:
+            self.load()
+            return len(self.rows)
+        revisions = [str(v) for v in column[1:]]
+        # col_values trims trailing empty cells, so compare against the known revisions trimmed the same way
+        known = list(self.revisions)
+        while known and known[-1] == '':
+            known.pop()
+        if len(revisions) != len(known) or len(set(revisions)) != len(revisions):
+            # Rows were added or deleted (positions may have shifted), or revisions can't tell rows apart
+            return self._refresh_by_hash()
+
+        changed = [pos for pos, rev in enumerate(revisions) if rev != known[pos]]
+        fetched = self._fetch_rows(changed)
+        return self._apply(fetched, len(self.rows))
+
+    def _fetch_rows(self, positions):
+        """Fetches the given row positions as contiguous ranges in one batch_get call."""
+        if not positions:
+            return {}
+        runs = []
+        start = prev = positions[0]
+        for pos in positions[1:]:
+            if pos != prev + 1:
+                runs.append((start, prev))
+                start = pos
+            prev = pos
+        runs.append((start, prev))
+
+        width = len(self.header)
+        # Sheet row 1 is the header, so row position p lives on sheet row p + 2
+        ranges = [f"{rowcol_to_a1(a + 2, 1)}:{rowcol_to_a1(b + 2, width)}" for a, b in runs]
+        with tracer.span("sheet_fetch", ranges=len(ranges)):
+            results = self.worksheet.batch_get(ranges)
+        self.stats['range_fetches'] += len(ranges)
+
+        fetched = {}
+        for (a, b), values in zip(runs, results):
+            values = list(values)
+            for offset in range(b - a + 1):
+                row = values[offset] if offset < len(values) else []
+                fetched[a + offset] = _pad(row, width)
+        self.stats['rows_fetched'] += len(fetched)
+        return fetched
+
+    # --- Applying changes ----------------------------------------------------
+
+    def _apply(self, fetched, new_length):
+        """Applies fetched rows (position -> values) and truncation; re-indexes only changed rows."""
+        changed = []
+        rows = self.rows[:new_length]
+        hashes = self.hashes[:new_length]
+        for pos in range(len(rows), new_length):
+            rows.append([''] * len(self.header))
+            hashes.append(None)
+        for pos, row in fetched.items():
+            if pos >= new_length:
+                continue
+            h = _row_hash(row)
+            if h != hashes[pos]:
+                rows[pos] = row
+                hashes[pos] = h
+                changed.append(pos)
+
+        if not changed and new_length == len(self.rows):
+            self.revisions = self._revisions_from_rows(rows)
+            return 0
+
+        self.rows = rows
+        self.hashes = hashes
+        self.revisions = self._revisions_from_rows(rows)
+        self.stats['rows_changed'] += len(changed) + max(len(self.index) - new_length, 0)
+        self._publish(self.index.updated(self._build_dataframe(), changed))
+        return len(changed)
+
+    def _revision_col_index(self):
+        if self.revision_column and self.revision_column in self.header:
+            return self.header.index(self.revision_column)
+        return None
+
+    def _revisions_from_rows(self, rows):
+        col = self._revision_col_index()
+        if col is None:
+            return []
+        return [r[col] for r in rows]
+
+    def _build_dataframe(self):
+        df = pd.DataFrame(self.rows, columns=self.header)
+        if self.prepare is not None:
+            df = self.prepare(df)
+        df.attrs[SYNC_ATTR] = self.name
+        return df
+
+    def _publish(self, index):
+        # Swapping the reference is atomic, so readers see either the old or the new index
+        self.index = index
+        self.version += 1
+
+    # --- Background refresher ------------------------------------------------
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"sheet-sync-{self.name}", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                # Keep serving the last good data; try again next interval
+                self.stats['errors'] += 1
+                print(f"Sheet sync error ({self.name}): {e}")
+
+
+# One sync per sheet URL per process
+_syncs = {}
+_syncs_lock = threading.Lock()
+
+
+def get_sheet_sync(name, open_worksheet, **kwargs):
+    """
+    Returns the running SheetSync for `name`, creating it on first use:
+    open_worksheet() is called once, the sheet is loaded, and the background refresher started.
+    """
+    with _syncs_lock:
+        sync = _syncs.get(name)
+        if sync is None:
+            sync = SheetSync(open_worksheet(), name=name, **kwargs)
+            sync.refresh()
+            sync.start()
+            _syncs[name] = sync
+    return sync
+
+
+def find_sheet_sync(name):
+    return _syncs.get(name)
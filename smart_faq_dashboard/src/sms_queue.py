@@ -0,0 +1,250 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.sms_sender import SmsSendError, default_provider
+from src.tracing import tracer
+
+QUEUE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.cache', 'sms_queue.sqlite')
+WORKERS = 2
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 1.0    # seconds before the first retry; doubled on every retry
+BACKOFF_MAX = 300.0
+POLL_INTERVAL = 0.5   # seconds an idle worker waits before looking for due jobs again
+LEASE_TIMEOUT = 120   # a job left 'sending' this long (e.g. the process died mid-request) becomes 'unknown'
+
+# Job states
+QUEUED = 'queued'
+SENDING = 'sending'
+SENT = 'sent'
+FAILED = 'failed'
+UNKNOWN = 'unknown'  # the provider may or may not have sent it; never resent automatically
+
+
+class SmsQueue:
+    """
+    Persistent SMS outbox (SQLite), so queued messages survive a restart.
+    Every job has an idempotency key: enqueueing the same key twice returns the
+    existing job instead of sending twice.
+    """
+
+    def __init__(self, path=QUEUE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sms_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    idempotency_key TEXT NOT NULL UNIQUE,
+                    phone TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    detail TEXT NOT NULL DEFAULT '',
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS sms_jobs_due ON sms_jobs (status, next_attempt_at)")
+            self._conn = conn
+        return self._conn
+
+    def enqueue(self, phone, message, idempotency_key=None):
+        """Adds a message to the outbox and returns its job id."""
+        if not phone or not message:
+            raise ValueError("Phone number or message is empty.")
+        key = idempotency_key or uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT OR IGNORE INTO sms_jobs (idempotency_key, phone, message, status, "
+                         "next_attempt_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (key, phone, message, QUEUED, now, now, now))
+            (job_id,) = conn.execute("SELECT id FROM sms_jobs WHERE idempotency_key = ?", (key,)).fetchone()
+        return job_id
+
+    def status(self, job_id):
+        """The job as a dict (status, attempts, detail, ...), or None for an unknown id."""
+        with self._lock:
+            row = self._connect().execute("SELECT * FROM sms_jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def claim(self, limit):
+        """Marks up to `limit` due jobs as sending and returns them (oldest first)."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            # IMMEDIATE takes the write lock up front, so two processes never claim the same job
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Its request may have reached the provider before the worker died, so don't resend it
+                conn.execute("UPDATE sms_jobs SET status = ?, detail = ?, updated_at = ? "
+                             "WHERE status = ? AND updated_at < ?",
+                             (UNKNOWN, "Worker stopped while sending; check the provider before resending",
+                              now, SENDING, now - LEASE_TIMEOUT))
+                rows = conn.execute("SELECT * FROM sms_jobs WHERE status = ? AND next_attempt_at <= ? "
+                                    "ORDER BY id LIMIT ?", (QUEUED, now, limit)).fetchall()
+                conn.executemany("UPDATE sms_jobs SET status = ?, attempts = attempts + 1, updated_at = ? "
+                                 "WHERE id = ?", [(SENDING, now, row['id']) for row in rows])
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return [dict(row, attempts=row['attempts'] + 1) for row in rows]
+
+    def finish(self, job_id, success, detail):
+        self._update(job_id, SENT if success else FAILED, detail)
+
+    def mark_unknown(self, job_id, detail):
+        self._update(job_id, UNKNOWN, detail)
+
+    def retry_later(self, job_id, delay, detail):
+        self._update(job_id, QUEUED, detail, next_attempt_at=time.time() + delay)
+
+    def _update(self, job_id, status, detail, next_attempt_at=None):
+        now = time.time()
+        with self._lock:
+            self._connect().execute(
+                "UPDATE sms_jobs SET status = ?, detail = ?, updated_at = ?, "
+                "next_attempt_at = COALESCE(?, next_attempt_at) WHERE id = ?",
+                (status, str(detail), now, next_attempt_at, job_id))
+
+    def counts(self):
+        """Number of jobs per status."""
+        with self._lock:
+            return dict(self._connect().execute("SELECT status, COUNT(*) FROM sms_jobs GROUP BY status").fetchall())
+
+
+def backoff_delay(attempts):
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** (attempts - 1)))
+    return delay * random.uniform(0.5, 1.0)  # jitter so failed batches don't retry in lockstep
+
+
+class SmsDispatcher:
+    """
+    Background workers that drain an SmsQueue through a provider (see src.sms_sender).
+    Each worker keeps one pooled requests.Session and sends up to provider.batch_size
+    messages per request. Only failures where nothing was sent (429, connection refused)
+    are retried, with exponential backoff up to max_attempts. When the provider may have
+    accepted the batch (timeout after sending, 5xx), its jobs are marked 'unknown' instead
+    of being resent, since resending would deliver the accepted messages twice.
+    """
+
+    def __init__(self, queue=None, provider=None, workers=WORKERS, max_attempts=MAX_ATTEMPTS,
+                 poll_interval=POLL_INTERVAL):
+        self.queue = queue or SmsQueue()
+        self.provider = provider or default_provider()
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.stats = {'requests': 0, 'sent': 0, 'failed': 0, 'retries': 0, 'unknown': 0}
+
+        self._stats_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def enqueue(self, phone, message, idempotency_key=None):
+        """Queues a message and wakes a worker. Returns the job id to poll with status()."""
+        job_id = self.queue.enqueue(phone, message, idempotency_key)
+        self._wake.set()
+        return job_id
+
+    def status(self, job_id):
+        return self.queue.status(job_id)
+
+    def start(self):
+        self._threads = [t for t in self._threads if t.is_alive()]
+        self._stop.clear()
+        for i in range(len(self._threads), self.workers):
+            thread = threading.Thread(target=self._run, name=f"sms-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _run(self):
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_maxsize=4))
+        session.mount("http://", HTTPAdapter(pool_maxsize=4))
+        with session:
+            while not self._stop.is_set():
+                if not self.drain_once(session):
+                    self._wake.wait(self.poll_interval)
+                    self._wake.clear()
+
+    def drain_once(self, session):
+        """Claims and sends one batch. Returns the number of jobs handled."""
+        jobs = self.queue.claim(self.provider.batch_size)
+        if not jobs:
+            return 0
+        self._count('requests', 1)
+        try:
+            # send_sms / the provider's batch request; failed counts messages the provider rejected
+            with tracer.span("sms", messages=len(jobs)) as span:
+                results = self.provider.send_batch(session, jobs)
+                span.set(failed=sum(not success for success, _ in results.values()))
+        except SmsSendError as e:
+            for job in jobs:
+                self._retry_or_fail(job, e)
+            return len(jobs)
+        except Exception as e:
+            # A bug in the provider must not kill the worker; the request may have gone out already
+            for job in jobs:
+                self._retry_or_fail(job, SmsSendError(str(e), retryable=False, unknown=True))
+            return len(jobs)
+
+        for job in jobs:
+            success, detail = results.get(job['id'], (False, "No result from SMS provider"))
+            self.queue.finish(job['id'], success, detail)
+            self._count('sent' if success else 'failed', 1)
+        return len(jobs)
+
+    def _retry_or_fail(self, job, error):
+        if error.retryable and job['attempts'] < self.max_attempts:
+            self.queue.retry_later(job['id'], backoff_delay(job['attempts']), error)
+            self._count('retries', 1)
+        elif getattr(error, 'unknown', False):
+            self.queue.mark_unknown(job['id'], error)
+            self._count('unknown', 1)
+        else:
+            self.queue.finish(job['id'], False, error)
+            self._count('failed', 1)
+
+    def _count(self, name, n):
+        with self._stats_lock:
+            self.stats[name] += n
+
+
+# One dispatcher per process
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_sms_dispatcher():
+    """Returns the process-wide SmsDispatcher, starting its workers on first use."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = SmsDispatcher()
+            _dispatcher.start()
+    return _dispatcher
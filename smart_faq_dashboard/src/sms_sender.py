@@ -1,10 +1,44 @@
+import datetime
+import hashlib
+import hmac
+import os
+import uuid
+
 import requests
-import streamlit as st
+from urllib3.exceptions import NewConnectionError
+
+SOLAPI_URL = "https://api.solapi.com"
+REQUEST_TIMEOUT = 10  # seconds per provider call
+
+
+class SmsSendError(Exception):
+    """
+    A whole send request failed.
+    `retryable`: nothing was sent (429, connection refused or timed out while connecting),
+    so the batch can safely be sent again.
+    `unknown`: the provider may have accepted some messages (read timeout, dropped
+    connection, 5xx). Sending is not idempotent, so these must not be resent automatically.
+    """
+
+    def __init__(self, message, retryable, unknown=False):
+        super().__init__(message)
+        self.retryable = retryable
+        self.unknown = unknown
+
+
+def request_not_sent(error):
+    """True when a requests error happened before the request reached the server."""
+    if isinstance(error, (requests.ConnectTimeout, requests.exceptions.SSLError)):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(error, requests.ConnectionError) and isinstance(reason, NewConnectionError)
+
 
 def send_sms(phone_number, message):
     """
     Sends an SMS to the given phone number with the message.
     Currently a placeholder for Solapi/CoolSMS or Twilio.
+    The dashboard queues messages through src.sms_queue instead of calling this directly.
     """
     # TODO: Implement actual API call
     # This is a simulation
@@ -24,3 +58,95 @@ def send_sms(phone_number, message):
     # data = { "message": { "to": phone_number, "from": "01012345678", "text": message } }
     # res = requests.post(url, headers=headers, json=data)
     # return res.status_code == 200, res.json()
+
+
+def generate_auth_headers(api_key, api_secret):
+    """Solapi HMAC-SHA256 authorization header (signature over date + salt)."""
+    date = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+    salt = uuid.uuid4().hex
+    signature = hmac.new(api_secret.encode(), (date + salt).encode(), hashlib.sha256).hexdigest()
+    return {
+        "Authorization": f"HMAC-SHA256 apiKey={api_key}, date={date}, salt={salt}, signature={signature}",
+        "Content-Type": "application/json",
+    }
+
+
+class SimulatedProvider:
+    """Sends one message at a time through send_sms (the simulation above)."""
+
+    batch_size = 1
+
+    def send_batch(self, session, jobs):
+        return {job['id']: send_sms(job['phone'], job['message']) for job in jobs}
+
+
+class SolapiProvider:
+    """
+    Solapi (CoolSMS) bulk sending: up to batch_size messages per send-many request.
+    Each message carries its idempotency key in customFields. The provider only echoes
+    it back (to match failed messages to jobs, or to look a message up in the console);
+    it does not deduplicate on it, so a batch is only resent when it surely never arrived.
+    """
+
+    batch_size = 100
+
+    def __init__(self, api_key, api_secret, sender, base_url=SOLAPI_URL, timeout=REQUEST_TIMEOUT):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.sender = sender
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def send_batch(self, session, jobs):
+        """
+        Sends jobs (dicts with id, phone, message, idempotency_key) in one request.
+        Returns {job id: (success, detail)}; raises SmsSendError when the whole request failed,
+        flagged retryable only when nothing was sent.
+        """
+        data = {"messages": [
+            {"to": job['phone'], "from": self.sender, "text": job['message'],
+             "customFields": {"idempotencyKey": job['idempotency_key']}}
+            for job in jobs
+        ]}
+        try:
+            res = session.post(f"{self.base_url}/messages/v4/send-many/detail",
+                               headers=generate_auth_headers(self.api_key, self.api_secret),
+                               json=data, timeout=self.timeout)
+        except requests.RequestException as e:
+            if request_not_sent(e):
+                raise SmsSendError(f"SMS provider unreachable: {e}", retryable=True)
+            raise SmsSendError(f"SMS request sent, no answer: {e}", retryable=False, unknown=True)
+
+        if res.status_code == 429:
+            raise SmsSendError(f"SMS provider rate limit: {res.text[:200]}", retryable=True)
+        if res.status_code >= 500:
+            raise SmsSendError(f"SMS provider error {res.status_code}: {res.text[:200]}", retryable=False,
+                               unknown=True)
+        if res.status_code != 200:
+            raise SmsSendError(f"SMS request rejected {res.status_code}: {res.text[:200]}", retryable=False)
+
+        try:
+            body = res.json()
+        except ValueError:
+            raise SmsSendError(f"SMS provider sent an unreadable answer: {res.text[:200]}", retryable=False,
+                               unknown=True)
+        failed = {}
+        for item in body.get("failedMessageList", []):
+            key = (item.get("customFields") or {}).get("idempotencyKey")
+            failed[key] = f"{item.get('statusCode', '')} {item.get('statusMessage', '')}".strip()
+        group_id = (body.get("groupInfo") or {}).get("groupId", "")
+        return {
+            job['id']: (False, failed[job['idempotency_key']]) if job['idempotency_key'] in failed
+            else (True, f"SMS sent to {job['phone']} (group {group_id})")
+            for job in jobs
+        }
+
+
+def default_provider():
+    """SolapiProvider when SOLAPI_API_KEY, SOLAPI_API_SECRET and SMS_SENDER are set, else the simulation."""
+    api_key = os.environ.get("SOLAPI_API_KEY")
+    api_secret = os.environ.get("SOLAPI_API_SECRET")
+    sender = os.environ.get("SMS_SENDER")
+    if api_key and api_secret and sender:
+        return SolapiProvider(api_key, api_secret, sender, base_url=os.environ.get("SMS_API_URL", SOLAPI_URL))
+    return SimulatedProvider()
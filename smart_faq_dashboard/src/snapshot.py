@@ -0,0 +1,151 @@
+import glob
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+from src.search_engine import CANDIDATE_LIMIT, SEMANTIC_MODEL
+from src.search_index import FaqIndex
+
+# Bump when FaqIndex or the cleaning steps change, so old snapshots are ignored
+SNAPSHOT_FORMAT = 4
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.snapshots')
+
+# df.attrs key holding the content hash of the file a DataFrame was loaded from
+DIGEST_ATTR = 'source_digest'
+
+# Snapshot indexes kept loaded in this process, least recently used dropped first
+MAX_LOADED = 4
+# Snapshot files kept on disk (one per distinct CSV content), least recently used deleted first
+MAX_SNAPSHOT_FILES = 16
+
+# Snapshots already loaded in this process (digest -> FaqIndex), in LRU order
+_loaded = OrderedDict()
+_lock = threading.Lock()
+
+
+def content_digest(file_path_or_buffer):
+    """SHA-256 of the raw file bytes (path or uploaded file buffer)."""
+    if hasattr(file_path_or_buffer, 'getvalue'):
+        data = file_path_or_buffer.getvalue()
+    elif hasattr(file_path_or_buffer, 'read'):
+        file_path_or_buffer.seek(0)
+        data = file_path_or_buffer.read()
+        file_path_or_buffer.seek(0)
+    else:
+        with open(file_path_or_buffer, 'rb') as f:
+            data = f.read()
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def snapshot_path(digest):
+    return os.path.join(SNAPSHOT_DIR, f"faq-v{SNAPSHOT_FORMAT}-{digest[:32]}.pkl")
+
+
+def read_snapshot(path):
+    """
+    Loads a pickled FaqIndex. The whole index is deserialized onto the heap (it is mostly
+    Python strings and dicts); the speedup over a cold start is skipping normalization
+    and index building, not avoiding the copy.
+    """
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def write_snapshot(path, index):
+    """Writes atomically (temp file + rename) so a concurrent reader never sees half a file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def prebuild(index):
+    """Builds the lazily created search structures so they are stored in the snapshot too."""
+    index.jamo
+    index.suggestions
+    if len(index) > CANDIDATE_LIMIT:
+        index.ngrams
+    if SEMANTIC_MODEL:
+        index.vectors(SEMANTIC_MODEL)
+    return index
+
+
+def _remember(digest, index):
+    with _lock:
+        _loaded[digest] = index
+        _loaded.move_to_end(digest)
+        while len(_loaded) > MAX_LOADED:
+            _loaded.popitem(last=False)
+
+
+def prune_snapshots(keep=MAX_SNAPSHOT_FILES):
+    """
+    Deletes snapshot files of older SNAPSHOT_FORMATs, and all but the `keep` most recently
+    used ones of the current format (each uploaded CSV adds one). Loading a snapshot
+    touches its file, and snapshots loaded in this process are never deleted.
+    """
+    with _lock:
+        in_use = {snapshot_path(digest) for digest in _loaded}
+    current = set(glob.glob(os.path.join(SNAPSHOT_DIR, f"faq-v{SNAPSHOT_FORMAT}-*.pkl")))
+    stale = [p for p in glob.glob(os.path.join(SNAPSHOT_DIR, "faq-v*.pkl")) if p not in current]
+    current -= in_use
+    try:
+        by_use = sorted(current, key=os.path.getmtime, reverse=True)
+    except OSError:
+        by_use = []  # a file went away while listing (another process pruning)
+    for path in stale + by_use[max(keep - len(in_use), 0):]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def load_index(digest):
+    """Returns the FaqIndex snapshot for a content digest, or None if there is none yet."""
+    with _lock:
+        index = _loaded.get(digest)
+        if index is not None:
+            _loaded.move_to_end(digest)
+            return index
+
+    path = snapshot_path(digest)
+    if not os.path.exists(path):
+        return None
+    try:
+        index = read_snapshot(path)
+    except Exception as e:
+        # Corrupt or incompatible snapshot: rebuild from the source file
+        print(f"Snapshot load error ({path}): {e}")
+        return None
+    try:
+        os.utime(path)  # mark as recently used for prune_snapshots
+    except OSError:
+        pass  # read-only deployment
+
+    _remember(digest, index)
+    return index
+
+
+def save_index(digest, df):
+    """Builds the FaqIndex for a cleaned DataFrame, stores it as the snapshot for digest and returns it."""
+    df.attrs[DIGEST_ATTR] = digest
+    index = prebuild(FaqIndex(df))
+    try:
+        write_snapshot(snapshot_path(digest), index)
+        prune_snapshots()
+    except Exception as e:
+        # Read-only deployments still work, just without the cold start speedup
+        print(f"Snapshot save error: {e}")
+
+    _remember(digest, index)
+    return index
+
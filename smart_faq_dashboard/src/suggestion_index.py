@@ -0,0 +1,136 @@
+import math
+
+from rapidfuzz import fuzz
+from rapidfuzz.distance import Indel
+from rapidfuzz.utils import default_process
+
+MIN_SUGGESTION_SCORE = 50  # get_suggestion's minimum confidence (fuzz.ratio)
+MAX_EDIT_FRACTION = 0.4    # first BK-tree search radius as a share of the query length
+
+
+def indel_radius(query_length, score):
+    """
+    Largest indel distance a keyword can have and still beat `score` (fuzz.ratio, 0-100).
+    ratio = 1 - indel / (lq + lc) and lc <= lq + indel, so beating s needs indel < 2 * lq * (1 - s) / s.
+    """
+    s = max(score - 0.5, 0.5) / 100  # scores are rounded; stay on the safe side
+    return math.ceil(2 * query_length * (1 - s) / s) - 1
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over an edit distance metric (indel distance, which fuzz.ratio is built on).
+    A lookup only visits children whose edge distance is within the search radius,
+    so "did you mean" lookups do not compare against every keyword.
+    """
+
+    # Class attribute rather than per instance, so the tree pickles into dataset snapshots
+    distance = staticmethod(Indel.distance)
+
+    def __init__(self):
+        self.root = None  # (word, {edge distance: child node})
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, word):
+        if self.root is None:
+            self.root = (word, {})
+            self.size = 1
+            return
+
+        node = self.root
+        while True:
+            d = self.distance(word, node[0])
+            if d == 0:
+                return  # already present
+            child = node[1].get(d)
+            if child is None:
+                node[1][d] = (word, {})
+                self.size += 1
+                return
+            node = child
+
+    def search(self, word, max_distance):
+        """Returns [(distance, word)] for every word within max_distance."""
+        if self.root is None:
+            return []
+
+        found = []
+        stack = [self.root]
+        while stack:
+            node_word, children = stack.pop()
+            d = self.distance(word, node_word)
+            if d <= max_distance:
+                found.append((d, node_word))
+            # Triangle inequality: only edges in [d - r, d + r] can hold matches
+            for edge, child in children.items():
+                if d - max_distance <= edge <= d + max_distance:
+                    stack.append(child)
+        return found
+
+
+class SuggestionIndex:
+    """
+    Keyword vocabulary (Product, Model and comma-split Tags) built once per dataset,
+    stored in a BK-tree for fast "did you mean" lookups.
+    """
+
+    def __init__(self, df):
+        # processed keyword -> keyword as written in the sheet (first one wins)
+        self.keywords = {}
+        for keyword in self._collect_keywords(df):
+            processed = default_process(keyword)
+            if processed and processed not in self.keywords:
+                self.keywords[processed] = keyword
+        # Vocabulary position, so ties rank as in a full scan rather than in tree order
+        self.positions = {processed: i for i, processed in enumerate(self.keywords)}
+
+        self.tree = BKTree()
+        for processed in self.keywords:
+            self.tree.add(processed)
+
+    @staticmethod
+    def _collect_keywords(df):
+        keywords = []
+        if 'Product' in df.columns:
+            keywords.extend(str(v) for v in df['Product'].dropna().unique())
+        if 'Model' in df.columns:
+            keywords.extend(str(v) for v in df['Model'].dropna().unique())
+        if 'Tags' in df.columns:
+            # Split tags by comma
+            for tags in df['Tags'].dropna():
+                if isinstance(tags, str):
+                    keywords.extend(t.strip() for t in tags.split(','))
+        return keywords
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def suggest(self, query, k=1, min_score=MIN_SUGGESTION_SCORE):
+        """
+        Returns up to k (keyword, score) pairs with fuzz.ratio score > min_score, best first
+        (ties in vocabulary order). Starts with a tight BK-tree radius and widens it only as far as a better keyword
+        could still exist, so the result matches a full scan without visiting every keyword.
+        """
+        processed = default_process(str(query))
+        if not processed or not self.keywords:
+            return []
+
+        radius = max(1, round(len(processed) * MAX_EDIT_FRACTION))
+        while True:
+            scored = []
+            for _, word in self.tree.search(processed, radius):
+                score = round(fuzz.ratio(processed, word))
+                if score > min_score:
+                    scored.append((word, score))
+            scored.sort(key=lambda item: (-item[1], self.positions[item[0]]))
+
+            kth_score = scored[k - 1][1] if len(scored) >= k else min_score
+            needed = indel_radius(len(processed), kth_score)
+            if needed <= radius:
+                break
+            radius = needed
+
+        return [(self.keywords[word], score) for word, score in scored[:k]]
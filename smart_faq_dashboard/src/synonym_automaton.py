@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+SYNONYMS_PATH = os.path.join(os.path.dirname(__file__), 'synonyms.json')
+RELOAD_CHECK_INTERVAL = 5  # seconds between mtime checks of synonyms.json
+
+
+class SynonymAutomaton:
+    """
+    Aho-Corasick automaton over all synonym keys.
+    rewrite() replaces every matching substring of a query in one linear pass,
+    so the cost does not grow with the number of entries.
+    Keys are matched case-insensitively ("protein" == "Protein").
+    """
+
+    def __init__(self, synonyms):
+        self.synonyms = synonyms
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [None]  # per state: (key length, replacement) if a key ends exactly here
+        self.dict_link = [0]  # per state: nearest state on the fail chain where a (shorter) key ends
+
+        for key, replacement in synonyms.items():
+            if key:
+                self._add(key.lower(), replacement)
+        self._link()
+
+    def __len__(self):
+        return len(self.synonyms)
+
+    def _add(self, key, replacement):
+        state = 0
+        for ch in key:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(None)
+                self.dict_link.append(0)
+            state = nxt
+        self.output[state] = (len(key), replacement)
+
+    def _link(self):
+        # Breadth-first: fail links point to the longest proper suffix that is also a key prefix
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                link = self.fail[nxt]
+                self.dict_link[nxt] = link if self.output[link] is not None else self.dict_link[link]
+
+    def find(self, text):
+        """Returns non-overlapping (start, end, replacement) matches, leftmost-longest first."""
+        lowered = text.lower()
+        if len(lowered) != len(text):  # rare case-folding that changes length; match as typed
+            lowered = text
+
+        # Every key ending at each position: a shorter one may fit where the longest overlaps a match
+        ends = []
+        state = 0
+        for i, ch in enumerate(lowered):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            found = state if self.output[state] is not None else self.dict_link[state]
+            while found:
+                length, replacement = self.output[found]
+                ends.append((i + 1 - length, i + 1, replacement))
+                found = self.dict_link[found]
+
+        matches = []
+        last_end = 0
+        for start, end, replacement in sorted(ends, key=lambda m: (m[0], m[0] - m[1])):
+            if start >= last_end:
+                matches.append((start, end, replacement))
+                last_end = end
+        return matches
+
+    def rewrite(self, text):
+        """Replaces every synonym key found in the text: "프로틴 복용법" -> "단백질 복용법"."""
+        parts = []
+        pos = 0
+        for start, end, replacement in self.find(text):
+            parts.append(text[pos:start])
+            parts.append(replacement)
+            pos = end
+        parts.append(text[pos:])
+        return "".join(parts)
+
+
+class SynonymStore:
+    """
+    Loads synonyms.json once and keeps the compiled automaton in memory.
+    The file's mtime is checked at most every RELOAD_CHECK_INTERVAL seconds
+    and the automaton is rebuilt when the file changed (hot reload for ops edits).
+    """
+
+    def __init__(self, path=SYNONYMS_PATH, check_interval=RELOAD_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked_at = float('-inf')
+        self._automaton = SynonymAutomaton({})
+
+    def get(self):
+        """Returns the current automaton, reloading it if synonyms.json changed."""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._automaton
+
+        with self._lock:
+            if now - self._checked_at >= self.check_interval:
+                self._checked_at = now
+                self._reload_if_changed()
+        return self._automaton
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            self._mtime = None
+            self._automaton = SynonymAutomaton({})
+            return
+        if mtime == self._mtime:
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                synonyms = json.load(f)
+        except (OSError, ValueError) as e:
+            # Keep serving the last good automaton while the file is being edited
+            print(f"Synonym reload error: {e}")
+            return
+        self._automaton = SynonymAutomaton(synonyms)
+        self._mtime = mtime
+
+    def rewrite(self, text):
+        return self.get().rewrite(text)
+
+
+# Shared by every search in the process
+synonym_store = SynonymStore()
@@ -0,0 +1,247 @@
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+
+SAMPLES_PER_STAGE = 1000  # recent durations kept per stage for p50/p95
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.cache', 'profiles')
+SLOW_MS = 1000             # sampled requests slower than this keep their cProfile dump
+
+# Numeric span attributes that are also summed per stage (rows scanned, results, LLM token usage)
+COUNTED_ATTRS = ('rows', 'results', 'prompt_tokens', 'completion_tokens', 'messages', 'failed')
+
+_profile_lock = threading.Lock()  # one cProfile at a time; the interpreter allows a single active profiler
+
+
+class Span:
+    """One timed operation. Attributes set on it end up in the JSON line and the stage counters."""
+
+    def __init__(self, name, trace_id, parent_id, attrs):
+        self.name = name
+        self.id = uuid.uuid4().hex[:16]
+        self.trace_id = trace_id or self.id
+        self.parent_id = parent_id
+        self.attrs = attrs
+        self.duration = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+class _Stage:
+    def __init__(self, max_samples):
+        self.samples = deque(maxlen=max_samples)
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+        self.cache_hits = 0
+        self.cache_lookups = 0
+        self.counted = dict.fromkeys(COUNTED_ATTRS, 0)
+
+
+class Tracer:
+    """
+    Lightweight spans for the hot paths (load, search, suggestions, LLM, SMS).
+    Every finished span updates per-stage stats (recent durations, count, errors, cache
+    hit rate, summed COUNTED_ATTRS), which export as Prometheus text or a summary dict,
+    and is optionally appended to a JSON lines file. A `profile_rate` share of top-level
+    spans runs under cProfile; the dump is kept when the span took at least slow_ms.
+    """
+
+    def __init__(self, jsonl_path=None, profile_rate=0.0, slow_ms=SLOW_MS, profile_dir=PROFILE_DIR,
+                 max_samples=SAMPLES_PER_STAGE):
+        self.jsonl_path = jsonl_path
+        self.profile_rate = profile_rate
+        self.slow_ms = slow_ms
+        self.profile_dir = profile_dir
+        self.max_samples = max_samples
+        self._stages = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # --- Recording -----------------------------------------------------------
+
+    @contextlib.contextmanager
+    def span(self, name, **attrs):
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        span = Span(name, parent and parent.trace_id, parent and parent.id, attrs)
+        profiler = self._start_profile() if parent is None else None
+        stack.append(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=type(e).__name__)
+            raise
+        finally:
+            span.duration = time.perf_counter() - started
+            stack.pop()
+            if profiler is not None:
+                self._finish_profile(profiler, span)
+            self._record(span)
+
+    def record(self, name, duration, **attrs):
+        """Records an operation timed by the caller (e.g. a stream consumed across several yields)."""
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        span = Span(name, parent and parent.trace_id, parent and parent.id, attrs)
+        span.duration = duration
+        self._record(span)
+
+    def traced(self, name):
+        """Decorator form of span(name)."""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, span):
+        with self._lock:
+            stage = self._stages.get(span.name)
+            if stage is None:
+                stage = self._stages[span.name] = _Stage(self.max_samples)
+            stage.samples.append(span.duration)
+            stage.count += 1
+            stage.total += span.duration
+            if 'error' in span.attrs:
+                stage.errors += 1
+            if 'cache_hit' in span.attrs:
+                stage.cache_lookups += 1
+                stage.cache_hits += bool(span.attrs['cache_hit'])
+            for attr in COUNTED_ATTRS:
+                value = span.attrs.get(attr)
+                if isinstance(value, (int, float)):
+                    stage.counted[attr] += value
+        if self.jsonl_path:
+            self._write_jsonl(span)
+
+    def _write_jsonl(self, span):
+        line = json.dumps({
+            'ts': time.time(), 'name': span.name, 'ms': round(span.duration * 1000, 3),
+            'trace': span.trace_id, 'span': span.id, 'parent': span.parent_id, **span.attrs,
+        }, ensure_ascii=False, default=str)
+        try:
+            with self._lock, open(self.jsonl_path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+        except OSError as e:
+            print(f"Trace write error: {e}")  # tracing must never break the request
+
+    # --- Sampling profiler ---------------------------------------------------
+
+    def _start_profile(self):
+        if not self.profile_rate or random.random() >= self.profile_rate:
+            return None
+        if not _profile_lock.acquire(blocking=False):
+            return None  # another request is being profiled
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            _profile_lock.release()  # another profiler (e.g. a debugger) is active
+            return None
+        return profiler
+
+    def _finish_profile(self, profiler, span):
+        try:
+            profiler.disable()
+            if span.duration * 1000 >= self.slow_ms:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                path = os.path.join(self.profile_dir, f"{span.name}-{time.strftime('%Y%m%d-%H%M%S')}-{span.id}.prof")
+                profiler.dump_stats(path)
+                span.set(profile=path)
+        except OSError as e:
+            print(f"Profile write error: {e}")
+        finally:
+            _profile_lock.release()
+
+    # --- Export --------------------------------------------------------------
+
+    def _snapshot(self):
+        """Copies of the per-stage stats (durations sorted), taken under the lock."""
+        with self._lock:
+            return {name: {'samples': sorted(s.samples), 'count': s.count, 'total': s.total, 'errors': s.errors,
+                           'cache_hits': s.cache_hits, 'cache_lookups': s.cache_lookups,
+                           'counted': dict(s.counted)}
+                    for name, s in self._stages.items()}
+
+    @staticmethod
+    def _quantile(samples, q):
+        return samples[int(q * (len(samples) - 1))] if samples else None
+
+    def summary(self):
+        """Per stage: count, errors, mean/p50/p95 milliseconds over recent spans, cache hit rate, summed counters."""
+        report = {}
+        for name, s in self._snapshot().items():
+            p50, p95 = self._quantile(s['samples'], 0.50), self._quantile(s['samples'], 0.95)
+            report[name] = {
+                'count': s['count'],
+                'errors': s['errors'],
+                'mean_ms': s['total'] / s['count'] * 1000 if s['count'] else None,
+                'p50_ms': p50 * 1000 if p50 is not None else None,
+                'p95_ms': p95 * 1000 if p95 is not None else None,
+                'cache_hit_rate': s['cache_hits'] / s['cache_lookups'] if s['cache_lookups'] else None,
+                **{attr: value for attr, value in s['counted'].items() if value},
+            }
+        return report
+
+    def prometheus(self, prefix="faq"):
+        """Stage metrics in the Prometheus text exposition format."""
+        stages = self._snapshot()
+        lines = [
+            f"# HELP {prefix}_stage_seconds Duration of traced stages (quantiles over recent spans).",
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        for name, s in stages.items():
+            if s['samples']:
+                for q in (0.5, 0.95, 0.99):
+                    lines.append(f'{prefix}_stage_seconds{{stage="{name}",quantile="{q}"}} '
+                                 f'{self._quantile(s["samples"], q):.6f}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {s["total"]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {s["count"]}')
+
+        for metric, help_text in (("errors", "Traced stages that raised."),
+                                  ("cache_hits", "Traced stages served from a cache."),
+                                  ("cache_lookups", "Traced stages that looked up a cache.")):
+            lines.append(f"# HELP {prefix}_stage_{metric}_total {help_text}")
+            lines.append(f"# TYPE {prefix}_stage_{metric}_total counter")
+            for name, s in stages.items():
+                lines.append(f'{prefix}_stage_{metric}_total{{stage="{name}"}} {s[metric]}')
+
+        lines.append(f"# HELP {prefix}_stage_units_total Summed span counters (rows, results, tokens, messages).")
+        lines.append(f"# TYPE {prefix}_stage_units_total counter")
+        for name, s in stages.items():
+            for attr, value in s['counted'].items():
+                if value:
+                    lines.append(f'{prefix}_stage_units_total{{stage="{name}",unit="{attr}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+
+
+# Process-wide tracer, configured from the environment:
+#   TRACE_JSONL=path          append every span as a JSON line
+#   TRACE_PROFILE_RATE=0.01   run this share of top-level spans under cProfile
+#   TRACE_SLOW_MS=1000        keep the profile (.cache/profiles/*.prof) when the span took this long
+tracer = Tracer(
+    jsonl_path=os.environ.get("TRACE_JSONL") or None,
+    profile_rate=float(os.environ.get("TRACE_PROFILE_RATE", 0)),
+    slow_ms=float(os.environ.get("TRACE_SLOW_MS", SLOW_MS)),
+)
@@ -0,0 +1,95 @@
+import numpy as np
+
+from src.embeddings import get_embedder
+
+# Fields embedded per row: what the row is about, not just its searchable title
+SEMANTIC_FIELDS = ['Question', 'Answer', 'Tags']
+EMBED_BATCH = 256          # rows embedded per call
+HNSW_MIN_ROWS = 50_000     # above this, use an hnswlib graph (if installed) instead of a full scan
+
+
+def row_texts(df):
+    """The text embedded for each row: Question, Answer and Tags (missing values skipped)."""
+    columns = [df[col] if col in df.columns else [''] * len(df) for col in SEMANTIC_FIELDS]
+    return [" ".join(str(v) for v in values if isinstance(v, str) and v) for values in zip(*columns)]
+
+
+class VectorIndex:
+    """
+    float32 matrix of L2-normalized row embeddings for one embedding model.
+    A query is one matrix-vector product (cosine similarities); large catalogs use an
+    HNSW graph when hnswlib is installed. Pickled with the FaqIndex snapshot, so rows are
+    only embedded again when they change (see updated()).
+    """
+
+    def __init__(self, texts, model_id):
+        self.model_id = model_id
+        self.matrix = self._embed(texts)
+        self._hnsw = None
+
+    def __len__(self):
+        return len(self.matrix)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_hnsw'] = None  # rebuilt on demand; hnswlib objects don't pickle reliably
+        return state
+
+    def _embed(self, texts):
+        embed = get_embedder(self.model_id)
+        parts = [np.asarray(embed(texts[i:i + EMBED_BATCH]), dtype=np.float32)
+                 for i in range(0, len(texts), EMBED_BATCH)]
+        if not parts:
+            return np.zeros((0, np.asarray(embed([""])).shape[1]), dtype=np.float32)
+        return np.vstack(parts)
+
+    def updated(self, length, changed, changed_texts):
+        """
+        Returns a VectorIndex for a table of `length` rows where only the rows at the
+        `changed` positions (with texts changed_texts) differ; only those are embedded.
+        """
+        fresh = VectorIndex.__new__(VectorIndex)
+        fresh.model_id = self.model_id
+        fresh._hnsw = None
+        keep = min(len(self), length)
+        matrix = np.zeros((length, self.matrix.shape[1]), dtype=np.float32)
+        matrix[:keep] = self.matrix[:keep]
+        if len(changed):
+            matrix[np.asarray(changed)] = self._embed(list(changed_texts))
+        fresh.matrix = matrix
+        return fresh
+
+    def embed_query(self, query):
+        return np.asarray(get_embedder(self.model_id)([query]), dtype=np.float32)[0]
+
+    def top_k(self, query, k):
+        """Returns (positions, similarities) of the k rows most similar to the query, best first."""
+        vector = self.embed_query(query)
+        k = min(k, len(self))
+        if k == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        hnsw = self._graph()
+        if hnsw is not None:
+            labels, distances = hnsw.knn_query(vector, k=k)
+            return labels[0].astype(np.int64), (1.0 - distances[0]).astype(np.float32)
+
+        similarities = self.matrix @ vector
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top], kind='stable')]
+        return top, similarities[top]
+
+    def _graph(self):
+        if len(self) < HNSW_MIN_ROWS:
+            return None
+        if self._hnsw is None:
+            try:
+                import hnswlib
+            except ImportError:
+                return None  # optional; the full scan is still exact, just slower
+            graph = hnswlib.Index(space='ip', dim=self.matrix.shape[1])
+            graph.init_index(max_elements=len(self), ef_construction=200, M=16)
+            graph.add_items(self.matrix, np.arange(len(self)))
+            graph.set_ef(100)
+            self._hnsw = graph
+        return self._hnsw
@@ -0,0 +1,18 @@
+import os
+import sys
+import time
+
+import pytest
+
+# Make `src` importable the same way app.py sees it
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freezes time.time() (used by the cache TTLs); advance it with clock[0] += seconds."""
+    now = [1_000_000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    return now
@@ -0,0 +1,48 @@
+"""Local stand-in for the OpenAI client (client.chat.completions.create), plain and streaming."""
+import re
+from types import SimpleNamespace
+
+
+def chunk(text=None, role=None, usage=None, choices=True):
+    """One streamed chunk; choices=False gives the trailing usage-only chunk (include_usage)."""
+    delta = SimpleNamespace(content=text, role=role)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta)] if choices else [], usage=usage)
+
+
+class FakeCompletions:
+    def __init__(self, answer, chunks, error):
+        self.answer = answer
+        self.chunks = chunks
+        self.error = error
+        self.calls = []
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        if kwargs.get('stream'):
+            return self._stream()
+        if self.error is not None:
+            raise self.error
+        usage = SimpleNamespace(prompt_tokens=100, completion_tokens=10)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.answer))], usage=usage)
+
+    def _stream(self):
+        for c in self.chunks:
+            yield c
+        if self.error is not None:
+            raise self.error
+
+
+class FakeClient:
+    """
+    `answer` is returned by plain calls; streamed calls yield `chunks` (default: the answer
+    split after each word), then raise `error` if given (mid-stream failure).
+    """
+
+    def __init__(self, answer="요약 답변입니다", chunks=None, error=None):
+        if chunks is None:
+            chunks = [chunk(role="assistant")] + [chunk(word) for word in re.findall(r"\S+\s*", answer)]
+        self.chat = SimpleNamespace(completions=FakeCompletions(answer, chunks, error))
+
+    @property
+    def calls(self):
+        return self.chat.completions.calls
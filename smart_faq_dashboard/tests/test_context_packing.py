@@ -0,0 +1,27 @@
+from src.context_packing import pack_context
+from src.llm_engine import build_context
+
+MANUAL = "\n\n".join(f"{i}장. " + ("보관 방법과 주의 사항 안내 문장입니다. " * 30) + f"키워드{i}" for i in range(12))
+ROW = {'Product': "BCAA", 'Answer': "하루 1회 물에 타서 드세요.", 'Manual': MANUAL}
+
+
+def test_short_context_is_unchanged():
+    context, report = pack_context("복용 방법", "Product: BCAA", [("FAQ Answer", "하루 1회")], budget=100)
+    assert context == "Product: BCAA\nFAQ Answer: 하루 1회"
+    assert not report['trimmed']
+
+
+def test_long_manual_is_packed_into_the_budget():
+    context, report = build_context(ROW, "키워드7 보관", budget=300)
+    assert report['trimmed']
+    assert report['tokens_after'] <= 300 < report['tokens_before']
+    assert context.startswith("Product: BCAA\nFAQ Answer: 하루 1회 물에 타서 드세요.")
+    assert "키워드7" in context
+
+
+def test_row_key_does_not_depend_on_the_query():
+    first, first_report = build_context(ROW, "키워드2 보관 방법", budget=300)
+    second, second_report = build_context(ROW, "키워드9 주의 사항", budget=300)
+    assert first != second
+    assert first_report['row_key'] == second_report['row_key']
+    assert build_context(dict(ROW, Answer="다른 답변"), "키워드2", budget=300)[1]['row_key'] != first_report['row_key']
@@ -0,0 +1,112 @@
+import threading
+
+import numpy as np
+import pytest
+
+from src import incremental_search
+from src.data_loader import load_data
+from src.incremental_search import SearchSession
+from src.search_index import FaqIndex
+
+
+@pytest.fixture(scope="module")
+def index():
+    return FaqIndex(load_data("dummy_url"))
+
+
+def fresh(index, query):
+    return SearchSession(index).type(query)
+
+
+def search_threads():
+    return [t for t in threading.enumerate() if t.name.startswith("search-as-you-type")]
+
+
+def test_submit_matches_type(index):
+    session = SearchSession(index)
+    expected = fresh(index, "환불")
+    positions, scores = session.submit("환불").result()
+    assert np.array_equal(positions, expected[0])
+    assert np.array_equal(scores, expected[1])
+
+
+def test_sessions_share_a_bounded_pool(index):
+    sessions = [SearchSession(index) for _ in range(50)]
+    futures = [session.submit("환불") for session in sessions]
+    for future in futures:
+        future.result()
+    assert 0 < len(search_threads()) <= incremental_search.SEARCH_WORKERS
+
+
+def test_only_the_last_keystroke_finishes(index):
+    session = SearchSession(index)
+    with session._search_lock:  # a slow earlier search: later keystrokes pile up behind it
+        futures = [session.submit(text) for text in ["ㅎ", "화", "환", "환ㅂ", "환부", "환불"]]
+    final = futures[-1].result()
+    assert all(f.cancelled() or f.result() is None for f in futures[:-1])
+    assert session.stats['cancelled'] == len(futures) - 1
+    assert np.array_equal(final[0], fresh(index, "환불")[0])
+
+
+def test_close_cancels_pending_search(index):
+    session = SearchSession(index)
+    with session._search_lock:
+        future = session.submit("환불")
+        session.close()
+    assert future.cancelled() or future.result() is None
+    # The session stays usable after close()
+    assert len(session.type("환불")[0]) > 0
+
+
+# faq.csv has 258 rows: limits below that make the session take its incremental path
+
+def test_extending_query_matches_a_fresh_search(index):
+    session = SearchSession(index, keep_limit=40, new_limit=40)
+    chain = ["단", "단백", "단백질", "단백질 쉐", "단백질 쉐이크"]
+    for query in chain:
+        positions, scores = session.type(query)
+        expected = fresh(index, query)
+        assert np.array_equal(positions, expected[0])
+        assert np.array_equal(scores, expected[1])
+    assert session.stats['incremental'] == len(chain) - 1
+    assert session.stats['full'] == 1
+    # Later steps scored only the carried rows plus rows with the new n-grams
+    assert all(len(step.candidates) < len(index) for step in session._steps[1:])
+
+
+def test_rows_with_new_ngrams_are_added(index):
+    session = SearchSession(index, keep_limit=1, new_limit=200)
+    session.type("단백질")
+    carried = session._steps[-1]
+    best = carried.candidates[np.argmax(carried.scores)]
+    positions, scores = session.type("단백질 쉐이크")
+    assert session.stats['incremental'] == 1
+
+    candidates = session._steps[-1].candidates
+    ngrams = index.ngrams
+    new_grams = ngrams.query_ngrams("단백질 쉐이크") - ngrams.query_ngrams("단백질")
+    with_new_grams = set(np.concatenate([ngrams.postings[g] for g in new_grams if g in ngrams.postings]).tolist())
+    assert set(candidates.tolist()) <= with_new_grams | {best}
+    assert len(positions) > 1
+    # Every row found is scored as the exhaustive search scores it
+    exhaustive = index.score("단백질 쉐이크")
+    assert np.array_equal(scores, exhaustive[positions])
+
+
+def test_backspace_reuses_the_earlier_step(index):
+    session = SearchSession(index, keep_limit=40, new_limit=40)
+    first = session.type("단백")
+    session.type("단백질")
+    again = session.type("단백")
+    assert session.stats['reused'] == 1
+    assert session.stats['keystrokes'] == 3 and session.stats['full'] == 1
+    assert np.array_equal(again[0], first[0]) and np.array_equal(again[1], first[1])
+    assert np.array_equal(again[0], fresh(index, "단백")[0])
+
+
+def test_other_edit_starts_over(index):
+    session = SearchSession(index, keep_limit=40, new_limit=40)
+    session.type("단백질")
+    positions, _ = session.type("환불")
+    assert session.stats['full'] == 2 and session.stats['incremental'] == 0
+    assert np.array_equal(positions, fresh(index, "환불")[0])
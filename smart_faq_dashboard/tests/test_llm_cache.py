@@ -0,0 +1,56 @@
+from src.llm_cache import AnswerCache, cache_key
+
+
+def key(query, context="Product: BCAA\nFAQ Answer: 하루 1회"):
+    return cache_key(context, query, "gpt-4o", "system", 0.3)
+
+
+def test_key_ignores_case_and_whitespace():
+    assert key("BCAA  복용법 ") == key("bcaa 복용법")
+    assert key("bcaa 복용법") != key("bcaa 부작용")
+    assert key("bcaa 복용법") != key("bcaa 복용법", context="Product: 아르기닌")
+    assert cache_key("c", "q", "gpt-4o", "s", 0.3) != cache_key("c", "q", "gpt-4o-mini", "s", 0.3)
+
+
+def test_hit_and_miss(tmp_path):
+    cache = AnswerCache(path=str(tmp_path / "answers.sqlite"))
+    assert cache.get(key("q")) is None
+    cache.put(key("q"), "answer")
+    assert cache.get(key("q")) == "answer"
+    assert cache.stats == {'hits': 1, 'misses': 1, 'writes': 1, 'evictions': 0}
+
+
+def test_shared_between_instances(tmp_path):
+    path = str(tmp_path / "answers.sqlite")
+    AnswerCache(path=path).put(key("q"), "answer")
+    other = AnswerCache(path=path)
+    assert other.get(key("q")) == "answer"
+    assert other.totals()['entries'] == 1
+
+
+def test_entries_expire(tmp_path, clock):
+    cache = AnswerCache(path=str(tmp_path / "answers.sqlite"), ttl=60)
+    cache.put(key("q"), "answer")
+    clock[0] += 61
+    assert cache.get(key("q")) is None
+
+
+def test_least_recently_used_evicted(tmp_path, clock):
+    cache = AnswerCache(path=str(tmp_path / "answers.sqlite"), max_entries=2)
+    cache.put(key("a"), "A")
+    clock[0] += 1
+    cache.put(key("b"), "B")
+    clock[0] += 1
+    assert cache.get(key("a")) == "A"  # a is now more recently used than b
+    clock[0] += 1
+    cache.put(key("c"), "C")
+    assert cache.get(key("b")) is None
+    assert cache.get(key("a")) == "A"
+    assert cache.get(key("c")) == "C"
+    assert cache.stats['evictions'] == 1
+
+
+def test_unusable_file_is_a_miss(tmp_path):
+    cache = AnswerCache(path=str(tmp_path))  # a directory, not a database
+    cache.put(key("q"), "answer")
+    assert cache.get(key("q")) is None
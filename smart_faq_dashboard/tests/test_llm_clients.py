@@ -0,0 +1,148 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import APIConnectionError, APITimeoutError, BadRequestError, InternalServerError, RateLimitError
+
+from src import llm_clients
+from src.llm_clients import BACKOFF_MAX, backoff_delay, create_with_backoff, get_client, is_retryable
+from src.llm_engine import run_ai_summaries_batch
+
+from fake_openai import FakeClient
+
+REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+def status_error(cls, status, headers=None):
+    response = httpx.Response(status, headers=headers, request=REQUEST)
+    return cls(f"HTTP {status}", response=response, body=None)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(llm_clients.time, 'sleep', slept.append)
+    return slept
+
+
+class FlakyCompletions:
+    """Raises the given errors in turn, then answers."""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+        self.answer = FakeClient(answer="ok").chat.completions.create()
+
+    def create(self, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.answer
+
+
+def flaky_client(errors):
+    client = FakeClient()
+    client.chat.completions = FlakyCompletions(errors)
+    return client
+
+
+@pytest.mark.parametrize("error", [
+    status_error(RateLimitError, 429),
+    APIConnectionError(request=REQUEST),
+    APITimeoutError(request=REQUEST),
+    status_error(InternalServerError, 503),
+], ids=["429", "connection", "timeout", "503"])
+def test_transient_errors_are_retried(error, sleeps):
+    client = flaky_client([error, error])
+    response = create_with_backoff(client, model="m", messages=[])
+    assert response.choices[0].message.content == "ok"
+    assert client.chat.completions.calls == 3
+    assert len(sleeps) == 2
+
+
+def test_client_errors_are_not_retried(sleeps):
+    error = status_error(BadRequestError, 400)
+    assert not is_retryable(error)
+    client = flaky_client([error])
+    with pytest.raises(BadRequestError):
+        create_with_backoff(client, model="m", messages=[])
+    assert client.chat.completions.calls == 1
+    assert sleeps == []
+
+
+def test_gives_up_after_max_retries(sleeps):
+    client = flaky_client([APIConnectionError(request=REQUEST)] * 3)
+    with pytest.raises(APIConnectionError):
+        create_with_backoff(client, max_retries=2, model="m", messages=[])
+    assert client.chat.completions.calls == 3
+
+
+def test_retry_after_is_honored_and_capped():
+    assert backoff_delay(0, status_error(RateLimitError, 429, {"retry-after": "3"})) == 3.0
+    assert backoff_delay(0, status_error(RateLimitError, 429, {"retry-after": "3600"})) == BACKOFF_MAX
+    assert 0 < backoff_delay(10) <= BACKOFF_MAX
+
+
+# --- Shared client -------------------------------------------------------------
+
+@pytest.fixture
+def clients(monkeypatch):
+    monkeypatch.setattr(llm_clients, '_clients', {})
+
+
+def test_one_client_per_key_and_base_url(clients):
+    client = get_client("sk-a")
+    assert get_client("sk-a") is client
+    assert client.max_retries == 0  # create_with_backoff does the retrying
+    assert get_client("sk-b") is not client
+    local = get_client("sk-a", base_url="http://127.0.0.1:9/v1")
+    assert local is not client and get_client("sk-a", base_url="http://127.0.0.1:9/v1") is local
+
+
+def test_concurrent_first_use_creates_one_client(clients):
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        created = list(pool.map(lambda _: get_client("sk-a"), range(64)))
+    assert all(c is created[0] for c in created)
+    assert len(llm_clients._clients) == 1
+
+
+# --- Batch summaries -----------------------------------------------------------
+
+class SlowCompletions:
+    """Echoes the prompt after a delay and records how many calls were in flight at once."""
+
+    def __init__(self, delays):
+        self.delays = list(delays)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+
+    def create(self, **kwargs):
+        with self.lock:
+            delay = self.delays[self.calls % len(self.delays)]
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(delay)
+        with self.lock:
+            self.in_flight -= 1
+        prompt = kwargs['messages'][-1]['content']
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=prompt))], usage=None)
+
+
+@pytest.mark.parametrize("concurrency", [1, 3])
+def test_batch_keeps_order_and_caps_concurrency(concurrency):
+    completions = SlowCompletions(delays=[0.05, 0.0, 0.03, 0.01])  # finish out of order
+    client = FakeClient()
+    client.chat.completions = completions
+    items = [(f"Product: P{i}", f"질문 {i}번", f"row-{i}") for i in range(10)]
+
+    answers = run_ai_summaries_batch(items, client=client, cache=None, semantic=False, concurrency=concurrency)
+
+    assert completions.calls == len(items)
+    assert [f"질문 {i}번" in answer for i, answer in enumerate(answers)] == [True] * len(items)
+    assert completions.max_in_flight == concurrency
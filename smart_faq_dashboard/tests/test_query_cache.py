@@ -0,0 +1,108 @@
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+from src import snapshot
+from src.data_loader import load_data
+from src.query_cache import QueryCache
+from src.search_engine import smart_search
+from src.search_index import FaqIndex
+
+
+@pytest.fixture(scope="module")
+def df():
+    return load_data("dummy_url")
+
+
+def search(df, index, cache, query="환불"):
+    return smart_search(df, query, index=index, cache=cache, semantic=None)
+
+
+def entry(n):
+    return np.arange(n, dtype=np.int32), np.zeros(n, dtype=np.int16)
+
+
+def test_repeated_query_is_served_from_cache(df):
+    cache = QueryCache()
+    index = FaqIndex(df)
+    first = search(df, index, cache)
+    again = search(df, index, cache, query="  환불 ")  # same query after normalization
+    assert cache.stats == {'hits': 1, 'misses': 1, 'evictions': 0}
+    assert again.equals(first)
+
+
+def test_updated_index_misses_the_cache(df):
+    cache = QueryCache()
+    index = FaqIndex(df)
+    assert search(df, index, cache).empty is False
+
+    # A sheet sync changes row 0 to the only "환불" match
+    changed = df.copy()
+    changed.loc[0, 'Question'] = "환불 규정 안내"
+    changed.loc[0, 'Product'] = "환불전용상품"
+    fresh = index.updated(changed, [0])
+    assert fresh.version != index.version
+
+    results = search(changed, fresh, cache)
+    assert cache.stats['misses'] == 2 and cache.stats['hits'] == 0
+    assert "환불전용상품" in results['Product'].tolist()
+    assert cache.metrics()['versions'] == 2
+
+
+def test_new_snapshot_misses_the_cache(df, tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, "SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(snapshot, "_loaded", OrderedDict())
+    cache = QueryCache()
+
+    old = snapshot.save_index("a" * 64, df.copy())
+    search(df, old, cache)
+    edited = df.iloc[:100].reset_index(drop=True)
+    new = snapshot.save_index("b" * 64, edited)
+    assert new.version != old.version
+    search(edited, new, cache)
+    assert cache.stats['misses'] == 2 and cache.stats['hits'] == 0
+
+    # Reading the same snapshot back is the same data: its cached results stay valid
+    monkeypatch.setattr(snapshot, "_loaded", OrderedDict())
+    reloaded = snapshot.load_index("b" * 64)
+    assert reloaded.version == new.version
+    search(edited, reloaded, cache)
+    assert cache.stats['hits'] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryCache(max_entries=2)
+    cache.put(('v1', 'a'), entry(1))
+    cache.put(('v1', 'b'), entry(1))
+    assert cache.get(('v1', 'a')) is not None  # 'b' is now the oldest
+    cache.put(('v1', 'c'), entry(1))
+    assert len(cache) == 2
+    assert cache.get(('v1', 'b')) is None
+    assert cache.get(('v1', 'a')) is not None and cache.get(('v1', 'c')) is not None
+    assert cache.stats['evictions'] == 1
+
+
+def test_metrics_track_hit_rate_and_bytes():
+    cache = QueryCache(max_entries=2)
+    assert cache.metrics()['hit_rate'] == 0.0
+
+    cache.put(('v1', 'a'), entry(10))
+    a_bytes = cache.metrics()['bytes']
+    assert a_bytes >= 10 * 4 + 10 * 2
+    cache.put(('v1', 'a'), entry(100))  # replacing an entry doesn't count it twice
+    assert cache.metrics()['bytes'] == a_bytes + 90 * 6
+
+    cache.put(('v2', 'b'), entry(10))
+    cache.put(('v2', 'c'), entry(10))  # evicts ('v1', 'a')
+    assert cache.metrics()['bytes'] == 2 * a_bytes
+
+    cache.get(('v2', 'b'))
+    cache.get(('v2', 'c'))
+    cache.get(('v1', 'a'))
+    metrics = cache.metrics()
+    assert metrics['hit_rate'] == pytest.approx(2 / 3)
+    assert metrics['entries'] == 2 and metrics['versions'] == 1 and metrics['evictions'] == 1
+
+    cache.clear()
+    assert cache.metrics()['bytes'] == 0 and len(cache) == 0
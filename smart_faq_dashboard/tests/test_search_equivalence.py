@@ -0,0 +1,55 @@
+import os
+import sys
+
+import pytest
+
+from src.data_loader import load_data
+from src.search_engine import CANDIDATE_LIMIT, smart_search
+from src.search_index import FaqIndex
+from src.synonym_automaton import synonym_store
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from common import legacy_smart_search, scale_catalog  # noqa: E402
+
+QUERIES = [
+    "단백지쉐이크",      # typo
+    "bcaa 복용 방법",    # spaced
+    "BCAA",             # Latin
+    "Protein",          # Latin, rewritten by a synonym
+    "?!...",            # punctuation only
+    "zzqxjv 없는상품",   # zero results
+    "환불",              # many tied scores on the scaled catalog
+]
+COLUMNS = ['Product', 'Model', 'Tags', 'Question', 'Answer', 'score']
+
+
+@pytest.fixture(scope="module")
+def faq():
+    return load_data("dummy_url")
+
+
+def assert_same(df, query, max_candidates):
+    expected = legacy_smart_search(df, synonym_store.rewrite(query))
+    actual = smart_search(df, query, index=FaqIndex(df), cache=None, max_candidates=max_candidates, semantic=None)
+    if expected.empty:
+        assert actual.empty
+        return
+    assert actual['score'].tolist() == expected['score'].tolist()
+    # Same rows in the same order, including the order within ties
+    assert actual[COLUMNS].values.tolist() == expected[COLUMNS].values.tolist()
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_matches_legacy_scan_on_faq(faq, query):
+    assert_same(faq, query, max_candidates=None)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_matches_legacy_scan_on_scaled_catalog(faq, query):
+    # Below CANDIDATE_LIMIT, so the default smart_search scores every row
+    assert_same(scale_catalog(faq, 1500), query, max_candidates=CANDIDATE_LIMIT)
+
+
+def test_queries_produce_ties(faq):
+    results = smart_search(faq, "단백지쉐이크", index=FaqIndex(faq), cache=None, semantic=None)
+    assert results['score'].duplicated().any()
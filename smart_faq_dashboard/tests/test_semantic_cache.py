@@ -0,0 +1,64 @@
+from src.embeddings import HashingEmbedder
+from src.llm_engine import generate_ai_summary
+from src.semantic_cache import SemanticCache
+
+from fake_openai import FakeClient
+
+
+def make_cache(**kwargs):
+    return SemanticCache(HashingEmbedder(), **kwargs)
+
+
+def test_near_duplicate_reused_for_same_row_only():
+    cache = make_cache(threshold=0.85)
+    cache.add("row1", "bcaa 복용 방법", "하루 1회")
+    assert cache.lookup("row1", "bcaa 복용방법")[0] == "하루 1회"
+    assert cache.lookup("row2", "bcaa 복용방법") is None
+    assert cache.lookup("row1", "아르기닌 부작용") is None
+
+
+def test_negation_not_reused_at_default_threshold():
+    cache = make_cache()
+    cache.add("row1", "환불 가능한가요", "가능합니다")
+    assert cache.lookup("row1", "환불 불가능한가요") is None
+
+
+def test_expired_row_is_removed(clock):
+    cache = make_cache(ttl=10)
+    cache.add("row1", "질문", "답변")
+    clock[0] += 11
+    assert cache.lookup("row1", "질문") is None
+    assert "row1" not in cache.rows
+    assert len(cache) == 0
+
+
+def test_eviction_after_a_row_expired(clock):
+    cache = make_cache(max_entries=2, ttl=10)
+    cache.add("row1", "질문 1", "답변 1")
+    clock[0] += 11
+    cache.lookup("row1", "질문 1")
+    for i in (2, 3, 4):
+        clock[0] += 1
+        cache.add(f"row{i}", f"질문 {i}", f"답변 {i}")
+    assert len(cache) == 2
+    assert sorted(cache.rows) == ["row3", "row4"]
+
+
+def test_least_recently_used_evicted_per_row(clock):
+    cache = make_cache(max_entries_per_row=2, threshold=0.99)
+    for i in range(3):
+        clock[0] += 1
+        cache.add("row", f"질문 {i}", f"답변 {i}")
+    assert cache.rows["row"].queries == ["질문 1", "질문 2"]
+
+
+def test_summaries_keep_working_after_expiry(tmp_path, clock):
+    # Regression: an expired row left an empty entry list that broke the next global eviction
+    cache = make_cache(max_entries=2, ttl=10)
+    client = FakeClient(answer="답변")
+    generate_ai_summary("Product: A", "질문", client=client, cache=None, semantic=cache)
+    clock[0] += 11
+    cache.lookup(next(iter(cache.rows)), "질문")
+    for product in "BCD":
+        assert generate_ai_summary(f"Product: {product}", "질문", client=client, cache=None, semantic=cache) == "답변"
+    assert len(cache) == 2
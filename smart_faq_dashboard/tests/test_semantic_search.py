@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+
+from src import vector_index
+from src.data_loader import load_data
+from src.embeddings import HASHING
+from src.search_index import DEFAULT_THRESHOLDS, SEMANTIC_THRESHOLD_DROP, SEMANTIC_TOP_K, SYLLABLE, FaqIndex
+from src.vector_index import VectorIndex, row_texts
+
+# Has a row matched on its fuzzy score alone and one matched on its fused score alone
+QUERY = "환불 받고 싶어요"
+
+
+@pytest.fixture(scope="module")
+def df():
+    return load_data("dummy_url")
+
+
+@pytest.fixture(scope="module")
+def index(df):
+    return FaqIndex(df)
+
+
+@pytest.fixture
+def embedded(monkeypatch):
+    """Records every batch of texts the VectorIndex embeds."""
+    batches = []
+    embed = vector_index.get_embedder(HASHING)
+
+    def counting(model_id):
+        def wrapper(texts):
+            batches.append(list(texts))
+            return embed(texts)
+        return wrapper
+
+    monkeypatch.setattr(vector_index, 'get_embedder', counting)
+    return batches
+
+
+# --- fuse ----------------------------------------------------------------------
+
+def test_fuse_rescales_similarities_of_the_nearest_rows(index):
+    fuzzy = np.array([80, 60, 40, 20, 0])
+    near = np.array([2, 0, 1])  # best first
+    similarity = np.array([0.9, 0.5, 0.1], dtype=np.float32)
+    # semantic: row 2 -> 100, row 0 -> 50, row 1 -> 0, rows outside near -> 0
+    assert index.fuse(fuzzy, near, similarity, weight=0.3).tolist() == [71, 42, 58, 14, 0]
+
+
+def test_fuse_without_spread_gives_every_near_row_full_marks(index):
+    fuzzy = np.array([50, 50, 50])
+    assert index.fuse(fuzzy, np.array([1]), np.array([0.2], dtype=np.float32), weight=0.5).tolist() == [25, 75, 25]
+    assert index.fuse(fuzzy, np.array([0, 2]), np.array([0.4, 0.4], dtype=np.float32),
+                      weight=0.5).tolist() == [75, 25, 75]
+    assert index.fuse(fuzzy, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32),
+                      weight=0.5).tolist() == [25, 25, 25]
+
+
+# --- match(..., semantic=...) ----------------------------------------------------
+
+def test_semantic_match_follows_the_fused_threshold_rule(index):
+    threshold = DEFAULT_THRESHOLDS[SYLLABLE]
+    fuzzy = index.score(QUERY)
+    near, similarity = index.vectors(HASHING).top_k(QUERY, SEMANTIC_TOP_K)
+    fused = index.fuse(fuzzy, near, similarity)
+
+    positions, scores = index.match(QUERY, semantic=HASHING)
+
+    expected = np.flatnonzero((fuzzy >= threshold) | (fused >= threshold - SEMANTIC_THRESHOLD_DROP))
+    assert sorted(positions.tolist()) == expected.tolist()
+    assert scores.tolist() == fused[positions].tolist()  # fused scores are returned
+    assert scores.tolist() == sorted(scores.tolist(), reverse=True)
+
+    fuzzy_only = (fuzzy >= threshold) & (fused < threshold - SEMANTIC_THRESHOLD_DROP)
+    fused_only = (fuzzy < threshold) & (fused >= threshold - SEMANTIC_THRESHOLD_DROP)
+    assert fuzzy_only.any() and set(np.flatnonzero(fuzzy_only)) <= set(positions.tolist())
+    assert fused_only.any() and set(np.flatnonzero(fused_only)) <= set(positions.tolist())
+    # Fused-only rows are the ones plain fuzzy search misses
+    assert not set(np.flatnonzero(fused_only)) & set(index.match(QUERY)[0].tolist())
+
+
+def test_choseong_queries_stay_fuzzy_only(index):
+    fuzzy = index.match("ㅎㅂ", mode=SYLLABLE)
+    semantic = index.match("ㅎㅂ", mode=SYLLABLE, semantic=HASHING)
+    assert np.array_equal(fuzzy[0], semantic[0]) and np.array_equal(fuzzy[1], semantic[1])
+
+
+# --- VectorIndex.updated ---------------------------------------------------------
+
+def test_updated_embeds_only_changed_rows(df, embedded):
+    texts = row_texts(df)
+    vectors = VectorIndex(texts, HASHING)
+    embedded.clear()
+
+    texts = list(texts)
+    texts[3] = "새로 바뀐 답변"
+    texts[10] = "또 다른 변경"
+    fresh = vectors.updated(len(texts), [3, 10], [texts[3], texts[10]])
+
+    assert embedded == [[texts[3], texts[10]]]
+    assert np.array_equal(fresh.matrix, VectorIndex(texts, HASHING).matrix)
+    assert fresh is not vectors and not np.array_equal(vectors.matrix[3], fresh.matrix[3])
+
+
+@pytest.mark.parametrize("length", [100, 300])
+def test_updated_handles_row_count_changes(df, embedded, length):
+    texts = row_texts(df)
+    vectors = VectorIndex(texts, HASHING)
+    embedded.clear()
+
+    new_texts = (texts + [f"추가된 행 {i}" for i in range(length - len(texts))])[:length]
+    appended = list(range(len(texts), length))
+    fresh = vectors.updated(length, appended, [new_texts[i] for i in appended])
+
+    assert len(fresh) == length
+    assert sum(len(batch) for batch in embedded) == len(appended)
+    assert np.array_equal(fresh.matrix, VectorIndex(new_texts, HASHING).matrix)
+
+
+def test_faq_index_updated_reembeds_changed_rows(df, embedded):
+    index = FaqIndex(df)
+    index.vectors(HASHING)
+    embedded.clear()
+
+    changed = df.copy()
+    changed.loc[5, 'Answer'] = "환불은 구매 후 7일 이내에 가능합니다."
+    fresh = index.updated(changed, [5])
+
+    assert sum(len(batch) for batch in embedded) == 1
+    assert np.array_equal(fresh.vectors(HASHING).matrix, FaqIndex(changed).vectors(HASHING).matrix)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from src import sharded_search
+from src.data_loader import load_data
+from src.search_engine import smart_search
+from src.search_index import FaqIndex
+from src.sharded_search import ShardedSearch, sharded_search_for
+
+QUERIES = ["환불", "bcaa 복용 방법", "단백질 쉐이크", "유통기한"]
+
+
+@pytest.fixture(scope="module")
+def df():
+    return load_data("dummy_url")
+
+
+@pytest.fixture
+def sharding(monkeypatch):
+    monkeypatch.setattr(sharded_search, "SHARDED_SEARCH_ROWS", 1)
+    monkeypatch.setattr(sharded_search, "SHARDED_SEARCH_WORKERS", 2)
+    yield
+    sharded_search._close_active()
+
+
+def test_sharded_matches_exhaustive_faq_index(df):
+    index = FaqIndex(df)
+    with ShardedSearch(index, workers=2) as sharded:
+        for query in QUERIES:
+            positions, scores = sharded.match(query)
+            expected = index.match(query, max_candidates=None)
+            assert np.array_equal(positions, expected[0])
+            assert np.array_equal(scores, expected[1])
+
+
+def test_off_below_row_threshold(df, monkeypatch):
+    monkeypatch.setattr(sharded_search, "SHARDED_SEARCH_ROWS", 0)
+    assert sharded_search_for(FaqIndex(df), wait=True) is None
+    monkeypatch.setattr(sharded_search, "SHARDED_SEARCH_ROWS", len(df) + 1)
+    assert sharded_search_for(FaqIndex(df), wait=True) is None
+
+
+def test_smart_search_uses_shards_once_started(df, sharding):
+    index = FaqIndex(df)
+    sharded = sharded_search_for(index, wait=True)
+    assert sharded is not None
+    assert sharded_search_for(index) is sharded  # one per index
+    for query in QUERIES:
+        results = smart_search(df, query, index=index, cache=None)
+        expected = index.search(query, max_candidates=None)
+        assert results.index.tolist() == expected.index.tolist()
+
+
+def test_new_index_replaces_and_closes_previous(df, sharding):
+    old = sharded_search_for(FaqIndex(df), wait=True)
+    new_index = FaqIndex(df)
+    new = sharded_search_for(new_index, wait=True)
+    assert new is not old and new.index is new_index
+    assert old._shm is None and old._executors == []
+    # A new index is searched in this process until its workers are up
+    fresh = FaqIndex(df)
+    assert len(smart_search(df, "환불", index=fresh, cache=None)) > 0
+    assert sharded_search_for(fresh, wait=True).index is fresh
@@ -0,0 +1,136 @@
+import copy
+
+import pandas as pd
+import pytest
+
+from src.search_index import FaqIndex
+from src.sheet_sync import SheetSync
+
+HEADER = ['Product', 'Model', 'Tags', 'Manual', 'Question', 'Answer', 'Updated']
+
+
+class FakeWorksheet:
+    """In-memory stand-in for gspread.Worksheet (values, including the header row)."""
+
+    def __init__(self, values):
+        self.values = values
+        self.calls = {'get_all_values': 0, 'col_values': 0, 'batch_get': 0}
+
+    def get_all_values(self):
+        self.calls['get_all_values'] += 1
+        return copy.deepcopy(self.values)
+
+    def col_values(self, col):
+        self.calls['col_values'] += 1
+        column = [row[col - 1] if col - 1 < len(row) else '' for row in self.values]
+        while column and column[-1] == '':
+            column.pop()
+        return column
+
+    def batch_get(self, ranges):
+        self.calls['batch_get'] += 1
+        results = []
+        for a1 in ranges:
+            start, end = a1.split(':')
+            first = int(''.join(ch for ch in start if ch.isdigit()))
+            last = int(''.join(ch for ch in end if ch.isdigit()))
+            results.append([list(row) for row in self.values[first - 1:last]])
+        return results
+
+
+def make_sheet(n, revision=lambda i: f"{i}-r0"):
+    rows = [[f"p{i}", f"M{i}", "태그", "", f"질문 {i}", f"답변 {i}", revision(i)] for i in range(n)]
+    return FakeWorksheet([list(HEADER)] + rows)
+
+
+def products(sync):
+    return list(sync.index.df['Product'])
+
+
+def assert_mirrors(sync, sheet):
+    reference = FaqIndex(pd.DataFrame(sheet.values[1:], columns=sheet.values[0]))
+    assert products(sync) == [row[0] for row in sheet.values[1:]]
+    assert sync.index.targets == reference.targets
+
+
+@pytest.mark.parametrize("revision_column", [None, 'Updated'])
+def test_updates_are_applied(revision_column):
+    sheet = make_sheet(6)
+    sync = SheetSync(sheet, revision_column=revision_column)
+    sync.refresh()
+
+    sheet.values[3][4] = "수정된 질문"
+    sheet.values[3][6] = "2-r1"
+    assert sync.refresh() == 1
+    assert_mirrors(sync, sheet)
+
+
+def test_revision_mode_fetches_only_changed_ranges():
+    sheet = make_sheet(50)
+    sync = SheetSync(sheet, revision_column='Updated')
+    sync.refresh()
+    full_fetches = sheet.calls['get_all_values']
+
+    sheet.values[10][4] = "수정된 질문"
+    sheet.values[10][6] = "9-r1"
+    sync.refresh()
+    assert sheet.calls['get_all_values'] == full_fetches
+    assert sheet.calls['batch_get'] == 1
+    assert sync.stats['rows_fetched'] == 50 + 1
+    assert_mirrors(sync, sheet)
+
+
+@pytest.mark.parametrize("revision", [lambda i: "r0", lambda i: f"{i}-r0"], ids=["constant", "unique"])
+def test_delete_mid_sheet(revision):
+    sheet = make_sheet(4, revision)
+    sync = SheetSync(sheet, revision_column='Updated')
+    sync.refresh()
+
+    del sheet.values[2]  # the row holding p1
+    sync.refresh()
+    assert products(sync) == ['p0', 'p2', 'p3']
+    assert_mirrors(sync, sheet)
+
+
+def test_insert_mid_sheet_with_constant_revisions():
+    sheet = make_sheet(4, lambda i: "r0")
+    sync = SheetSync(sheet, revision_column='Updated')
+    sync.refresh()
+
+    sheet.values.insert(2, ["new", "N", "", "", "새 질문", "새 답변", "r0"])
+    sync.refresh()
+    assert_mirrors(sync, sheet)
+
+
+def test_duplicate_revisions_fall_back_to_hash_comparison():
+    sheet = make_sheet(4, lambda i: "r0")
+    sync = SheetSync(sheet, revision_column='Updated')
+    sync.refresh()
+
+    # A row edited without its revision changing is still picked up
+    sheet.values[1][4] = "수정된 질문"
+    assert sync.refresh() == 1
+    assert_mirrors(sync, sheet)
+
+
+@pytest.mark.parametrize("revision_column", [None, 'Updated'])
+def test_delete_trailing_rows(revision_column):
+    sheet = make_sheet(5)
+    sync = SheetSync(sheet, revision_column=revision_column)
+    sync.refresh()
+
+    del sheet.values[-2:]
+    sync.refresh()
+    assert products(sync) == ['p0', 'p1', 'p2']
+    assert len(sync.index) == 3
+
+
+def test_header_change_reloads():
+    sheet = make_sheet(3)
+    sync = SheetSync(sheet, revision_column='Updated')
+    sync.refresh()
+
+    sheet.values[0][6] = 'Revision'
+    sync.refresh()
+    assert sync.stats['full_fetches'] == 2
+    assert_mirrors(sync, sheet)
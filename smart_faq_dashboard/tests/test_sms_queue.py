@@ -0,0 +1,136 @@
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from src import sms_queue
+from src.sms_queue import FAILED, QUEUED, SENT, UNKNOWN, SmsDispatcher, SmsQueue
+from src.sms_sender import SmsSendError, SolapiProvider
+
+
+class FakeProvider:
+    """Answers each send_batch call with the next outcome: a result dict builder or an exception."""
+
+    batch_size = 10
+
+    def __init__(self, outcomes=()):
+        self.outcomes = list(outcomes)
+        self.batches = []
+
+    def send_batch(self, session, jobs):
+        self.batches.append([job['id'] for job in jobs])
+        outcome = self.outcomes.pop(0) if self.outcomes else None
+        if isinstance(outcome, Exception):
+            raise outcome
+        return {job['id']: (not job['phone'].startswith('000'), "detail") for job in jobs}
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SmsQueue(str(tmp_path / "sms.sqlite"))
+
+
+def dispatcher(queue, provider):
+    return SmsDispatcher(queue, provider, workers=0, max_attempts=3)
+
+
+def make_due(queue, job_id):
+    queue._update(job_id, QUEUED, "", next_attempt_at=0)
+
+
+def test_enqueue_is_idempotent(queue):
+    first = queue.enqueue("01012345678", "안내", "key-1")
+    assert queue.enqueue("01012345678", "안내", "key-1") == first
+    assert queue.enqueue("01012345678", "안내", "key-2") != first
+    with pytest.raises(ValueError):
+        queue.enqueue("", "안내")
+
+
+def test_batch_sent_and_rejected_numbers_fail(queue):
+    provider = FakeProvider()
+    ids = [queue.enqueue(phone, "안내") for phone in ("01011112222", "0001234", "01033334444")]
+    d = dispatcher(queue, provider)
+    assert d.drain_once(None) == 3
+    assert provider.batches == [ids]
+    assert [queue.status(i)['status'] for i in ids] == [SENT, FAILED, SENT]
+    assert d.drain_once(None) == 0
+
+
+def test_nothing_sent_is_retried_then_fails(queue):
+    error = SmsSendError("429", retryable=True)
+    provider = FakeProvider([error, error, error])
+    job_id = queue.enqueue("01011112222", "안내")
+    d = dispatcher(queue, provider)
+    for attempt in (1, 2):
+        d.drain_once(None)
+        assert queue.status(job_id)['status'] == QUEUED
+        assert queue.status(job_id)['attempts'] == attempt
+        make_due(queue, job_id)
+    d.drain_once(None)
+    assert queue.status(job_id)['status'] == FAILED
+    assert len(provider.batches) == 3
+
+
+@pytest.mark.parametrize("error", [SmsSendError("503", retryable=False, unknown=True), RuntimeError("bug")],
+                         ids=["maybe-sent", "provider-bug"])
+def test_maybe_sent_is_never_resent(queue, error):
+    provider = FakeProvider([error])
+    job_id = queue.enqueue("01011112222", "안내")
+    d = dispatcher(queue, provider)
+    d.drain_once(None)
+    assert queue.status(job_id)['status'] == UNKNOWN
+    assert d.drain_once(None) == 0
+    assert len(provider.batches) == 1
+    assert d.stats['unknown'] == 1
+
+
+def test_stale_sending_job_becomes_unknown(queue, monkeypatch):
+    job_id = queue.enqueue("01011112222", "안내")
+    assert [job['id'] for job in queue.claim(10)] == [job_id]  # the worker then dies mid-request
+    monkeypatch.setattr(sms_queue, 'LEASE_TIMEOUT', -1)
+    assert queue.claim(10) == []
+    assert queue.status(job_id)['status'] == UNKNOWN
+
+
+class FakeSession:
+    def __init__(self, response=None, error=None):
+        self.response = response
+        self.error = error
+        self.posts = []
+
+    def post(self, url, headers, json, timeout):
+        self.posts.append(json)
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+
+def response(status, body=None):
+    return SimpleNamespace(status_code=status, text=str(body), json=lambda: body)
+
+
+JOBS = [{'id': 1, 'phone': "01011112222", 'message': "안내", 'idempotency_key': "k1"},
+        {'id': 2, 'phone': "0001234", 'message': "안내", 'idempotency_key': "k2"}]
+
+
+def test_solapi_maps_failed_messages_by_key():
+    body = {"groupInfo": {"groupId": "G1"},
+            "failedMessageList": [{"customFields": {"idempotencyKey": "k2"}, "statusCode": "1062",
+                                   "statusMessage": "Invalid recipient"}]}
+    session = FakeSession(response(200, body))
+    results = SolapiProvider("key", "secret", "0100000000").send_batch(session, JOBS)
+    assert results == {1: (True, "SMS sent to 01011112222 (group G1)"), 2: (False, "1062 Invalid recipient")}
+    assert [m['customFields']['idempotencyKey'] for m in session.posts[0]['messages']] == ["k1", "k2"]
+
+
+@pytest.mark.parametrize("session, retryable, unknown", [
+    (FakeSession(response(429, {})), True, False),
+    (FakeSession(error=requests.ConnectTimeout("connect timeout")), True, False),
+    (FakeSession(response(503, {})), False, True),
+    (FakeSession(error=requests.ReadTimeout("read timeout")), False, True),
+    (FakeSession(response(400, {})), False, False),
+], ids=["429", "connect-timeout", "503", "read-timeout", "400"])
+def test_solapi_only_retries_when_nothing_was_sent(session, retryable, unknown):
+    with pytest.raises(SmsSendError) as caught:
+        SolapiProvider("key", "secret", "0100000000").send_batch(session, JOBS)
+    assert (caught.value.retryable, caught.value.unknown) == (retryable, unknown)
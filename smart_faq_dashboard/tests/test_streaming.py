@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src import llm_engine
+from src.llm_cache import AnswerCache
+from src.llm_engine import generate_ai_summary, stream_ai_summary, ttft_summary
+
+from fake_openai import FakeClient, chunk
+
+CONTEXT = "Product: BCAA\nFAQ Answer: 하루 1회 물에 타서 드세요."
+
+
+@pytest.fixture(autouse=True)
+def fresh_ttft(monkeypatch):
+    monkeypatch.setattr(llm_engine, 'ttft_samples', llm_engine.deque(maxlen=1000))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AnswerCache(path=str(tmp_path / "answers.sqlite"))
+
+
+def test_streams_text_chunks(cache):
+    client = FakeClient(answer="하루 1회 드세요")
+    parts = list(stream_ai_summary(CONTEXT, "복용 방법", client=client, cache=cache, semantic=False))
+    assert parts == ["하루 ", "1회 ", "드세요"]
+    assert client.calls[0]['stream'] is True
+    assert client.calls[0]['stream_options'] == {"include_usage": True}
+
+
+def test_role_and_usage_only_chunks_are_skipped(cache):
+    usage = SimpleNamespace(prompt_tokens=120, completion_tokens=8)
+    chunks = [chunk(role="assistant"), chunk("답변"), chunk(None), chunk("입니다"), chunk(usage=usage, choices=False)]
+    client = FakeClient(chunks=chunks)
+    assert list(stream_ai_summary(CONTEXT, "복용 방법", client=client, cache=cache, semantic=False)) == \
+        ["답변", "입니다"]
+
+
+def test_streamed_answer_is_cached_and_replayed_in_one_chunk(cache):
+    client = FakeClient(answer="하루 1회 드세요")
+    list(stream_ai_summary(CONTEXT, "복용 방법", client=client, cache=cache, semantic=False))
+    replay = list(stream_ai_summary(CONTEXT, "복용 방법", client=client, cache=cache, semantic=False))
+    assert replay == ["하루 1회 드세요"]
+    assert len(client.calls) == 1
+    # The non-streaming path shares the same cache entry
+    assert generate_ai_summary(CONTEXT, "복용 방법", client=client, cache=cache, semantic=False) == "하루 1회 드세요"
+    assert len(client.calls) == 1
+
+
+def test_error_mid_stream(cache):
+    client = FakeClient(chunks=[chunk("부분 ")], error=RuntimeError("connection reset"))
+    parts = list(stream_ai_summary(CONTEXT, "복용 방법", client=client, cache=cache, semantic=False))
+    assert parts[0] == "부분 "
+    assert parts[-1] == "⚠️ Error generating AI summary: connection reset"
+    # A broken stream is not cached
+    assert cache.get(llm_engine._cache_keys(CONTEXT, "복용 방법")[0]) is None
+
+
+def test_time_to_first_token_recorded(cache):
+    list(stream_ai_summary(CONTEXT, "복용 방법", client=FakeClient(), cache=cache, semantic=False))
+    assert len(llm_engine.ttft_samples) == 1
+    assert ttft_summary()['count'] == 1
+
+    # Cached replays and streams without text don't add samples
+    list(stream_ai_summary(CONTEXT, "복용 방법", client=FakeClient(), cache=cache, semantic=False))
+    list(stream_ai_summary(CONTEXT, "부작용", client=FakeClient(chunks=[chunk(role="assistant")]),
+                           cache=cache, semantic=False))
+    assert len(llm_engine.ttft_samples) == 1
+
+
+def test_no_api_key(monkeypatch, cache):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setattr(llm_engine, '_resolve_api_key', lambda api_key: None)
+    parts = list(stream_ai_summary(CONTEXT, "복용 방법", cache=cache, semantic=False))
+    assert parts == ["⚠️ OpenAI API Key가 없습니다. 설정 메뉴에서 키를 입력해주세요."]
+
+
+def test_cache_write_failure_does_not_break_the_stream(cache):
+    class BrokenSemantic:
+        def lookup(self, row_key, query):
+            return None
+
+        def add(self, row_key, query, answer):
+            raise RuntimeError("embedding model unavailable")
+
+    parts = list(stream_ai_summary(CONTEXT, "복용 방법", client=FakeClient(answer="답변"), cache=cache,
+                                   semantic=BrokenSemantic()))
+    assert parts == ["답변"]
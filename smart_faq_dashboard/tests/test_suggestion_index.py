@@ -0,0 +1,57 @@
+import random
+
+import pytest
+from rapidfuzz import fuzz
+from rapidfuzz.utils import default_process
+
+from src.data_loader import load_data
+from src.suggestion_index import MIN_SUGGESTION_SCORE, SuggestionIndex
+
+
+@pytest.fixture(scope="module")
+def suggestions():
+    return SuggestionIndex(load_data("dummy_url"))
+
+
+def full_scan(index, query, k, min_score=MIN_SUGGESTION_SCORE):
+    """fuzz.ratio against every keyword, ties in vocabulary order."""
+    processed = default_process(query)
+    if not processed:
+        return []
+    scored = [(word, round(fuzz.ratio(processed, word))) for word in index.keywords]
+    scored = [(word, score) for word, score in scored if score > min_score]
+    scored.sort(key=lambda item: -item[1])
+    return [(index.keywords[word], score) for word, score in scored[:k]]
+
+
+def typos(words, seed=0):
+    """Each keyword with up to three random deletions, substitutions or insertions."""
+    rng = random.Random(seed)
+    queries = []
+    for word in words:
+        chars = list(word)
+        for _ in range(rng.randint(0, 3)):
+            if not chars:
+                break
+            i = rng.randrange(len(chars))
+            op = rng.random()
+            if op < 0.4:
+                del chars[i]
+            elif op < 0.7:
+                chars[i] = rng.choice("가나다단백abc1 ")
+            else:
+                chars.insert(i, rng.choice("가나다단백abc1 "))
+        queries.append("".join(chars))
+    return queries
+
+
+@pytest.mark.parametrize("k", [1, 2, 3, 5, 10])
+def test_suggest_matches_full_scan(suggestions, k):
+    queries = typos(suggestions.keywords.values()) + ["단백지", "프로틴", "bcaa", "ㅎㅎ", "zzzz", "?!", ""]
+    for query in queries:
+        assert suggestions.suggest(query, k) == full_scan(suggestions, query, k), query
+
+
+def test_suggest_with_lower_min_score_matches_full_scan(suggestions):
+    for query in typos(suggestions.keywords.values(), seed=1)[:40]:
+        assert suggestions.suggest(query, 5, min_score=20) == full_scan(suggestions, query, 5, min_score=20), query
@@ -0,0 +1,126 @@
+import json
+import os
+import random
+
+import pytest
+
+from src.synonym_automaton import SynonymAutomaton, SynonymStore
+
+SYNONYMS = {
+    "액티브 에너지젤": "에너지젤",
+    "에너지젤": "ENERGY GEL",
+    "단백지쉐이크": "단백질 쉐이크",
+    "프로틴": "단백질",
+    "Protein": "단백질",
+}
+
+
+@pytest.fixture
+def automaton():
+    return SynonymAutomaton(SYNONYMS)
+
+
+def naive_find(synonyms, text):
+    """Leftmost-longest matching by trying every key at every position."""
+    keys = {k.lower(): v for k, v in synonyms.items() if k}
+    lowered = text.lower()
+    matches = []
+    pos = 0
+    while pos < len(text):
+        hits = [k for k in keys if lowered.startswith(k, pos)]
+        if hits:
+            key = max(hits, key=len)
+            matches.append((pos, pos + len(key), keys[key]))
+            pos += len(key)
+        else:
+            pos += 1
+    return matches
+
+
+def test_longest_key_wins_over_a_key_it_contains(automaton):
+    assert automaton.find("액티브 에너지젤 후기") == [(0, 8, "에너지젤")]
+    assert automaton.rewrite("액티브 에너지젤 후기") == "에너지젤 후기"
+    # The shorter key alone still matches
+    assert automaton.rewrite("에너지젤 후기") == "ENERGY GEL 후기"
+
+
+def test_overlapping_keys_take_the_leftmost():
+    automaton = SynonymAutomaton({"abc": "X", "bcd": "Y"})
+    assert automaton.rewrite("abcd") == "Xd"
+
+
+def test_shorter_key_after_a_match_is_found():
+    # "bc" overlaps "ab", but "c" ends at the same position and fits after it
+    automaton = SynonymAutomaton({"ab": "X", "bc": "Y", "c": "Z"})
+    assert automaton.rewrite("abc") == "XZ"
+
+
+def test_keys_match_case_insensitively(automaton):
+    for text in ["Protein 복용법", "protein 복용법", "PROTEIN 복용법"]:
+        assert automaton.rewrite(text) == "단백질 복용법"
+
+
+def test_several_keys_in_one_query(automaton):
+    assert automaton.rewrite("프로틴 vs 단백지쉐이크 vs 액티브 에너지젤") == "단백질 vs 단백질 쉐이크 vs 에너지젤"
+
+
+def test_text_without_keys_is_unchanged(automaton):
+    assert automaton.find("환불 문의") == []
+    assert automaton.rewrite("환불 문의") == "환불 문의"
+    assert SynonymAutomaton({}).rewrite("프로틴") == "프로틴"
+
+
+def test_matches_naive_leftmost_longest():
+    rng = random.Random(0)
+    synonyms = {"".join(rng.choice("abc") for _ in range(rng.randint(1, 4))): str(i) for i in range(15)}
+    automaton = SynonymAutomaton(synonyms)
+    for _ in range(300):
+        text = "".join(rng.choice("abcABd ") for _ in range(rng.randint(0, 20)))
+        assert automaton.find(text) == naive_find(synonyms, text)
+
+
+# --- SynonymStore --------------------------------------------------------------
+
+def write(path, synonyms, mtime):
+    path.write_text(synonyms if isinstance(synonyms, str) else json.dumps(synonyms), encoding='utf-8')
+    os.utime(path, (mtime, mtime))
+
+
+def test_store_reloads_when_mtime_changes(tmp_path):
+    path = tmp_path / "synonyms.json"
+    write(path, {"프로틴": "단백질"}, 1_000_000)
+    store = SynonymStore(str(path), check_interval=0)
+    assert store.rewrite("프로틴") == "단백질"
+    first = store.get()
+    assert store.get() is first  # unchanged file: not rebuilt
+
+    write(path, {"프로틴": "protein"}, 1_000_100)
+    assert store.rewrite("프로틴") == "protein"
+
+
+def test_store_checks_mtime_at_most_every_interval(tmp_path):
+    path = tmp_path / "synonyms.json"
+    write(path, {"프로틴": "단백질"}, 1_000_000)
+    store = SynonymStore(str(path), check_interval=3600)
+    assert store.rewrite("프로틴") == "단백질"
+    write(path, {"프로틴": "protein"}, 1_000_100)
+    assert store.rewrite("프로틴") == "단백질"
+
+
+def test_store_keeps_last_good_table_on_invalid_json(tmp_path, capsys):
+    path = tmp_path / "synonyms.json"
+    write(path, {"프로틴": "단백질"}, 1_000_000)
+    store = SynonymStore(str(path), check_interval=0)
+    assert store.rewrite("프로틴") == "단백질"
+
+    write(path, '{"프로틴": ', 1_000_100)  # half-saved edit
+    assert store.rewrite("프로틴") == "단백질"
+    assert "Synonym reload error" in capsys.readouterr().out
+
+    write(path, {"프로틴": "protein"}, 1_000_200)  # fixed edit is picked up
+    assert store.rewrite("프로틴") == "protein"
+
+
+def test_store_without_file_rewrites_nothing(tmp_path):
+    store = SynonymStore(str(tmp_path / "missing.json"), check_interval=0)
+    assert store.rewrite("프로틴") == "프로틴"
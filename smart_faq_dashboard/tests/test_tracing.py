@@ -0,0 +1,159 @@
+import json
+import re
+import threading
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.tracing import Tracer
+
+# Prometheus text exposition format (0.0.4)
+METRIC_NAME = r"[a-zA-Z_:][a-zA-Z0-9_:]*"
+SAMPLE = re.compile(rf'^({METRIC_NAME})(\{{[a-zA-Z_][a-zA-Z0-9_]*="[^"\\\n]*"(,[a-zA-Z_][a-zA-Z0-9_]*="[^"\\\n]*")*\}})? '
+                    r'(-?[0-9.]+(e[+-]?[0-9]+)?|NaN|[+-]Inf)$')
+HELP = re.compile(rf"^# HELP ({METRIC_NAME}) .+$")
+TYPE = re.compile(rf"^# TYPE ({METRIC_NAME}) (counter|gauge|summary|histogram|untyped)$")
+
+
+@pytest.fixture
+def tracer(tmp_path):
+    return Tracer(jsonl_path=str(tmp_path / "trace.jsonl"))
+
+
+def read_jsonl(tracer):
+    with open(tracer.jsonl_path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def assert_prometheus_text(text):
+    """Every line parses, and every sample belongs to a family declared (once) with TYPE before it."""
+    assert text.endswith("\n")
+    types = {}
+    for line in text.splitlines():
+        if line.startswith("# HELP"):
+            assert HELP.match(line), line
+        elif line.startswith("# TYPE"):
+            name, kind = TYPE.match(line).groups()
+            assert name not in types, f"duplicate TYPE for {name}"
+            types[name] = kind
+        else:
+            match = SAMPLE.match(line)
+            assert match, line
+            name = match.group(1)
+            family = re.sub(r"_(sum|count)$", "", name) if name not in types else name
+            assert family in types, f"{name} has no TYPE line"
+    return types
+
+
+def test_nested_spans_share_the_trace_and_link_to_their_parent(tracer):
+    with tracer.span("request") as outer:
+        with tracer.span("search") as inner:
+            with tracer.span("score") as innermost:
+                pass
+        tracer.record("llm", 0.5)
+    with tracer.span("request") as second:
+        pass
+
+    assert outer.parent_id is None and outer.trace_id == outer.id
+    assert inner.parent_id == outer.id and inner.trace_id == outer.id
+    assert innermost.parent_id == inner.id and innermost.trace_id == outer.id
+    assert second.trace_id == second.id != outer.id
+
+    lines = read_jsonl(tracer)
+    # Children finish (and are written) before their parents
+    assert [line['name'] for line in lines] == ["score", "search", "llm", "request", "request"]
+    llm = lines[2]
+    assert llm['parent'] == outer.id and llm['trace'] == outer.id and llm['ms'] == 500.0
+
+
+def test_spans_in_other_threads_start_their_own_trace(tracer):
+    spans = []
+
+    def worker():
+        with tracer.span("background") as span:
+            spans.append(span)
+
+    with tracer.span("request"):
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+    assert spans[0].parent_id is None and spans[0].trace_id == spans[0].id
+
+
+def test_exceptions_propagate_and_count_as_errors(tracer):
+    with pytest.raises(ValueError):
+        with tracer.span("llm") as span:
+            raise ValueError("boom")
+    assert span.attrs['error'] == "ValueError"
+    with tracer.span("llm") as span:
+        span.set(error="no_api_key")  # handled failures count too
+    with tracer.span("llm"):
+        pass
+
+    stage = tracer.summary()['llm']
+    assert stage['count'] == 3 and stage['errors'] == 2
+    assert read_jsonl(tracer)[0]['error'] == "ValueError"
+
+
+def test_summary_quantiles_cache_hits_and_counters(tracer):
+    for ms in range(100, 0, -1):  # recorded out of order
+        tracer.record("search", ms / 1000, rows=10, results=1, cache_hit=ms % 4 == 0)
+
+    stage = tracer.summary()['search']
+    assert stage['count'] == 100
+    assert stage['p50_ms'] == pytest.approx(50)   # sorted samples[int(0.50 * 99)]
+    assert stage['p95_ms'] == pytest.approx(95)   # sorted samples[int(0.95 * 99)]
+    assert stage['mean_ms'] == pytest.approx(50.5)
+    assert stage['cache_hit_rate'] == pytest.approx(0.25)
+    assert stage['rows'] == 1000 and stage['results'] == 100
+    assert 'prompt_tokens' not in stage  # zero counters are left out
+
+
+def test_quantiles_cover_only_recent_samples():
+    tracer = Tracer(max_samples=10)
+    for ms in [1000] * 10 + [1] * 10:
+        tracer.record("search", ms / 1000)
+    stage = tracer.summary()['search']
+    assert stage['p95_ms'] == pytest.approx(1)
+    assert stage['count'] == 20 and stage['mean_ms'] == pytest.approx(500.5)
+
+
+def test_prometheus_output_format(tracer):
+    for ms in range(1, 11):
+        tracer.record("search", ms / 1000, rows=5, cache_hit=ms > 5)
+    with pytest.raises(RuntimeError):
+        with tracer.span("llm", prompt_tokens=120, completion_tokens=30):
+            raise RuntimeError()
+
+    text = tracer.prometheus()
+    types = assert_prometheus_text(text)
+    assert types == {"faq_stage_seconds": "summary", "faq_stage_errors_total": "counter",
+                     "faq_stage_cache_hits_total": "counter", "faq_stage_cache_lookups_total": "counter",
+                     "faq_stage_units_total": "counter"}
+    lines = text.splitlines()
+    assert 'faq_stage_seconds{stage="search",quantile="0.5"} 0.005000' in lines
+    assert 'faq_stage_seconds{stage="search",quantile="0.95"} 0.009000' in lines
+    assert 'faq_stage_seconds_sum{stage="search"} 0.055000' in lines
+    assert 'faq_stage_seconds_count{stage="search"} 10' in lines
+    assert 'faq_stage_errors_total{stage="llm"} 1' in lines
+    assert 'faq_stage_cache_hits_total{stage="search"} 5' in lines
+    assert 'faq_stage_cache_lookups_total{stage="search"} 10' in lines
+    assert 'faq_stage_units_total{stage="search",unit="rows"} 50' in lines
+    assert 'faq_stage_units_total{stage="llm",unit="prompt_tokens"} 120' in lines
+
+
+def test_empty_tracer_exports_valid_text():
+    assert_prometheus_text(Tracer().prometheus())
+    assert Tracer().summary() == {}
+
+
+def test_metrics_endpoint_serves_prometheus_text():
+    import api
+
+    with TestClient(api.app) as client:
+        client.get("/search", params={"q": "환불"})
+        response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert_prometheus_text(response.text)
+    assert 'faq_stage_seconds_count{stage="search"}' in response.text